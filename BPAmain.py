@@ -1,7 +1,7 @@
-from average_stat import positions, stats
+from db_connection import fetch_player_by_name
+from player_search import load_search_index
+from position_engine import POSITION_CODES, centroid_matrix, describe_fit, score_positions, stats_to_vector
 import numpy as np
-import pandas  
-import sqlite3
 
 statTypes = ['Field Goal Percentage', '3P%', 'STL', 'BLK', 'TOV', 'PF', 'Points', 'AST', 'TRB']
 
@@ -40,76 +40,33 @@ def get_user_stats():
 # Function to determine the best position fit based on user statistics
 def find_best_position_fit(user_stats, positions, statTypes):
     """
-    Analyzes user stats against database averages using Euclidean distance.
+    Analyzes user stats against database averages using mean percentage difference.
     """
 
-    comparisons = [[0]*9 for _ in range(5)]  # Initialize a 5x9 matrix to store percentage differences
-
-
-    for i, j in enumerate(positions):
-        for a, b in enumerate(statTypes):
-            comparisons[i][a] = (user_stats[b] - j[b])/j[b] 
-    absComparisons = np.abs(comparisons)  # Take the absolute value of the percentage differences
-    positionComparisons = np.mean(absComparisons, axis=1)  # Calculate the mean percentage difference for each position
-
-    bestFit = positionComparisons[0]
-    bestFitIndex = 0
-
-    for i, j in enumerate(positionComparisons):
-        if bestFit > j:
-            bestFit = j
-            bestFitIndex = i # Find the index of the position with the smallest mean percentage difference 
+    fit = score_positions(stats_to_vector(user_stats, statTypes), centroid_matrix(positions, statTypes))
+    bestPosition, belowAverage, aboveAverage = describe_fit(fit, stat_names=statTypes)
 
     print("\n--- Best Position Fit ---")  # Display header message for best position fit
-    if bestFitIndex == 0:
-        print("Your best position fit is: Center (C)")  # Output if the best fit is Center
-    elif bestFitIndex == 1:
-        print("Your best position fit is: Power Forward (PF)")  # Output if the best fit is Power Forward
-    elif bestFitIndex == 2:
-        print("Your best position fit is: Small Forward (SF)")  # Output if the best fit is Small Forward
-    elif bestFitIndex == 3:
-        print("Your best position fit is: Shooting Guard (SG)")  # Output if the best fit is Shooting Guard
-    elif bestFitIndex == 4:
-        print("Your best position fit is: Point Guard (PG)")  # Output if the best fit is Point Guard   
-
-    statistics = ['Field Goal Percentage', '3P%', 'STL', 'BLK', 'TOV', 'PF', 'Points', 'AST', 'TRB']
-
-    for i in range(1, len(comparisons[bestFitIndex])):
-        key = comparisons[bestFitIndex][i]
-        key_stat = statistics[i]
-        j = i -1
-        while (j>0 and key<comparisons[bestFitIndex][j]):
-            comparisons[bestFitIndex][j + 1] = comparisons[bestFitIndex][j]
-            statistics[j + 1] = statistics[j]
-            j -= 1
-        comparisons[bestFitIndex][j + 1]= key
-        statistics[j + 1] = key_stat
-
-
-
-    print(f"Statistics needing improvement: 1. {statistics[-1]}, 2. {statistics[-2]}, 3. {statistics[-3]}")  # Output the top three statistics that are closest to the average for the best fit position
-    print(f"Statistics that are above average: 1. {statistics[0]}, 2. {statistics[1]}, 3. {statistics[2]}")  # Output the top three statistics that are furthest from the average for the best fit position
+    print(f"Your best position fit is: {bestPosition} ({POSITION_CODES[fit.best_index[0]]})")
+
+    print(f"Statistics needing improvement: 1. {belowAverage[0]}, 2. {belowAverage[1]}, 3. {belowAverage[2]}")  # Output the three weakest statistics against the average for the best fit position
+    print(f"Statistics that are above average: 1. {aboveAverage[0]}, 2. {aboveAverage[1]}, 3. {aboveAverage[2]}")  # Output the three statistics furthest above the average for the best fit position
 
 def compareSpecificPlayer(user_stats, statTypes): 
     
 
-    conn  = sqlite3.connect('basketball.db')
-    
-    cursor = conn.cursor()
-    
     playerName = input("Please enter the first and last name of the player you wish to compare with: ")
-    playerStats = {}
     
-    # query the correct table and column names from the imported CSV
-    cursor.execute("SELECT * FROM nba_players WHERE player_name = ?", (playerName,))
-    player = cursor.fetchone()
+    # query the correct table and column names from the imported CSV, returned as a dict for readable output
+    player_dict = fetch_player_by_name(playerName)
 
-    if player:
-        # turn row into dict for readable output
-        columns = [description[0] for description in cursor.description]
-        player_dict = dict(zip(columns, player))
-    else:
-        print("Player not found.")
+    if player_dict is None:
+        suggestions = load_search_index().close_matches(playerName)
+        if suggestions:
+            print(f"Player not found. Did you mean: {', '.join(suggestions)}?")
+        else:
+            print("Player not found.")
+        return
 
     comparisonsSpecific = [[0]*len(statTypes) for _ in range(1)]  # Initialize a 1xN matrix for percentage differences
 
@@ -136,8 +93,6 @@ def compareSpecificPlayer(user_stats, statTypes):
     print("Mean Percent Difference:")
     print(playerComparisons)
 
-    conn.close()
-
     
     
 compareSpecificPlayer(get_user_stats(), statTypes)
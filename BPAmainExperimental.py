@@ -1,8 +1,19 @@
+import argparse
+import csv
+import os
 import sqlite3
+import time
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from average_stat import positions
+from average_stat import csv_fingerprint, load_positions
+from batch_analysis import CHUNK_SIZE, DEFAULT_WORKERS, analyze_lines
+from db_connection import fetch_player_by_name
+from leaderboards import load_leaderboards
+from player_search import load_search_index
+from position_engine import STAT_COLUMNS, STAT_KEYS, centroid_matrix, describe_fit, score_positions, stats_to_vector
+from season_store import load_season_store
+from similarity_index import INDEX_FILE, SIMILARITY_METRICS, load_similarity_index, parse_weights
 
 def get_user_stats():
     print("\n--- Enter Your Per-Game Stats ---")
@@ -31,102 +42,50 @@ def get_user_stats():
     }
     return user_stats
 
-def find_best_position_fit(user_stats, positions):
-    comparisons = [[0]*9 for _ in range(5)]
-    stat_keys = ['Field Goal Percentage', '3P%', 'STL', 'BLK', 'TOV', 'PF', 'Points', 'AST', 'TRB']
-
-    for i, pos_dict in enumerate(positions):
-        for a, stat_name in enumerate(stat_keys):
-            comparisons[i][a] = (user_stats[stat_name] - pos_dict[stat_name]) / pos_dict[stat_name]
-    
-    absComparisons = np.abs(comparisons)
-    positionComparisons = np.mean(absComparisons, axis=1)
-
-    bestFitIndex = np.argmin(positionComparisons)
-    pos_names = ["Center", "Power Forward", "Small Forward", "Shooting Guard", "Point Guard"]
-    best_pos = pos_names[bestFitIndex]
+def find_best_position_fit(user_stats, positions, db_name='basketball.db'):
+    fit = score_positions(stats_to_vector(user_stats), centroid_matrix(positions))
+    best_pos, worst_stats, best_stats = describe_fit(fit)
 
     print(f"\n--- Best Position Fit: {best_pos} ---")
 
-    sorted_stats = [x for _, x in sorted(zip(comparisons[bestFitIndex], stat_keys))]
-    
-    aboveAve = ", ".join(sorted_stats[:3])
-    improve = ", ".join(sorted_stats[-3:])
-
-    sorted_pairs = sorted(zip(comparisons[bestFitIndex], stat_keys))
-    worst_stats = [stat for _, stat in sorted_pairs[:3]]
+    aboveAve = ", ".join(best_stats)
+    improve = ", ".join(worst_stats)
 
     print("Worst Stats:", ", ".join(worst_stats))
 
     try:
-        conn = sqlite3.connect('basketball.db')
-        df = pd.read_sql("SELECT * FROM nba_players", conn)
-        conn.close()
-
-        mapping = {
-            'Field Goal Percentage': 'fg_pct',
-            '3P%': 'three_p_pct',
-            'STL': 'stl',
-            'BLK': 'blk',
-            'TOV': 'tov',
-            'PF': 'pf',
-            'Points': 'pts',
-            'AST': 'ast',
-            'TRB': 'trb'
-        }
-
-        best_players_for_weakness = {}
-
-        # Stats where LOWER is better
-        inverse_stats = ['TOV', 'PF']
-
-        for stat in worst_stats:
-            db_col = mapping[stat]
-            df[db_col] = df[db_col].astype(float)
-
-            if stat in inverse_stats:
-                # Lower is better
-                best_idx = df[db_col].idxmin()
-            else:
-                # Higher is better
-                best_idx = df[db_col].idxmax()
-
-            best_player_row = df.loc[best_idx]
-            best_players_for_weakness[stat] = best_player_row['player_name']
+        leaderboards = load_leaderboards(db_name)
+        columns = dict(zip(STAT_KEYS, STAT_COLUMNS))
 
+        # Lower is better for TOV and PF; the leaderboards already rank those ascending
         print("Best NBA Players for Your Weak Stats:")
-        for stat, player in best_players_for_weakness.items():
-            print(f"{stat}: {player}")
+        for stat in worst_stats:
+            league = ", ".join(leaderboards.top(columns[stat]))
+            position = ", ".join(leaderboards.top(columns[stat], best_pos))
+            print(f"{stat}: {league} (at {best_pos}: {position})")
 
     except Exception as e:
         print(f"Error finding players for weak stats: {e}")
-        best_players_for_weakness = {}
 
-def find_ideal_player_match(user_stats, db_name='basketball.db'):
+    return best_pos, improve, aboveAve
+
+def find_ideal_player_match(user_stats, db_name='basketball.db', seasons=None, metric='euclidean', weights=None,
+                            csv_filepath='nba_stats.csv', index_path=INDEX_FILE):
     try:
-        conn = sqlite3.connect(db_name)
-        df = pd.read_sql("SELECT * FROM nba_players", conn)
-        conn.close()
+        if seasons is not None:
+            # Match against a (start, end) window of the multi-season store instead (z-score distance only)
+            matches = load_season_store().top_k(stats_to_vector(user_stats), 1, *seasons)
+            if not matches:
+                return "Unknown", 0
+            _, name, distance = matches[0]
+            return name, round(distance, 2)
 
-        mapping = {
-            'Field Goal Percentage': 'fg_pct', '3P%': 'three_p_pct', 'STL': 'stl',
-            'BLK': 'blk', 'TOV': 'tov', 'PF': 'pf', 'Points': 'pts', 'AST': 'ast', 'TRB': 'trb'
-        }
-        
-        stat_cols = list(mapping.values())
-        df_numeric = df[stat_cols].astype(float)
-        
-        means, stds = df_numeric.mean(), df_numeric.std()
-        df_standardized = (df_numeric - means) / stds
-        
-        user_vector = np.array([user_stats[k] for k in mapping.keys()])
-        user_standardized = (user_vector - means.values) / stds.values
+        index = load_similarity_index(db_name, csv_filepath, index_path, metric=metric, weights=weights)
 
-        distances = np.linalg.norm(df_standardized.values - user_standardized, axis=1)
-        df['similarity_score'] = distances
-        
-        match = df.sort_values('similarity_score').iloc[0]
-        return match['player_name'], round(match['similarity_score'], 2)
+        user_vector = stats_to_vector(user_stats)
+        indices, distances = index.top_k(user_vector, k=1)
+
+        return str(index.names[indices[0]]), round(float(distances[0]), 2)
 
     except Exception as e:
         print(f"Match Error: {e}")
@@ -134,21 +93,17 @@ def find_ideal_player_match(user_stats, db_name='basketball.db'):
 
 def compareSpecificPlayer(user_stats, statTypes): 
     
-    conn  = sqlite3.connect('basketball.db')
-    
-    cursor = conn.cursor()
-    
     playerName = input("Please enter the first and last name of the player you wish to compare with: ")
-    playerStats = {}
     
-    cursor.execute("SELECT * FROM nba_players WHERE player_name = ?", (playerName,))
-    player = cursor.fetchone()
+    player_dict = fetch_player_by_name(playerName)
 
-    if player:
-        columns = [description[0] for description in cursor.description]
-        player_dict = dict(zip(columns, player))
-    else:
-        print("Player not found.")
+    if player_dict is None:
+        suggestions = load_search_index().close_matches(playerName)
+        if suggestions:
+            print(f"Player not found. Did you mean: {', '.join(suggestions)}?")
+        else:
+            print("Player not found.")
+        return
 
     comparisonsSpecific = [[0]*len(statTypes) for _ in range(1)]
 
@@ -170,48 +125,15 @@ def compareSpecificPlayer(user_stats, statTypes):
     print("Mean Percent Difference:")
     print(playerComparisons)
 
-    conn.close()
+def create_history_tables(conn):
+    """
+    Creates 'user_analysis' and the running aggregates the dashboard reads.
 
-def update_user_data_stats(user_stats, best_pos, improve, aboveAve, player_match, db_name='player.db'):
-    try:
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_analysis (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT,
-                points_per_min REAL,
-                best_position TEXT,
-                skills_above_avg TEXT,
-                skills_to_improve TEXT,
-                nba_comparison TEXT
-            )
-        ''')
-
-        cursor.execute('''
-            INSERT INTO user_analysis (timestamp, points_per_min, best_position, skills_above_avg, skills_to_improve, nba_comparison)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            user_stats['Points'],
-            best_pos,
-            aboveAve,
-            improve,
-            player_match
-        ))
-
-        conn.commit()
-        conn.close()
-        print("\n--- Data successfully saved to database! ---")
-
-    except sqlite3.Error as e:
-        print(f"Database error: {e}")
-
-def initialize_user_db(db_name='player.db'):
-    conn = sqlite3.connect(db_name)
-    cursor = conn.cursor()
-    cursor.execute('''
+    'user_summary' (one row) and 'position_counts' are kept up to date by triggers on
+    every insert, whichever code path writes the session, so the dashboard never has to
+    scan the history. Histories saved before these tables existed are summarized once.
+    """
+    conn.executescript('''
         CREATE TABLE IF NOT EXISTS user_analysis (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT,
@@ -220,20 +142,104 @@ def initialize_user_db(db_name='player.db'):
             skills_above_avg TEXT,
             skills_to_improve TEXT,
             nba_comparison TEXT
-        )
+        );
+        CREATE INDEX IF NOT EXISTS idx_user_analysis_timestamp ON user_analysis(timestamp);
+
+        CREATE TABLE IF NOT EXISTS user_summary (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            session_count INTEGER NOT NULL,
+            first_timestamp TEXT,
+            first_points_per_min REAL,
+            latest_timestamp TEXT,
+            latest_points_per_min REAL
+        );
+        CREATE TABLE IF NOT EXISTS position_counts (
+            best_position TEXT PRIMARY KEY,
+            sessions INTEGER NOT NULL
+        );
+
+        -- Ties on timestamp go to the newer row, matching a sort by (timestamp, id)
+        CREATE TRIGGER IF NOT EXISTS trg_user_analysis_summary AFTER INSERT ON user_analysis
+        BEGIN
+            INSERT INTO user_summary (id, session_count, first_timestamp, first_points_per_min,
+                                      latest_timestamp, latest_points_per_min)
+            VALUES (1, 1, NEW.timestamp, NEW.points_per_min, NEW.timestamp, NEW.points_per_min)
+            ON CONFLICT(id) DO UPDATE SET
+                session_count = session_count + 1,
+                first_points_per_min = CASE WHEN NEW.timestamp < first_timestamp
+                                            THEN NEW.points_per_min ELSE first_points_per_min END,
+                first_timestamp = MIN(first_timestamp, NEW.timestamp),
+                latest_points_per_min = CASE WHEN NEW.timestamp >= latest_timestamp
+                                             THEN NEW.points_per_min ELSE latest_points_per_min END,
+                latest_timestamp = MAX(latest_timestamp, NEW.timestamp);
+            INSERT INTO position_counts (best_position, sessions) VALUES (NEW.best_position, 1)
+            ON CONFLICT(best_position) DO UPDATE SET sessions = sessions + 1;
+        END;
     ''')
-    conn.commit()
-    conn.close()
 
-def generate_user_dashboard(db_name='basketball.db'):
+    if conn.execute("SELECT 1 FROM user_summary").fetchone() is None:
+        conn.executescript('''
+            INSERT INTO user_summary (id, session_count, first_timestamp, first_points_per_min,
+                                      latest_timestamp, latest_points_per_min)
+            SELECT 1, COUNT(*),
+                   (SELECT timestamp FROM user_analysis ORDER BY timestamp, id LIMIT 1),
+                   (SELECT points_per_min FROM user_analysis ORDER BY timestamp, id LIMIT 1),
+                   (SELECT timestamp FROM user_analysis ORDER BY timestamp DESC, id DESC LIMIT 1),
+                   (SELECT points_per_min FROM user_analysis ORDER BY timestamp DESC, id DESC LIMIT 1)
+            FROM user_analysis
+            HAVING COUNT(*) > 0;
+            DELETE FROM position_counts;
+            INSERT INTO position_counts (best_position, sessions)
+            SELECT best_position, COUNT(*) FROM user_analysis GROUP BY best_position;
+        ''')
+
+def update_user_data_stats(conn, user_stats, best_pos, improve, aboveAve, player_match):
+    """Saves one analyzed session through the menu's open connection (tables already created)."""
     try:
-        conn = sqlite3.connect(db_name)
-        
-        query = "SELECT * FROM user_analysis ORDER BY timestamp DESC"
-        history_df = pd.read_sql(query, conn)
-        conn.close()
+        with conn:
+            conn.execute('''
+                INSERT INTO user_analysis (timestamp, points_per_min, best_position, skills_above_avg, skills_to_improve, nba_comparison)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                user_stats['Points'],
+                best_pos,
+                aboveAve,
+                improve,
+                player_match
+            ))
+        print("\n--- Data successfully saved to database! ---")
 
-        if history_df.empty:
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+
+def initialize_user_db(db_name='player.db'):
+    conn = sqlite3.connect(db_name)
+    with conn:
+        create_history_tables(conn)
+    conn.close()
+
+def generate_user_dashboard(conn):
+    """
+    Prints the progress dashboard from the running aggregates and the five newest sessions.
+
+    Every query is a single-row lookup or an index scan of five rows, so the dashboard
+    takes the same time however long the history grows.
+    """
+    try:
+        summary = conn.execute('''
+            SELECT session_count, first_points_per_min, latest_points_per_min FROM user_summary
+        ''').fetchone()
+        # Ties go to the alphabetically first position, as pandas' mode() did
+        most_common = conn.execute('''
+            SELECT best_position FROM position_counts ORDER BY sessions DESC, best_position LIMIT 1
+        ''').fetchone()
+        recent_df = pd.read_sql('''
+            SELECT timestamp, best_position, nba_comparison, skills_to_improve FROM user_analysis
+            ORDER BY timestamp DESC, id DESC LIMIT 5
+        ''', conn)
+
+        if summary is None or summary[0] == 0:
             print("\nNo history found. Complete a few assessments first!")
             return
 
@@ -241,54 +247,166 @@ def generate_user_dashboard(db_name='basketball.db'):
         print("          USER PERFORMANCE DASHBOARD          ")
         print("="*45)
 
-        total_sessions = len(history_df)
-        most_common_pos = history_df['best_position'].mode()[0]
-        
+        total_sessions, initial_pts, latest_pts = summary
+
         print(f"Total Sessions Logged: {total_sessions}")
-        print(f"Primary Skill Identity: {most_common_pos}")
+        print(f"Primary Skill Identity: {most_common[0]}")
 
         if total_sessions > 1:
-            latest_pts = history_df.iloc[0]['points_per_min']
-            initial_pts = history_df.iloc[-1]['points_per_min']
             improvement = ((latest_pts - initial_pts) / initial_pts) * 100
-            
+
             print(f"Scoring Efficiency Trend: {improvement:+.1f}% since first session")
 
         print("\n--- Recent Skill Analysis History ---")
-        summary_table = history_df[['timestamp', 'best_position', 'nba_comparison']].head(5)
+        summary_table = recent_df[['timestamp', 'best_position', 'nba_comparison']]
         print(summary_table.to_string(index=False))
 
-        recent_improve = history_df.iloc[0]['skills_to_improve']
+        recent_improve = recent_df.iloc[0]['skills_to_improve']
         print(f"\nFocus Areas for Next Practice: \n-> {recent_improve}")
         print("="*45)
 
     except Exception as e:
         print(f"Dashboard Error: {e}")
 
-def clear_player_data(db_name='player.db'):
+def clear_player_data(conn):
     confirm = input("\n WARNING: This will delete ALL your saved progress. Type 'DELETE' to confirm: ")
     
     if confirm == 'DELETE':
         try:
-            conn = sqlite3.connect(db_name)
-            cursor = conn.cursor()
-            
-            cursor.execute("DELETE FROM user_analysis")
-            cursor.execute("DELETE FROM sqlite_sequence WHERE name='user_analysis'")
-            
-            conn.commit()
-            conn.close()
+            with conn:
+                conn.execute("DELETE FROM user_analysis")
+                conn.execute("DELETE FROM sqlite_sequence WHERE name='user_analysis'")
+                conn.execute("DELETE FROM user_summary")
+                conn.execute("DELETE FROM position_counts")
             print("\n Database cleared successfully. You are starting with a clean slate.")
         except sqlite3.Error as e:
             print(f"Error clearing database: {e}")
     else:
         print("\nOperation cancelled. Your data is safe.")
 
-def main_menu():
+def read_stat_lines(input_path):
+    """
+    Yields stat lines from a CSV (with a header row) or a JSONL file, one per row.
+
+    Columns are the web form's names: fg_pct, three_p_pct, stl, blk, tov, pf, pts, ast,
+    trb, plus optional minutes and id. Anything but a .csv file is read as JSONL.
+    """
+    with open(input_path, newline='', encoding='utf-8') as f:
+        if input_path.lower().endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            yield from f
+
+def initialize_bulk_progress(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS bulk_progress (
+            source TEXT PRIMARY KEY,
+            source_hash TEXT NOT NULL,
+            rows_done INTEGER NOT NULL
+        )
+    ''')
+
+def run_bulk_analysis(input_path, db_name='player.db', workers=DEFAULT_WORKERS, chunk_size=CHUNK_SIZE, resume=True):
+    """
+    Analyzes every stat line in a CSV or JSONL file without prompting.
+
+    Lines are analyzed on a process pool (best position, weak stats with an NBA exemplar
+    for each, and closest twin) and saved to 'user_analysis' in one transaction per chunk.
+    The same transaction records how many input rows are done in 'bulk_progress', so an
+    interrupted run picks up after the last saved chunk. Rerunning a finished file, or a
+    file whose contents changed, starts from the top.
+
+    Args:
+        input_path (str): CSV or JSONL file of per-game stat lines.
+        db_name (str): Database to save results to. Defaults to 'player.db'.
+        workers (int): Worker processes; 0 analyzes in this process.
+        chunk_size (int): Stat lines per worker task and per transaction.
+        resume (bool): Continue an interrupted run of the same file instead of restarting.
+    """
+    if not os.path.exists(input_path):
+        print(f"Error: The file '{input_path}' was not found.")
+        return
+
+    initialize_user_db(db_name)
+    source = os.path.abspath(input_path)
+    source_hash = csv_fingerprint(source)
+    labels = dict(zip(STAT_COLUMNS, STAT_KEYS))
+
+    conn = sqlite3.connect(db_name)
+    try:
+        with conn:
+            initialize_bulk_progress(conn)
+        row = conn.execute("SELECT source_hash, rows_done FROM bulk_progress WHERE source = ?", (source,)).fetchone()
+        rows_done = row[1] if resume and row is not None and row[0] == source_hash else 0
+        if rows_done:
+            print(f"Resuming after row {rows_done}.")
+
+        lines = (line for line in read_stat_lines(source) if isinstance(line, dict) or line.strip())
+        for _ in zip(range(rows_done), lines):
+            pass
+
+        start = time.perf_counter()
+        analyzed = errors = 0
+        for results in analyze_lines(lines, workers=workers, chunk_size=chunk_size, start_row=rows_done):
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            saved = [result for result in results if 'error' not in result]
+            with conn:
+                conn.executemany('''
+                    INSERT INTO user_analysis (timestamp, points_per_min, best_position, skills_above_avg, skills_to_improve, nba_comparison)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [(
+                    timestamp,
+                    result['points_per_min'],
+                    result['best_position'],
+                    ", ".join(labels[stat] for stat in result['strengths']),
+                    ", ".join(labels[stat] for stat in result['improve']),
+                    result['twin'],
+                ) for result in saved])
+                rows_done = results[-1]['row'] + 1
+                conn.execute('''
+                    INSERT INTO bulk_progress (source, source_hash, rows_done) VALUES (?, ?, ?)
+                    ON CONFLICT(source) DO UPDATE SET source_hash = excluded.source_hash, rows_done = excluded.rows_done
+                ''', (source, source_hash, rows_done))
+
+            analyzed += len(results)
+            errors += len(results) - len(saved)
+            for result in results:
+                if 'error' in result:
+                    print(f"Row {result['row']}: {result['error']}")
+            elapsed = time.perf_counter() - start
+            print(f"{analyzed} rows analyzed ({analyzed / elapsed:,.0f} rows/sec)")
+
+        elapsed = time.perf_counter() - start
+        rate = analyzed / elapsed if elapsed else 0.0
+        print(f"\n--- Bulk analysis complete: {analyzed - errors} saved, {errors} skipped, "
+              f"{elapsed:.1f}s ({rate:,.0f} rows/sec) ---")
+
+        # A finished file starts over next time instead of resuming at its end
+        with conn:
+            conn.execute("DELETE FROM bulk_progress WHERE source = ?", (source,))
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+    finally:
+        conn.close()
+
+def parse_season_window(text):
+    """Reads a season window written as '2021-2025' (or one season, '2024') into (start, end)."""
+    start, _, end = text.partition('-')
+    try:
+        return int(start), int(end or start)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected seasons as START-END, e.g. 2021-2025, got '{text}'")
+
+def main_menu(metric='euclidean', weights=None, seasons=None, db_name='player.db'):
     DB_NBA = 'basketball.db'
-    DB_USER = 'player.db'
+    DB_USER = db_name
     Running = True 
 
+    # One connection for every session the menu logs, shows or clears
+    conn = sqlite3.connect(DB_USER)
+    with conn:
+        create_history_tables(conn)
+
     while Running:
         print("\n" + "="*30)
         print("   NBA PLAYER ANALYZER 2025   ")
@@ -303,16 +421,16 @@ def main_menu():
 
         if choice == '1':
             stats = get_user_stats()
-            best_pos, to_improve, excels_in = find_best_position_fit(stats, positions)
-            player_name, distance = find_ideal_player_match(stats, db_name=DB_NBA)
+            best_pos, to_improve, excels_in = find_best_position_fit(stats, load_positions())
+            player_name, distance = find_ideal_player_match(stats, db_name=DB_NBA, seasons=seasons, metric=metric, weights=weights)
             print(f"\nYour closest NBA twin is: {player_name}")
-            update_user_data_stats(stats, best_pos, to_improve, excels_in, player_name, db_name=DB_USER)
+            update_user_data_stats(conn, stats, best_pos, to_improve, excels_in, player_name)
             
         elif choice == '2':
-            generate_user_dashboard(db_name=DB_USER)
+            generate_user_dashboard(conn)
             
         elif choice == '3':
-            clear_player_data(db_name=DB_USER)
+            clear_player_data(conn)
 
         elif choice == '4':
             stats = get_user_stats()
@@ -326,6 +444,31 @@ def main_menu():
         else:
             print("Invalid choice. Please try again.")
 
+    conn.close()
+
 if __name__ == "__main__":
-    initialize_user_db()
-    main_menu()
+    parser = argparse.ArgumentParser(description="NBA player analyzer. Runs the interactive menu unless --bulk is given.")
+    parser.add_argument('--bulk', metavar='FILE', help="Analyze every stat line in a CSV or JSONL file without prompting.")
+    parser.add_argument('--db', default='player.db',
+                        help="Database the menu and --bulk save results to (default: player.db).")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for --bulk; 0 runs in this process (default: CPU count).")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Stat lines per task and per transaction.")
+    parser.add_argument('--restart', action='store_true', help="Ignore progress from an interrupted --bulk run.")
+    parser.add_argument('--metric', choices=SIMILARITY_METRICS, default='euclidean',
+                        help="How the menu finds your closest NBA twin (default: euclidean).")
+    parser.add_argument('--weights', type=parse_weights, metavar='STAT=W,...',
+                        help="Per-stat weights for --metric weighted, e.g. pts=2,ast=1.5 (others count 1).")
+    parser.add_argument('--seasons', type=parse_season_window, metavar='START-END',
+                        help="Find your NBA twin across these seasons of the season store, e.g. 2021-2025.")
+    args = parser.parse_args()
+    if args.weights and args.metric != 'weighted':
+        parser.error("--weights needs --metric weighted")
+    if args.seasons and args.metric != 'euclidean':
+        parser.error("--seasons matches by z-score distance only; drop --metric")
+
+    if args.bulk:
+        run_bulk_analysis(args.bulk, db_name=args.db, workers=args.workers, chunk_size=args.chunk_size,
+                          resume=not args.restart)
+    else:
+        main_menu(args.metric, args.weights, args.seasons, db_name=args.db)
@@ -1,6 +1,5 @@
-import sqlite3
-import pandas as pd
-import numpy as np
+from position_engine import STAT_COLUMNS, per_minute_vector
+from similarity_index import load_similarity_index
 
 def find_ideal_player_match(db_name ='basketball.db'):
     """
@@ -9,51 +8,33 @@ def find_ideal_player_match(db_name ='basketball.db'):
     player in terms of stats.
     """
     try:
-        conn = sqlite3.connect(db_name)
-        
-        # Calculate the 'average' and 'spread' for standardization
-        df = pd.read_sql("SELECT * FROM nba_players", conn)
-        conn.close()
+        # Means, stds and the standardized player matrix are prebuilt by init_db.py
+        index = load_similarity_index(db_name=db_name)
 
-        if df.empty:
+        if len(index) == 0:
             print("Database is empty.")
             return
 
-        stat_cols = ['fg_pct', 'three_p_pct', 'stl', 'blk', 'tov', 'pf', 'pts', 'ast', 'trb']
+        stat_cols = STAT_COLUMNS
         
         print("\n--- Create Your Ideal Player Profile ---")
         user_input = {}
         for col in stat_cols:
-            user_input[col] = float(input(f"Enter target {col}: "))
-
-        # Transform all stats so they have a Mean of 0 and Standard Deviation of 1
-        # This prevents categories from being overshadowed by others
-        df_numeric = df[stat_cols].astype(float)
-        
-        # Calculate means and standard deviations from the database
-        means = df_numeric.mean()
-        stds = df_numeric.std()
+            user_input[col] = float(input(f"Enter target {col} per game: "))
+        minutes = float(input("Enter minutes per game: "))
 
-        # Standardize the database
-        df_standardized = (df_numeric - means) / stds
-        
-        # Standardize the user input using the SAME means/stds
-        user_vector = np.array([user_input[col] for col in stat_cols])
-        user_standardized = (user_vector - means.values) / stds.values
-
-        # We find the straight-line distance in 9-dimensional space (the amount of categroies there are)
-        distances = np.linalg.norm(df_standardized.values - user_standardized, axis=1)
-        
-        # Add distances back to the original dataframe to see names
-        df['similarity_score'] = distances
-        
-        # Print out top 3 matches from the database
-        matches = df.sort_values('similarity_score').head(3)
+        # The index holds per-minute stats and standardizes the user input with the SAME
+        # means/stds as the database, then finds the straight-line distance in
+        # 9-dimensional space (the amount of categroies there are)
+        user_vector = per_minute_vector(user_input, minutes)
+        indices, distances = index.top_k(user_vector, k=3)
 
         print("\n--- Your Top NBA Player Matches ---")
-        for i, (idx, row) in enumerate(matches.iterrows(), 1):
-            print(f"{i}. {row['player_name']} (Distance: {row['similarity_score']:.2f})")
-            print(f"   Stats: {row['pts']} PTS, {row['ast']} AST, {row['trb']} REB")
+        pts, ast, trb = (stat_cols.index(col) for col in ('pts', 'ast', 'trb'))
+        for i, (idx, distance) in enumerate(zip(indices, distances), 1):
+            row = index.raw_stats[idx] * 36
+            print(f"{i}. {index.names[idx]} (Distance: {distance:.2f})")
+            print(f"   Per 36 min: {row[pts]:.1f} PTS, {row[ast]:.1f} AST, {row[trb]:.1f} REB")
 
     except Exception as e:
         print(f"An error occurred: {e}")
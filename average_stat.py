@@ -1,34 +1,176 @@
-import pandas as pd
-
-# 3 points percentage, steals, blocks, turnovers, personal fouls, points, assists, rebounds, field goal percentage
-# 1. Load the CSV file into a DataFrame
-df = pd.read_csv('nba_stats.csv')
-stats = ['Field Goal Percentage', '3P%', 'STL', 'BLK', 'TOV', 'PF', 'Points', 'AST', 'TRB']
-stats_c = {}
-stats_pf = {}
-stats_sf = {}
-stats_sg = {}
-stats_pg = {}
-
-positions = [stats_c, stats_pf, stats_sf, stats_sg, stats_pg]
-for j in positions:
-    if j == stats_c:
-        selected_rows = df.iloc[1:103]
-        position = 'C'
-    elif j == stats_pf:
-        selected_rows = df.iloc[104:211]
-        position = 'PF'
-    elif j == stats_sf:
-        selected_rows = df.iloc[212:311]
-        position = 'SF'
-    elif j == stats_sg:
-        selected_rows = df.iloc[312:415]
-        position = 'SG'
-    elif j == stats_pg:
-        selected_rows = df.iloc[416:569]
-        position = 'PG'
-    for i in stats:
-        average_value = selected_rows[i].mean()
-        if i != 'Field Goal Percentage' and i != '3P%':
-            average_value = average_value/48 # Divide by the number of minutes in an NBA basketball game
-        j[i] = round(average_value, 5) 
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from db_connection import query
+from position_engine import POSITION_CODES, STAT_COLUMNS, STAT_KEYS, centroids_from_players
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Source CSV headers (current and older exports) mapped onto the DB column names
+CSV_COLUMNS = {
+    'Pos': 'position',
+    'Position': 'position',
+    'FG%': 'fg_pct',
+    'Field Goal Percentage': 'fg_pct',
+    '3P%': 'three_p_pct',
+    'STL': 'stl',
+    'BLK': 'blk',
+    'TOV': 'tov',
+    'PF': 'pf',
+    'PTS': 'pts',
+    'Points': 'pts',
+    'AST': 'ast',
+    'TRB': 'trb',
+}
+
+# Centroids already resolved in this process, keyed by the source CSV hash
+_centroid_cache = {}
+_fingerprint_cache = {}
+
+
+def _resolve(path):
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+def csv_fingerprint(csv_filepath='nba_stats.csv'):
+    """
+    Returns a SHA-256 hash of the source CSV contents.
+
+    The hash is remembered per (path, size, mtime) so repeated lookups in one process
+    only re-read the file when it has actually changed on disk.
+    """
+    csv_filepath = _resolve(csv_filepath)
+    file_stat = os.stat(csv_filepath)
+    key = (csv_filepath, file_stat.st_size, file_stat.st_mtime_ns)
+    if key not in _fingerprint_cache:
+        digest = hashlib.sha256()
+        with open(csv_filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                digest.update(block)
+        _fingerprint_cache[key] = digest.hexdigest()
+    return _fingerprint_cache[key]
+
+
+def compute_position_centroids(csv_filepath='nba_stats.csv'):
+    """Parses the source CSV and averages every stat per position by grouping on Pos."""
+    raw_df = pd.read_csv(_resolve(csv_filepath))
+    columns = {}
+    for header, column in CSV_COLUMNS.items():
+        if header in raw_df.columns and column not in columns.values():
+            columns[header] = column
+    return centroids_from_players(raw_df.rename(columns=columns), position_col='position')
+
+
+def save_position_centroids(centroids, source_hash, db_name='basketball.db'):
+    """
+    Stores centroids in the 'position_centroids' table, replacing any stale entries.
+
+    Args:
+        centroids (numpy.ndarray): (5 x 9) matrix in POSITION_CODES x STAT_COLUMNS order.
+        source_hash (str): Fingerprint of the CSV the centroids were computed from.
+        db_name (str): SQLite database to write to. Defaults to 'basketball.db'.
+    """
+    conn = sqlite3.connect(_resolve(db_name))
+    try:
+        stat_defs = ", ".join(f"{col} REAL NOT NULL" for col in STAT_COLUMNS)
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS position_centroids (
+                source_hash TEXT NOT NULL,
+                position TEXT NOT NULL,
+                {stat_defs},
+                PRIMARY KEY (source_hash, position)
+            )
+        ''')
+        placeholders = ", ".join("?" for _ in range(len(STAT_COLUMNS) + 2))
+        with conn:
+            conn.execute("DELETE FROM position_centroids WHERE source_hash != ?", (source_hash,))
+            conn.executemany(
+                f"INSERT OR REPLACE INTO position_centroids (source_hash, position, {', '.join(STAT_COLUMNS)}) "
+                f"VALUES ({placeholders})",
+                [(source_hash, code, *map(float, row)) for code, row in zip(POSITION_CODES, centroids)]
+            )
+    finally:
+        conn.close()
+
+
+def _read_stored_centroids(source_hash, db_name):
+    try:
+        rows = query(
+            f"SELECT position, {', '.join(STAT_COLUMNS)} FROM position_centroids WHERE source_hash = ?",
+            (source_hash,),
+            db_name=db_name
+        )
+    except sqlite3.OperationalError:
+        # Database or table has not been created yet
+        return None
+
+    by_position = {row[0]: row[1:] for row in rows}
+    if set(by_position) != set(POSITION_CODES):
+        return None
+    return np.array([by_position[code] for code in POSITION_CODES], dtype=np.float64)
+
+
+def refresh_position_centroids(csv_filepath='nba_stats.csv', db_name='basketball.db'):
+    """
+    Computes the centroids for the CSV's current content and stores them in db_name.
+
+    Only init_db.py writes centroids; the apps open basketball.db read-only.
+
+    Returns:
+        numpy.ndarray: The (5 x 9) centroid matrix that was stored.
+    """
+    source_hash = csv_fingerprint(csv_filepath)
+    centroids = compute_position_centroids(csv_filepath)
+    save_position_centroids(centroids, source_hash, db_name)
+    _centroid_cache[source_hash] = centroids
+    return centroids
+
+
+def stored_centroids_current(csv_filepath='nba_stats.csv', db_name='basketball.db'):
+    """Whether db_name already holds centroids for the CSV's current content."""
+    return _read_stored_centroids(csv_fingerprint(csv_filepath), db_name) is not None
+
+
+def load_position_centroids(csv_filepath='nba_stats.csv', db_name='basketball.db'):
+    """
+    Returns the (5 x 9) position centroid matrix, computing it only when needed.
+
+    Centroids are looked up by the hash of the source CSV, first in this process and
+    then in the 'position_centroids' table. A changed CSV hashes differently, so stale
+    centroids are never served. When the table has none for the current CSV they are
+    computed in memory for this process only; init_db.py is what stores them.
+    """
+    source_hash = csv_fingerprint(csv_filepath)
+    if source_hash in _centroid_cache:
+        return _centroid_cache[source_hash]
+
+    centroids = _read_stored_centroids(source_hash, db_name)
+    if centroids is None:
+        print("Position centroids are missing or stale in the database; "
+              "computing them from the CSV (run init_db.py to store them).")
+        centroids = compute_position_centroids(csv_filepath)
+
+    _centroid_cache[source_hash] = centroids
+    return centroids
+
+
+def clear_centroid_cache():
+    """Forgets centroids resolved in this process, so the next lookup reads the database again."""
+    _centroid_cache.clear()
+
+
+def load_positions(csv_filepath='nba_stats.csv', db_name='basketball.db'):
+    """Returns the centroids as the list of per-position dicts keyed by STAT_KEYS (C, PF, SF, SG, PG)."""
+    centroids = load_position_centroids(csv_filepath, db_name)
+    return [dict(zip(STAT_KEYS, map(float, row))) for row in centroids]
+
+
+def __getattr__(name):
+    # Keeps `from average_stat import positions` working without parsing anything at import time
+    if name == 'positions':
+        return load_positions()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
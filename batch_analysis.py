@@ -0,0 +1,205 @@
+import json
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from average_stat import load_position_centroids
+from leaderboards import load_leaderboards
+from position_engine import STAT_COLUMNS, describe_fit, fit_positions_batch, per_minute_vector
+from similarity_index import INDEX_FILE, load_similarity_index
+
+# Stat lines handed to a worker at a time
+CHUNK_SIZE = 1000
+
+# Chunks queued per worker before reading more input, which keeps memory flat for any upload size
+MAX_PENDING_PER_WORKER = 2
+
+# Worker processes for the shared pool; 0 analyzes in the calling process. Kept small because
+# every gunicorn worker starts its own pool; the --bulk CLI defaults to the CPU count instead.
+DEFAULT_WORKERS = int(os.environ.get('ANALYZE_WORKERS', 1))
+
+# Loaded once per worker process by _init_worker
+_worker_state = {}
+
+# The pool this process created, with the pid it belongs to (pools don't survive a fork)
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker(db_name, csv_filepath, index_path):
+    global _worker_state
+    # Replaced as a whole, so a chunk already running keeps the state it started with
+    _worker_state = {
+        'centroids': load_position_centroids(csv_filepath, db_name),
+        'index': load_similarity_index(db_name, csv_filepath, index_path),
+        'leaderboards': load_leaderboards(db_name),
+    }
+
+
+def _parse_line(line):
+    """One stat line as (per-minute vector, id) or raises ValueError with a readable message."""
+    if isinstance(line, dict):
+        stats = line
+    else:
+        try:
+            stats = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON: {e.msg}")
+    if not isinstance(stats, dict):
+        raise ValueError("each line must be a JSON object")
+    missing = [col for col in STAT_COLUMNS if col not in stats]
+    if missing:
+        raise ValueError(f"missing stats: {', '.join(missing)}")
+    try:
+        return per_minute_vector(stats, stats.get('minutes')), stats.get('id')
+    except (TypeError, ValueError):
+        raise ValueError("stats and minutes must be numbers")
+
+
+def analyze_chunk(first_row, lines):
+    """
+    Analyzes a chunk of raw NDJSON stat lines (or already-parsed dicts, e.g. CSV rows).
+
+    Position fit and closest-NBA-twin lookups each run as one vectorized call over every
+    valid line in the chunk, using the same per-minute vectors as BPAmainExperimental.
+
+    Args:
+        first_row (int): Input row number of lines[0], echoed back as 'row'.
+        lines (list): JSON object lines or dicts with STAT_COLUMNS keys, plus optional
+            'minutes' and 'id'.
+
+    Returns:
+        list: One result dict per line, in input order. Lines that can't be read get
+            an 'error' entry instead of an analysis.
+    """
+    results, vectors, valid = [], [], []
+    for offset, line in enumerate(lines):
+        row = {'row': first_row + offset}
+        try:
+            vector, row_id = _parse_line(line)
+        except ValueError as e:
+            row['error'] = str(e)
+        else:
+            if row_id not in (None, ''):
+                row['id'] = row_id
+            vectors.append(vector)
+            valid.append(row)
+        results.append(row)
+
+    if valid:
+        state = _worker_state
+        matrix = np.vstack(vectors)
+        fit = fit_positions_batch(matrix, state['centroids'])
+        index = state['index']
+        leaderboards = state['leaderboards']
+        twin_ids, twin_distances = index.top_k_batch(matrix, k=1)
+        points_per_min = matrix[:, STAT_COLUMNS.index('pts')]
+        for i, row in enumerate(valid):
+            best_position, improve, strengths = describe_fit(fit, i, stat_names=STAT_COLUMNS)
+            row.update(
+                best_position=best_position,
+                improve=improve,
+                strengths=strengths,
+                exemplars={stat: list(leaderboards.top(stat)) for stat in improve},
+                position_exemplars={stat: list(leaderboards.top(stat, best_position)) for stat in improve},
+                twin=str(index.names[twin_ids[i, 0]]),
+                twin_distance=round(float(twin_distances[i, 0]), 2),
+                points_per_min=float(points_per_min[i]),
+            )
+    return results
+
+
+def _current_pool(workers, db_name, csv_filepath, index_path):
+    # Callers hold _pool_lock
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        # Rebuild a stale index here once, rather than in every worker at the same time
+        load_similarity_index(db_name, csv_filepath, index_path)
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(db_name, csv_filepath, index_path),
+        )
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def get_pool(workers=DEFAULT_WORKERS, db_name='basketball.db', csv_filepath='nba_stats.csv',
+             index_path=INDEX_FILE):
+    """
+    This process's worker pool, started on first use.
+
+    Workers are spawned rather than forked, since web workers may have threads running,
+    and each loads the centroids and similarity index once in its initializer.
+    """
+    with _pool_lock:
+        return _current_pool(workers, db_name, csv_filepath, index_path)
+
+
+def _submit(workers, db_name, csv_filepath, index_path, *task):
+    """
+    Queues one task on the current pool.
+
+    Looking the pool up and submitting happen under the lock reset_workers() swaps
+    pools with, so a task never reaches a pool after its shutdown.
+    """
+    with _pool_lock:
+        return _current_pool(workers, db_name, csv_filepath, index_path).submit(*task)
+
+
+def reset_workers():
+    """
+    Makes the next analysis load fresh centroids, index and leaderboards, e.g. after a
+    new import into basketball.db.
+
+    The old pool is shut down without waiting: chunks already queued on it still
+    finish, and anything submitted afterwards (including the rest of an upload that
+    is streaming right now) goes to a new pool.
+    """
+    global _pool, _worker_state
+    with _pool_lock:
+        old_pool, _pool = (_pool, None) if _pool_pid == os.getpid() else (None, None)
+        _worker_state = {}
+    if old_pool is not None:
+        old_pool.shutdown(wait=False)
+
+
+def analyze_lines(lines, workers=DEFAULT_WORKERS, chunk_size=CHUNK_SIZE, db_name='basketball.db',
+                  csv_filepath='nba_stats.csv', index_path=INDEX_FILE, start_row=0):
+    """
+    Analyzes an iterable of NDJSON stat lines or dicts, yielding one list of results per chunk.
+
+    Input is read lazily and at most workers * MAX_PENDING_PER_WORKER chunks are in
+    flight, so memory stays flat however many lines there are. Chunks come back in
+    input order as soon as each one (and every chunk before it) finishes. Rows are
+    numbered from start_row, for callers resuming part-way through an input.
+    """
+    lines = (line for line in lines if isinstance(line, dict) or line.strip())
+    chunks = iter(lambda: list(islice(lines, chunk_size)), [])
+
+    if workers == 0:
+        first_row = start_row
+        for chunk in chunks:
+            if 'index' not in _worker_state:
+                _init_worker(db_name, csv_filepath, index_path)
+            yield analyze_chunk(first_row, chunk)
+            first_row += len(chunk)
+        return
+
+    pending = deque()
+    first_row = start_row
+    for chunk in chunks:
+        # Looked up per chunk, so a long upload moves to a fresh pool after reset_workers()
+        pending.append(_submit(workers, db_name, csv_filepath, index_path, analyze_chunk, first_row, chunk))
+        first_row += len(chunk)
+        if len(pending) >= workers * MAX_PENDING_PER_WORKER:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,433 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_CSV = os.path.join(BASE_DIR, 'nba_stats.csv')
+RESULTS_FILE = 'benchmark_results.json'
+
+# Multiples of the real nba_stats.csv row count to generate. 10000 (5.69M rows) can be
+# asked for with --scales, but its imports and search index take a long time to build
+SCALES = [1, 100]
+
+# A case whose median grows by more than this fraction between runs is flagged
+REGRESSION_THRESHOLD = 0.20
+
+# Rendering every player on one page stops being meaningful past this many rows
+MAX_PAGE_ROWS = 100000
+
+# Queries per batch twin-matching run, independent of the table size
+MATCH_BATCH_SIZE = 1000
+
+PCT_COLUMNS = ['FG%', '3P%', '2P%', 'eFG%', 'FT%']
+
+
+def make_raw_players(scale, rng):
+    """
+    Generates a synthetic stats table shaped like nba_stats.csv with scale times the rows.
+
+    Real rows are resampled with +/-15% noise on every stat, percentages are clipped
+    to [0, 1], and names get a numeric suffix so each player stays unique.
+    """
+    source = pd.read_csv(SOURCE_CSV)
+    picks = rng.integers(0, len(source), len(source) * scale)
+    players = source.iloc[picks].reset_index(drop=True)
+
+    numeric = players.select_dtypes('number').columns.drop(['Rk', 'Age'], errors='ignore')
+    players[numeric] = players[numeric] * rng.uniform(0.85, 1.15, size=(len(players), len(numeric)))
+    present_pct = [col for col in PCT_COLUMNS if col in players.columns]
+    players[present_pct] = players[present_pct].clip(0, 1)
+    players['Rk'] = np.arange(1, len(players) + 1)
+    players['Player'] = players['Player'] + ' #' + players.index.astype(str)
+    return players
+
+
+def make_user_batch(rows, rng):
+    """Synthetic per-game user stat lines as (per-minute matrix, list of form dicts)."""
+    games = pd.DataFrame({
+        'fg_pct': rng.uniform(0.3, 0.65, rows),
+        'three_p_pct': rng.uniform(0.2, 0.45, rows),
+        'stl': rng.uniform(0.2, 2.5, rows),
+        'blk': rng.uniform(0.0, 2.5, rows),
+        'tov': rng.uniform(0.5, 4.0, rows),
+        'pf': rng.uniform(1.0, 4.0, rows),
+        'pts': rng.uniform(2.0, 35.0, rows),
+        'ast': rng.uniform(0.5, 10.0, rows),
+        'trb': rng.uniform(1.0, 14.0, rows),
+        'minutes': rng.uniform(10.0, 40.0, rows),
+        'fg_attempts': rng.uniform(2.0, 25.0, rows),
+        'ft_attempts': rng.uniform(0.0, 10.0, rows),
+    })
+    from position_engine import PERCENT_COLUMNS, STAT_COLUMNS
+    per_minute = games[STAT_COLUMNS].to_numpy(dtype=np.float64, copy=True)
+    counting = [i for i, col in enumerate(STAT_COLUMNS) if col not in PERCENT_COLUMNS]
+    per_minute[:, counting] /= games['minutes'].to_numpy()[:, None]
+    return per_minute, games.to_dict(orient='records')
+
+
+def time_call(func, repeats):
+    """Runs func repeats times and returns median/min/max wall time in seconds."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {
+        'repeats': repeats,
+        'median_s': statistics.median(samples),
+        'min_s': min(samples),
+        'max_s': max(samples),
+    }
+
+
+def _load_app(work_dir):
+    # Keep benchmark logins out of the real users.db
+    os.environ.setdefault('USERS_DATABASE_URL', f"sqlite:///{os.path.join(work_dir, 'bench_users.db')}")
+    sys.path.insert(0, BASE_DIR)
+    from my_flask_app import app as app_module
+    return app_module
+
+
+def _log_in(client):
+    credentials = {'username': 'benchmark', 'password': 'benchmark', 'confirm_password': 'benchmark'}
+    client.post('/register', data=credentials)
+    client.post('/login', data=credentials)
+
+
+def run_scale(scale, app_module, work_dir, rng):
+    """Times every hot path against one synthetic table size."""
+    from init_db import COLUMN_MAPPING, import_csv_to_sql
+    from player_dataset import PlayerDataset, canonicalize_players_dataframe
+    from position_engine import STAT_KEYS, fit_positions_batch
+    from similarity_index import PlayerSimilarityIndex
+    from average_stat import compute_position_centroids
+
+    results = []
+
+    def record(case, rows, timing):
+        results.append({'case': case, 'scale': scale, 'rows': rows, **timing})
+        print(f"  {case:<34} {rows:>10} rows  median {timing['median_s'] * 1000:10.2f} ms")
+
+    raw = make_raw_players(scale, rng)
+    rows = len(raw)
+    csv_path = os.path.join(work_dir, f"players_{scale}x.csv")
+    raw.to_csv(csv_path, index=False)
+    db_frame = raw.rename(columns=COLUMN_MAPPING)
+    db_frame = db_frame.loc[:, ~db_frame.columns.duplicated()].fillna(0)
+
+    canonical = canonicalize_players_dataframe(db_frame)
+    centroids = compute_position_centroids(csv_path)
+    user_matrix, user_forms = make_user_batch(rows, rng)
+
+    record('fit_positions_batch', rows, time_call(lambda: fit_positions_batch(user_matrix, centroids), 5))
+
+    index = PlayerSimilarityIndex.from_dataframe(canonical)
+    queries = user_matrix[:MATCH_BATCH_SIZE]
+    record('similarity_top_k', rows, time_call(lambda: index.top_k(queries[0], k=3), 50))
+    record('similarity_top_k_batch', rows, time_call(lambda: index.top_k_batch(queries, k=3), 5))
+
+    record('canonicalize_players_dataframe', rows,
+           time_call(lambda: canonicalize_players_dataframe(db_frame), 3))
+
+    sample = canonical.head(1000).to_dict(orient='records')
+    record('normalize_compare_player', len(sample),
+           time_call(lambda: [app_module.normalize_compare_player(row) for row in sample], 5))
+
+    db_path = os.path.join(work_dir, f"players_{scale}x.db")
+    import_kwargs = {
+        'index_path': os.path.join(work_dir, f"index_{scale}x.npz"),
+        'store_dir': os.path.join(work_dir, f"store_{scale}x"),
+        'snapshot_dir': os.path.join(work_dir, f"snapshot_{scale}x"),
+    }
+    record('import_csv_to_sql_full', rows,
+           time_call(lambda: import_csv_to_sql(csv_path, db_path, full_rebuild=True, **import_kwargs), 1))
+    record('import_csv_to_sql_unchanged', rows,
+           time_call(lambda: import_csv_to_sql(csv_path, db_path, **import_kwargs), 1))
+
+    # The CLI's own entry points, lookups and printing included, against the imported table
+    from BPAmainExperimental import find_best_position_fit, find_ideal_player_match
+    user_stats = dict(zip(STAT_KEYS, user_matrix[0]))
+    positions = [dict(zip(STAT_KEYS, map(float, row))) for row in centroids]
+    with contextlib.redirect_stdout(io.StringIO()):
+        fit_timing = time_call(lambda: find_best_position_fit(user_stats, positions, db_name=db_path), 20)
+        match_timing = time_call(lambda: find_ideal_player_match(
+            user_stats, db_name=db_path, csv_filepath=csv_path, index_path=import_kwargs['index_path']), 20)
+    record('find_best_position_fit', rows, fit_timing)
+    record('find_ideal_player_match', rows, match_timing)
+
+    if rows > MAX_PAGE_ROWS:
+        print(f"  skipping page renders above {MAX_PAGE_ROWS} rows")
+        return results
+
+    original_dataset = app_module.datasets.current
+    app_module.datasets.swap(PlayerDataset.from_frame(canonical))
+    try:
+        client = app_module.app.test_client()
+        _log_in(client)
+        form = {**user_forms[0], 'compare_player': canonical['player_name'].iloc[0]}
+        record('GET /players', rows, time_call(lambda: client.get('/players'), 5))
+        record('GET /players?search', rows, time_call(lambda: client.get('/players?search=curry'), 5))
+        record('GET /analytics', rows, time_call(lambda: client.get('/analytics'), 5))
+        record('POST /analytics (results.html)', rows, time_call(lambda: client.post('/analytics', data=form), 5))
+    finally:
+        app_module.datasets.swap(original_dataset)
+
+    return results
+
+
+# Runs in a fresh interpreter, so module imports and the dataset load are both cold
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from my_flask_app.app import app
+imported = time.perf_counter()
+app.test_client().get('/players')
+print(json.dumps({'import_s': imported - start, 'first_request_s': time.perf_counter() - imported}))
+"""
+
+
+def measure_startup(runs=5):
+    """
+    Times cold starts of the web app in fresh interpreters.
+
+    Returns:
+        dict: Median seconds to import my_flask_app.app ('import_s') and to then serve
+        the first /players request ('first_request_s').
+    """
+    work_dir = tempfile.mkdtemp(prefix='bpa-startup-')
+    env = dict(os.environ, USERS_DATABASE_URL=f"sqlite:///{os.path.join(work_dir, 'startup_users.db')}")
+    samples = []
+    try:
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, '-c', STARTUP_PROBE, BASE_DIR], env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {key: statistics.median(sample[key] for sample in samples) for key in ('import_s', 'first_request_s')}
+
+
+def _latency_summary(samples):
+    samples = sorted(samples)
+    return {
+        'requests': len(samples),
+        'p50_s': samples[len(samples) // 2],
+        'p95_s': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def measure_login_storm(concurrency=16, requests=100):
+    """
+    Times GET /players on its own and again while concurrency threads keep logging in.
+
+    Every thread gets its own test client, like gunicorn's threaded workers, so sign-ins
+    compete with /players for CPU only through the password hashing pool. Compare runs
+    with different PASSWORD_HASH_WORKERS / PASSWORD_HASH_QUEUE settings.
+
+    Returns:
+        dict: 'baseline' and 'storm' /players latencies (p50_s, p95_s) and the storm's
+        login outcomes ('logins_ok', 'logins_rejected').
+    """
+    import threading
+
+    work_dir = tempfile.mkdtemp(prefix='bpa-storm-')
+    try:
+        app_module = _load_app(work_dir)
+        app_module.datasets.warm()
+        _log_in(app_module.app.test_client())
+        credentials = {'username': 'benchmark', 'password': 'benchmark'}
+
+        def time_players():
+            client = app_module.app.test_client()
+            samples = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                client.get('/players')
+                samples.append(time.perf_counter() - start)
+            return _latency_summary(samples)
+
+        baseline = time_players()
+
+        stop = threading.Event()
+        outcomes = {'logins_ok': 0, 'logins_rejected': 0}
+        outcomes_lock = threading.Lock()
+
+        def log_in_repeatedly():
+            client = app_module.app.test_client()
+            while not stop.is_set():
+                response = client.post('/login', data=credentials)
+                with outcomes_lock:
+                    outcomes['logins_rejected' if response.status_code == 503 else 'logins_ok'] += 1
+                if response.status_code == 503:
+                    # Turned-away clients come back after Retry-After, as browsers and scripts should
+                    stop.wait(float(response.headers.get('Retry-After', 1)))
+                else:
+                    client.get('/logout')
+
+        threads = [threading.Thread(target=log_in_repeatedly) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)
+        try:
+            storm = time_players()
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {'baseline': baseline, 'storm': storm, **outcomes}
+
+
+def measure_similarity_metrics(scales=SCALES, seed=0):
+    """
+    Times twin matching under each similarity metric on the same players and queries.
+
+    Every metric is folded into the index's player matrix up front, so single-query
+    latency and batch throughput should match across them.
+
+    Returns:
+        list: One dict per (scale, metric) with 'single_s' (median seconds for one
+        query) and 'batch_qps' (queries per second over MATCH_BATCH_SIZE queries).
+    """
+    from init_db import COLUMN_MAPPING
+    from player_dataset import canonicalize_players_dataframe
+    from similarity_index import SIMILARITY_METRICS, PlayerSimilarityIndex
+
+    rng = np.random.default_rng(seed)
+    results = []
+    for scale in scales:
+        raw = make_raw_players(scale, rng).rename(columns=COLUMN_MAPPING)
+        canonical = canonicalize_players_dataframe(raw.loc[:, ~raw.columns.duplicated()].fillna(0))
+        base = PlayerSimilarityIndex.from_dataframe(canonical)
+        queries = make_user_batch(MATCH_BATCH_SIZE, rng)[0]
+        for metric in SIMILARITY_METRICS:
+            index = base.with_metric(metric, {'pts': 2.0, 'ast': 1.5} if metric == 'weighted' else None)
+            single = time_call(lambda: index.top_k(queries[0], k=3), 50)
+            batch = time_call(lambda: index.top_k_batch(queries, k=3), 5)
+            results.append({
+                'scale': scale,
+                'rows': len(index),
+                'metric': metric,
+                'single_s': single['median_s'],
+                'batch_qps': len(queries) / batch['median_s'],
+            })
+    return results
+
+
+def run_benchmarks(scales, output_path, seed=0):
+    """Runs every scale and writes the results as JSON to output_path."""
+    work_dir = tempfile.mkdtemp(prefix='bpa-bench-')
+    try:
+        app_module = _load_app(work_dir)
+        rng = np.random.default_rng(seed)
+        results = []
+        for scale in scales:
+            print(f"\n--- Scale {scale}x ---")
+            results.extend(run_scale(scale, app_module, work_dir, rng))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scales': scales,
+        'results': results,
+    }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output_path}")
+    return report
+
+
+def compare_reports(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Lines up two benchmark reports by (case, scale) and flags slowdowns.
+
+    Returns:
+        list: (case, scale, baseline median, current median, ratio) for every case whose
+        median grew by more than threshold.
+    """
+    previous = {(r['case'], r['scale']): r for r in baseline['results']}
+    regressions = []
+    print(f"\n{'case':<34} {'scale':>6} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for result in current['results']:
+        before = previous.get((result['case'], result['scale']))
+        if before is None or before['median_s'] == 0:
+            continue
+        ratio = result['median_s'] / before['median_s']
+        flag = '  SLOWER' if ratio > 1 + threshold else ''
+        print(f"{result['case']:<34} {result['scale']:>6} {before['median_s'] * 1000:12.2f} "
+              f"{result['median_s'] * 1000:12.2f} {ratio - 1:+8.1%}{flag}")
+        if flag:
+            regressions.append((result['case'], result['scale'], before['median_s'], result['median_s'], ratio))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the analytics hot paths on synthetic player tables.")
+    parser.add_argument('--scales', help="Comma-separated multiples of nba_stats.csv to generate "
+                                          "(default: 1,100).")
+    parser.add_argument('--output', default=RESULTS_FILE, help="Where to write the JSON results.")
+    parser.add_argument('--startup', action='store_true',
+                        help="Only time cold starts of the web app (import + first request).")
+    parser.add_argument('--login-storm', action='store_true',
+                        help="Only time GET /players with and without concurrent logins.")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Only time twin matching under each similarity metric.")
+    parser.add_argument('--compare', metavar='BASELINE', help="Earlier results file to check for slowdowns.")
+    parser.add_argument('--current', metavar='RESULTS',
+                        help="Compare this existing results file instead of running the suite.")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Fractional slowdown that counts as a regression (default: 0.20).")
+    args = parser.parse_args()
+    scales = [int(scale) for scale in args.scales.split(',')] if args.scales else None
+
+    if args.startup:
+        timings = measure_startup()
+        print(f"import {timings['import_s'] * 1000:.0f} ms, first /players {timings['first_request_s'] * 1000:.0f} ms")
+        sys.exit(0)
+
+    if args.login_storm:
+        storm = measure_login_storm()
+        for phase in ('baseline', 'storm'):
+            timing = storm[phase]
+            print(f"{phase:<9} /players p50 {timing['p50_s'] * 1000:7.1f} ms  p95 {timing['p95_s'] * 1000:7.1f} ms")
+        print(f"logins during storm: {storm['logins_ok']} served, {storm['logins_rejected']} turned away (503)")
+        sys.exit(0)
+
+    if args.metrics:
+        for timing in measure_similarity_metrics(scales or SCALES):
+            print(f"{timing['rows']:>8} rows  {timing['metric']:<12} one query {timing['single_s'] * 1000:7.3f} ms  "
+                  f"batch {timing['batch_qps']:>10,.0f} queries/sec")
+        sys.exit(0)
+
+    if args.current:
+        with open(args.current, encoding='utf-8') as f:
+            current_report = json.load(f)
+    else:
+        current_report = run_benchmarks(scales or SCALES, args.output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline_report = json.load(f)
+        slowdowns = compare_reports(baseline_report, current_report, args.threshold)
+        if slowdowns:
+            print(f"\n{len(slowdowns)} case(s) slowed down by more than {args.threshold:.0%}.")
+            sys.exit(1)
+        print("\nNo regressions found.")
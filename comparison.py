@@ -0,0 +1,106 @@
+from functools import lru_cache
+
+import numpy as np
+
+from position_engine import STAT_COLUMNS
+
+# Row layout for the (user, player) matrix: the nine radar stats, then the context columns
+COMPARISON_COLUMNS = STAT_COLUMNS + ['minutes', 'fg_attempts', 'ft_attempts']
+COL = {name: i for i, name in enumerate(COMPARISON_COLUMNS)}
+
+PER_POINT_STATS = ['ast', 'trb', 'stl', 'blk', 'tov', 'pf']
+PER_36_STATS = ['pts', 'ast', 'trb', 'stl', 'blk', 'tov']
+
+# Multipliers that put each radar axis on a rough 1-10 scale (percentages x10, points / 4)
+RADAR_SCALE = np.array([10.0 if col in ('fg_pct', 'three_p_pct') else 0.25 if col == 'pts' else 1.0
+                        for col in STAT_COLUMNS])
+
+STANDARD_MINUTES = 36
+
+# Inputs are rounded to this many decimals before hashing, so 25 and 25.000001 share a result
+QUANTIZE_DECIMALS = 4
+COMPARISON_CACHE_SIZE = 4096
+
+
+def _quantize(values):
+    return tuple(round(float(value or 0.0), QUANTIZE_DECIMALS) for value in values)
+
+
+def _or_none(value):
+    return float(value) if np.isfinite(value) else None
+
+
+def _ratios(matrix):
+    """Player / user for each column, or None where either side is missing or the user's is 0."""
+    user, player = matrix
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(np.isfinite(user) & np.isfinite(player) & (user != 0), player / user, np.nan)
+    return ratios
+
+
+def _rows(stats, matrix):
+    ratios = _ratios(matrix)
+    return [
+        {'stat': stat, 'user': _or_none(matrix[0, i]), 'player': _or_none(matrix[1, i]), 'ratio': _or_none(ratios[i])}
+        for i, stat in enumerate(stats)
+    ]
+
+
+@lru_cache(maxsize=COMPARISON_CACHE_SIZE)
+def _compare(user_key, player_name, player_key):
+    table = np.array([user_key, player_key], dtype=np.float64)
+    pts = table[:, COL['pts']]
+    minutes = table[:, COL['minutes']]
+    minutes = np.where(minutes != 0, minutes, STANDARD_MINUTES)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_point_cols = [COL[stat] for stat in PER_POINT_STATS]
+        per_point = np.where(pts[:, None] != 0, table[:, per_point_cols] / pts[:, None], np.nan)
+
+        per_36 = table[:, [COL[stat] for stat in PER_36_STATS]] / minutes[:, None] * STANDARD_MINUTES
+
+        shot_attempts = 2 * (table[:, COL['fg_attempts']] + 0.44 * table[:, COL['ft_attempts']])
+        true_shooting = np.where(shot_attempts != 0, pts / shot_attempts, np.nan)
+
+        # No turnovers leaves A/TO undefined; the template shows that as infinity
+        tov = table[:, COL['tov']]
+        assist_to_turnover = np.where(tov != 0, table[:, COL['ast']] / tov, np.nan)
+
+    radar = table[:, :len(STAT_COLUMNS)] * RADAR_SCALE
+    ato_ratio = _ratios(assist_to_turnover[:, None])[0]
+
+    return {
+        'player_name': player_name,
+        'radar': {'user': radar[0].tolist(), 'player': radar[1].tolist()},
+        'per_point': _rows(PER_POINT_STATS, per_point),
+        'per_36': _rows(PER_36_STATS, per_36),
+        'true_shooting': {'user': _or_none(true_shooting[0]), 'player': _or_none(true_shooting[1])},
+        'assist_to_turnover': {
+            'user': _or_none(assist_to_turnover[0]),
+            'player': _or_none(assist_to_turnover[1]),
+            'ratio': _or_none(ato_ratio),
+        },
+    }
+
+
+def compare_to_player(user_stats, player):
+    """
+    Every derived metric results.html shows for one user / NBA player pair.
+
+    Both stat lines go through one (2 x 12) NumPy pass: per-point ratios, per-36
+    scaling, true shooting, assist-to-turnover and the radar chart axes. Results are
+    memoized on the quantized stat vectors, so resubmitting the same comparison skips
+    the math. The returned dict is shared between callers and must not be modified.
+
+    Args:
+        user_stats (dict): Web form stats keyed by STAT_COLUMNS plus minutes, fg_attempts
+            and ft_attempts.
+        player (dict): An NBA player as returned by normalize_compare_player (minutes as 'mp').
+
+    Returns:
+        dict: radar, per_point, per_36, true_shooting and assist_to_turnover entries.
+            Values that can't be computed (e.g. zero points) are None.
+    """
+    user_key = _quantize(user_stats.get(col) for col in COMPARISON_COLUMNS)
+    player_key = _quantize(player.get('mp' if col == 'minutes' else col) for col in COMPARISON_COLUMNS)
+    return _compare(user_key, player['player_name'], player_key)
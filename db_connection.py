@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import threading
+from urllib.parse import quote
+
+import pandas as pd
+
+from metrics import SQLITE_QUERY_SECONDS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Read-side tuning applied to every connection: map up to 256MB of the file and keep a
+# 16MB page cache, and refuse writes even if a caller slips one through
+READ_PRAGMAS = (
+    "PRAGMA query_only = ON",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -16384",
+)
+
+# Kept as one constant so every lookup reuses the connection's cached prepared statement
+PLAYER_BY_NAME_SQL = "SELECT * FROM nba_players WHERE player_name = ?"
+
+_local = threading.local()
+
+# Bumped by invalidate_connections(); threads holding an older generation reopen on next use
+_generation = 0
+
+
+def _resolve(path):
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+def _thread_connections():
+    # SQLite connections must not cross a fork (gunicorn --preload), so start over in a new process
+    if getattr(_local, 'pid', None) != os.getpid():
+        _local.pid = os.getpid()
+        _local.connections = {}
+    elif getattr(_local, 'generation', None) != _generation:
+        for conn in _local.connections.values():
+            conn.close()
+        _local.connections = {}
+    _local.generation = _generation
+    return _local.connections
+
+
+def invalidate_connections():
+    """
+    Makes every thread reopen its connections on next use.
+
+    Needed when a database file is replaced rather than written in place, since an
+    open connection keeps reading the old file.
+    """
+    global _generation
+    _generation += 1
+
+
+def get_connection(db_name='basketball.db'):
+    """
+    Returns this thread's read-only connection to db_name, opening it on first use.
+
+    Connections are opened with a mode=ro URI and kept for the life of the thread, so
+    the per-query connect/close cost disappears from the request path.
+    """
+    path = _resolve(db_name)
+    connections = _thread_connections()
+    conn = connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(f"file:{quote(path)}?mode=ro", uri=True, cached_statements=256)
+        for pragma in READ_PRAGMAS:
+            conn.execute(pragma)
+        connections[path] = conn
+    return conn
+
+
+def query(sql, params=(), db_name='basketball.db'):
+    """Runs a read query and returns all rows as tuples."""
+    with SQLITE_QUERY_SECONDS.time('query'):
+        return get_connection(db_name).execute(sql, params).fetchall()
+
+
+def read_frame(sql, params=(), db_name='basketball.db'):
+    """Runs a read query and returns the result as a DataFrame."""
+    with SQLITE_QUERY_SECONDS.time('read_frame'):
+        return pd.read_sql_query(sql, get_connection(db_name), params=params)
+
+
+def fetch_player_by_name(player_name, db_name='basketball.db'):
+    """
+    Looks up one player by exact name.
+
+    Returns:
+        dict: Column name to value for the first matching row, or None if not found.
+    """
+    with SQLITE_QUERY_SECONDS.time('fetch_player_by_name'):
+        cursor = get_connection(db_name).execute(PLAYER_BY_NAME_SQL, (player_name,))
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip((description[0] for description in cursor.description), row))
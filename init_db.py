@@ -1,102 +1,297 @@
-import sqlite3
-import pandas as pd
-import os
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-def import_csv_to_sql(csv_filepath='nba_stats.csv', db_name='basketball.db'):
-    """
-    Imports NBA player statistics from a CSV file into a SQLite database.
-
-    This function performs the following steps:
-    1. Loads a raw basketball statistics CSV.
-    2. Maps non-standard or character-heavy headers (e.g., '3P%') to SQL-friendly names.
-    3. Handles missing values (NaN) that occur when players have zero attempts in a category.
-    4. Appends the cleaned data into the 'nba_players' table in the target database.
-
-    Args:
-        csv_filepath (str): The path to the source CSV file. Defaults to 'nba_stats.csv'.
-        db_name (str): The name of the SQLite database file. Defaults to 'basketball.db'.
-
-    Returns:
-        None
-
-    Raises:
-        FileNotFoundError: If the specified CSV file does not exist.
-        sqlite3.Error: If there is an issue connecting to or writing to the database.
-    """
-    
-    # Check if file exists before processing to provide a clear error message
-    csv_filepath = csv_filepath if os.path.isabs(csv_filepath) else os.path.join(BASE_DIR, csv_filepath)
-    db_name = db_name if os.path.isabs(db_name) else os.path.join(BASE_DIR, db_name)
-
-    if not os.path.exists(csv_filepath):
-        print(f"Error: The file '{csv_filepath}' was not found.")
-        return
-
-    try:
-        # Establish connection to the SQLite database
-        conn = sqlite3.connect(db_name)
-        
-        # Load raw data into a pandas DataFrame
-        df = pd.read_csv(csv_filepath)
-
-        # Dictionary mapping CSV headers to clean, standardized SQL column names.
-        # This ensures consistency for future SQL queries (avoiding %, -, and spaces).
-        mapping = {
-            'Rk': 'rk',
-            'Player': 'player_name',
-            'Position': 'position',
-            'Game': 'games_played',
-            'Games Started': 'games_started',
-            'Mins Played': 'mins_played',
-            'Field Goals': 'field_goals',
-            'Field Goal Attempts': 'fg_attempts',
-            'Field Goal Percentage': 'fg_pct',
-            '3-Point Field Goals': 'three_p_made',
-            '3-Point Field Goal Attempts': 'three_p_attempts',
-            '3P%': 'three_p_pct',
-            '2P': 'two_p_made',
-            '2PA': 'two_p_attempts',
-            '2P%': 'two_p_pct',
-            'eFG%': 'efg_pct',
-            'FT': 'ft_made',
-            'FTA': 'ft_attempts',
-            'FT%': 'ft_pct',
-            'ORB': 'orb',
-            'DRB': 'drb',
-            'TRB': 'trb',
-            'AST': 'ast',
-            'STL': 'stl',
-            'BLK': 'blk',
-            'TOV': 'tov',
-            'PF': 'pf',
-            'Points': 'pts',
-            'Awards': 'awards'
-        }
-
-        # Rename columns based on the mapping defined above
-        df = df.rename(columns=mapping)
-        
-        # Handle players who did not take a shot in a specific category (e.g., 3P%).
-        # Pandas loads these as NaN (Not a Number), which can break math operations.
-        # Filling with 0 ensures the database remains numeric and queryable.
-        df = df.fillna(0)
-
-        # Write the cleaned DataFrame to the 'nba_players' table.
-        # 'if_exists=replace' keeps deploys idempotent so the build does not duplicate rows.
-        df.to_sql('nba_players', conn, if_exists='replace', index=False)
-        
-        print(f"Successfully imported {len(df)} players with all attributes.")
-
-    except sqlite3.Error as e:
-        print(f"Database error: {e}")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-    finally:
-        # Ensure the connection is closed even if an error occurs
-        if conn:
-            conn.close()
-
-if __name__ == "__main__":
-    import_csv_to_sql()
\ No newline at end of file
+import argparse
+import sqlite3
+import pandas as pd
+import os
+
+from average_stat import csv_fingerprint, refresh_position_centroids, stored_centroids_current
+from db_connection import read_frame
+from player_dataset import SNAPSHOT_DIR, build_dataset, snapshot_is_current, write_snapshot
+from season_store import CURRENT_SEASON, STORE_DIR, season_is_current, write_season
+from similarity_index import INDEX_FILE, build_similarity_index, index_is_current
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Rows read from the CSV per chunk, so memory stays flat however large the file gets
+CHUNK_SIZE = 5000
+
+# Dictionary mapping CSV headers to clean, standardized SQL column names.
+# This ensures consistency for future SQL queries (avoiding %, -, and spaces).
+COLUMN_MAPPING = {
+    'Rk': 'rk',
+    'Player': 'player_name',
+    'Position': 'position',
+    'Pos': 'position',
+    'Game': 'games_played',
+    'G': 'games_played',
+    'Games Started': 'games_started',
+    'GS': 'games_started',
+    'Mins Played': 'mins_played',
+    'MP': 'mins_played',
+    'Field Goals': 'field_goals',
+    'FG': 'field_goals',
+    'Field Goal Attempts': 'fg_attempts',
+    'FGA': 'fg_attempts',
+    'Field Goal Percentage': 'fg_pct',
+    'FG%': 'fg_pct',
+    '3-Point Field Goals': 'three_p_made',
+    '3P': 'three_p_made',
+    '3-Point Field Goal Attempts': 'three_p_attempts',
+    '3PA': 'three_p_attempts',
+    '3P%': 'three_p_pct',
+    '2P': 'two_p_made',
+    '2PA': 'two_p_attempts',
+    '2P%': 'two_p_pct',
+    'eFG%': 'efg_pct',
+    'FT': 'ft_made',
+    'FTA': 'ft_attempts',
+    'FT%': 'ft_pct',
+    'ORB': 'orb',
+    'DRB': 'drb',
+    'TRB': 'trb',
+    'AST': 'ast',
+    'STL': 'stl',
+    'BLK': 'blk',
+    'TOV': 'tov',
+    'PF': 'pf',
+    'Points': 'pts',
+    'PTS': 'pts',
+    'Awards': 'awards'
+}
+
+# Explicit column types for the 'nba_players' table, in table order.
+# player_name is the stable key used to match rows between imports.
+PLAYER_SCHEMA = [
+    ('rk', 'INTEGER'),
+    ('player_name', 'TEXT'),
+    ('Age', 'INTEGER'),
+    ('Team', 'TEXT'),
+    ('position', 'TEXT'),
+    ('games_played', 'INTEGER'),
+    ('games_started', 'INTEGER'),
+    ('mins_played', 'REAL'),
+    ('field_goals', 'REAL'),
+    ('fg_attempts', 'REAL'),
+    ('fg_pct', 'REAL'),
+    ('three_p_made', 'REAL'),
+    ('three_p_attempts', 'REAL'),
+    ('three_p_pct', 'REAL'),
+    ('two_p_made', 'REAL'),
+    ('two_p_attempts', 'REAL'),
+    ('two_p_pct', 'REAL'),
+    ('efg_pct', 'REAL'),
+    ('ft_made', 'REAL'),
+    ('ft_attempts', 'REAL'),
+    ('ft_pct', 'REAL'),
+    ('orb', 'REAL'),
+    ('drb', 'REAL'),
+    ('trb', 'REAL'),
+    ('ast', 'REAL'),
+    ('stl', 'REAL'),
+    ('blk', 'REAL'),
+    ('tov', 'REAL'),
+    ('pf', 'REAL'),
+    ('pts', 'REAL'),
+    ('awards', 'TEXT'),
+]
+PLAYER_COLUMNS = [name for name, _ in PLAYER_SCHEMA]
+PLAYER_KEY = 'player_name'
+
+
+def create_players_table(conn):
+    """Creates the typed 'nba_players' table and its lookup indexes if they are missing."""
+    column_defs = ",\n".join(
+        f'"{name}" {sql_type}{" NOT NULL" if name == PLAYER_KEY else ""}' for name, sql_type in PLAYER_SCHEMA
+    )
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS nba_players (
+            {column_defs},
+            row_hash TEXT NOT NULL
+        )
+    ''')
+    conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_nba_players_name ON nba_players({PLAYER_KEY})")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_nba_players_position ON nba_players(position)")
+
+
+def _has_typed_schema(conn):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(nba_players)")}
+    return not columns or 'row_hash' in columns
+
+
+def clean_chunk(chunk):
+    """
+    Renames and types one chunk of raw CSV rows to match PLAYER_SCHEMA.
+
+    Players who did not take a shot in a category (e.g., 3P%) come through as NaN,
+    which can break math operations, so numeric gaps are filled with 0 and text gaps
+    with an empty string. Each row also gets a hash of its cleaned values so unchanged
+    rows can be skipped on the next import.
+    """
+    chunk = chunk.rename(columns=COLUMN_MAPPING)
+    chunk = chunk.loc[:, ~chunk.columns.duplicated()]
+    cleaned = pd.DataFrame(index=chunk.index)
+    for name, sql_type in PLAYER_SCHEMA:
+        values = chunk[name] if name in chunk.columns else pd.Series(None, index=chunk.index, dtype=object)
+        if sql_type == 'TEXT':
+            cleaned[name] = values.fillna('').astype(str).str.strip()
+        else:
+            numeric = pd.to_numeric(values, errors='coerce').fillna(0)
+            cleaned[name] = numeric.round().astype('int64') if sql_type == 'INTEGER' else numeric.astype(float)
+
+    cleaned = cleaned[cleaned[PLAYER_KEY] != '']
+    cleaned['row_hash'] = [f"{h:016x}" for h in pd.util.hash_pandas_object(cleaned, index=False)]
+    return cleaned
+
+
+def import_csv_to_sql(csv_filepath='nba_stats.csv', db_name='basketball.db', full_rebuild=False,
+                      index_path=INDEX_FILE, store_dir=STORE_DIR, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Imports NBA player statistics from a CSV file into a SQLite database.
+
+    This function performs the following steps:
+    1. Streams the raw basketball statistics CSV in chunks of CHUNK_SIZE rows.
+    2. Maps non-standard or character-heavy headers (e.g., '3P%') to SQL-friendly names.
+    3. Handles missing values (NaN) that occur when players have zero attempts in a category.
+    4. Upserts the cleaned rows into the typed 'nba_players' table by player name, skipping
+       rows whose hash is unchanged and deleting players no longer in the CSV.
+    5. Refreshes the 'position_centroids' table for the CSV's current content hash.
+    6. Rebuilds the player similarity index used for "closest NBA twin" lookups.
+    7. Rewrites the CURRENT_SEASON partition of the multi-season store.
+    8. Writes the web app's dataset snapshot, which its workers memory-map instead of reading the table.
+    Steps 5-8 are skipped when no rows changed and that output already matches the
+    current CSV (or, for the snapshot, the current database file).
+
+    Args:
+        csv_filepath (str): The path to the source CSV file. Defaults to 'nba_stats.csv'.
+        db_name (str): The name of the SQLite database file. Defaults to 'basketball.db'.
+        full_rebuild (bool): Drop and recreate the table instead of updating it in place.
+            Also happens automatically when an older untyped table is found.
+        index_path (str): Where to write the similarity index. Defaults to 'player_index.npz'.
+        store_dir (str): Root of the multi-season store. Defaults to 'season_store'.
+        snapshot_dir (str): Where to write the dataset snapshot. Defaults to 'dataset_snapshot'.
+
+    Returns:
+        None
+
+    Raises:
+        FileNotFoundError: If the specified CSV file does not exist.
+        sqlite3.Error: If there is an issue connecting to or writing to the database.
+    """
+
+    # Check if file exists before processing to provide a clear error message
+    csv_filepath = csv_filepath if os.path.isabs(csv_filepath) else os.path.join(BASE_DIR, csv_filepath)
+    db_name = db_name if os.path.isabs(db_name) else os.path.join(BASE_DIR, db_name)
+
+    if not os.path.exists(csv_filepath):
+        print(f"Error: The file '{csv_filepath}' was not found.")
+        return
+
+    conn = None
+    try:
+        # Establish connection to the SQLite database
+        conn = sqlite3.connect(db_name)
+
+        quoted_columns = ", ".join(f'"{name}"' for name in PLAYER_COLUMNS + ['row_hash'])
+        placeholders = ", ".join("?" for _ in range(len(PLAYER_COLUMNS) + 1))
+        updates = ", ".join(f'"{name}" = excluded."{name}"' for name in PLAYER_COLUMNS + ['row_hash'] if name != PLAYER_KEY)
+        upsert_sql = (
+            f"INSERT INTO nba_players ({quoted_columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT({PLAYER_KEY}) DO UPDATE SET {updates}"
+        )
+
+        # One transaction for the whole import, so readers never see a half-updated table
+        with conn:
+            if full_rebuild or not _has_typed_schema(conn):
+                conn.execute("DROP TABLE IF EXISTS nba_players")
+            create_players_table(conn)
+
+            stored_hashes = dict(conn.execute(f"SELECT {PLAYER_KEY}, row_hash FROM nba_players"))
+            seen = set()
+            written = 0
+
+            for chunk in pd.read_csv(csv_filepath, chunksize=CHUNK_SIZE):
+                cleaned = clean_chunk(chunk)
+                seen.update(cleaned[PLAYER_KEY])
+                changed = cleaned[cleaned[PLAYER_KEY].map(stored_hashes) != cleaned['row_hash']]
+                if not changed.empty:
+                    conn.executemany(upsert_sql, changed.astype(object).itertuples(index=False, name=None))
+                    written += len(changed)
+
+            removed = [name for name in stored_hashes if name not in seen]
+            conn.executemany(f"DELETE FROM nba_players WHERE {PLAYER_KEY} = ?", ((name,) for name in removed))
+
+        print(f"Successfully imported {len(seen)} players with all attributes "
+              f"({written} written, {len(seen) - written} unchanged, {len(removed)} removed).")
+
+        # With no rows changed, each derived file is only rebuilt if it was made from
+        # another version of the CSV or database (or is missing)
+        unchanged = written == 0 and not removed
+        source_hash = csv_fingerprint(csv_filepath)
+        skipped = []
+
+        # Store per-position averages now so the apps never parse the CSV at startup
+        if unchanged and stored_centroids_current(csv_filepath, db_name):
+            skipped.append('position centroids')
+        else:
+            refresh_position_centroids(csv_filepath, db_name)
+
+        if unchanged and index_is_current(csv_filepath, index_path):
+            skipped.append('similarity index')
+        else:
+            build_similarity_index(db_name, csv_filepath, index_path)
+
+        if unchanged and season_is_current(CURRENT_SEASON, source_hash, store_dir):
+            skipped.append('season store')
+        else:
+            write_season(CURRENT_SEASON, read_frame("SELECT * FROM nba_players", db_name=db_name),
+                         store_dir=store_dir, source_hash=source_hash)
+
+        # Last, because the snapshot is tied to the database file as it is now
+        if unchanged and snapshot_is_current(db_name, snapshot_dir):
+            skipped.append('dataset snapshot')
+        else:
+            write_snapshot(build_dataset(db_name), db_name, snapshot_dir)
+
+        if skipped:
+            print(f"Skipped rebuilding the up-to-date {', '.join(skipped)}.")
+
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+    finally:
+        # Ensure the connection is closed even if an error occurs
+        if conn:
+            conn.close()
+
+def import_season_archive(csv_filepath, season):
+    """
+    Adds a past season's CSV to the multi-season store without touching 'nba_players'.
+
+    Args:
+        csv_filepath (str): The path to that season's stats CSV.
+        season (int): Year the season ends in, e.g. 2024 for 2023-24.
+    """
+    csv_filepath = csv_filepath if os.path.isabs(csv_filepath) else os.path.join(BASE_DIR, csv_filepath)
+    if not os.path.exists(csv_filepath):
+        print(f"Error: The file '{csv_filepath}' was not found.")
+        return
+
+    players = pd.concat(
+        [clean_chunk(chunk) for chunk in pd.read_csv(csv_filepath, chunksize=CHUNK_SIZE)],
+        ignore_index=True
+    )
+    write_season(season, players, source_hash=csv_fingerprint(csv_filepath))
+    print(f"Stored {len(players)} players for the {season - 1}-{str(season)[-2:]} season.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build basketball.db and the season store from NBA stats CSVs.")
+    parser.add_argument('csv', nargs='?', default='nba_stats.csv', help="Stats CSV to import.")
+    parser.add_argument('--season', type=int, default=CURRENT_SEASON,
+                        help="Year the CSV's season ends in. Past seasons only go to the season store.")
+    parser.add_argument('--full', action='store_true', help="Rebuild 'nba_players' from scratch.")
+    args = parser.parse_args()
+
+    if args.season == CURRENT_SEASON:
+        import_csv_to_sql(args.csv, full_rebuild=args.full)
+    else:
+        import_season_archive(args.csv, args.season)
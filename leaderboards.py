@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+
+from player_dataset import BASE_DIR, db_signature, load_dataset
+from position_engine import INVERSE_STATS, POSITION_CODES, POSITION_NAMES, STAT_COLUMNS
+
+# Players kept per (stat, position) board; lookups can ask for any k up to this
+LEADERBOARD_SIZE = 10
+
+# Accepts either the CLI's position names or the table's codes
+POSITION_ALIASES = dict(zip(POSITION_NAMES, POSITION_CODES), **{code: code for code in POSITION_CODES})
+
+# Boards per dataset version, and the boards last loaded for each database file
+_boards_by_version = {}
+_loaded_boards = {}
+
+
+def _top_rows(key, size):
+    """Row ids of the `size` smallest keys, ties broken by row order (as idxmax/idxmin do)."""
+    if len(key) > size:
+        # Keep every row tied with the cutoff value, so the stable sort below sees them all
+        cutoff = np.partition(key, size - 1)[size - 1]
+        candidates = np.flatnonzero(key <= cutoff)
+    else:
+        candidates = np.arange(len(key))
+    return candidates[np.argsort(key[candidates], kind='stable')[:size]]
+
+
+class StatLeaderboards:
+    """
+    Top players for every stat, league-wide and within each position.
+
+    Every (stat, position) board is ranked once when the object is built: highest
+    first, except INVERSE_STATS where lowest is best. Looking up a board is then a
+    dict access, however many players the dataset has.
+    """
+
+    def __init__(self, names, positions, stats, size=LEADERBOARD_SIZE):
+        names = np.asarray(names)
+        positions = np.asarray(positions)
+        groups = [(None, np.arange(len(names)))]
+        groups += [(code, np.flatnonzero(positions == code)) for code in POSITION_CODES]
+
+        self.size = size
+        self._boards = {}
+        for j, stat in enumerate(STAT_COLUMNS):
+            values = np.asarray(stats[:, j], dtype=np.float64)
+            key = values if stat in INVERSE_STATS else -values
+            # Missing values rank last in either direction
+            key = np.where(np.isnan(key), np.inf, key)
+            for position, rows in groups:
+                top = rows[_top_rows(key[rows], size)]
+                self._boards[(stat, position)] = tuple(str(name) for name in names[top])
+
+    @classmethod
+    def from_dataset(cls, dataset, size=LEADERBOARD_SIZE):
+        """Builds the boards from a PlayerDataset, whose first columns are STAT_COLUMNS."""
+        return cls(dataset.names, dataset.positions, dataset.stats, size)
+
+    def top(self, stat, position=None, k=3):
+        """
+        The k best players at one stat.
+
+        Args:
+            stat (str): A STAT_COLUMNS name.
+            position (str): A position code or name, or None for the whole league.
+            k (int): How many names to return, at most LEADERBOARD_SIZE.
+
+        Returns:
+            tuple: Player names, best first. Empty for an unknown stat or position.
+        """
+        if position is not None:
+            position = POSITION_ALIASES.get(position)
+            if position is None:
+                return ()
+        return self._boards.get((stat, position), ())[:k]
+
+
+def leaderboards_for(dataset):
+    """The boards for a PlayerDataset, built once per dataset version."""
+    boards = _boards_by_version.get(dataset.version)
+    if boards is None:
+        boards = StatLeaderboards.from_dataset(dataset)
+        # Only the newest versions are looked up again, so older ones are dropped
+        if len(_boards_by_version) >= 4:
+            _boards_by_version.pop(next(iter(_boards_by_version)))
+        _boards_by_version[dataset.version] = boards
+    return boards
+
+
+def load_leaderboards(db_name='basketball.db'):
+    """
+    The boards for the current contents of db_name, for callers without a loaded dataset.
+
+    The dataset is only reloaded (from its memory-mapped snapshot when one matches) after
+    the database file changes.
+    """
+    path = db_name if os.path.isabs(db_name) else os.path.join(BASE_DIR, db_name)
+    signature = db_signature(path)
+    loaded = _loaded_boards.get(path)
+    if loaded is None or loaded[0] != signature:
+        loaded = _loaded_boards[path] = (signature, leaderboards_for(load_dataset(path)))
+    return loaded[1]
@@ -0,0 +1,177 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds, tuned for a small Flask app: 0.5ms lookups up to 10s page loads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Every metric created in this process, in the order /metrics lists them
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_float(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Histogram:
+    """
+    Minimal Prometheus-style latency histogram.
+
+    observe() walks a dozen buckets and does a few additions under a lock, so timing
+    every request and query costs around a microsecond. Counts are per process; under gunicorn each worker reports its own series.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, seconds, *labelvalues):
+        """Records one duration for the given label values (in labelnames order)."""
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # One slot per bucket, then the running sum and total count
+                series = self._series[labelvalues] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += seconds
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labelvalues):
+        """Times the with-block and records it, even if the block raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def collect(self):
+        """Returns this histogram in the Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+
+        for labelvalues, series in sorted(snapshot.items()):
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labelvalues)]
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = ",".join(pairs + [f'le="{_format_float(bound)}"'])
+                lines.append(f"{self.name}_bucket{{{labels}}} {cumulative}")
+            labels = ",".join(pairs + ['le="+Inf"'])
+            lines.append(f"{self.name}_bucket{{{labels}}} {series[-1]}")
+            labels = f"{{{','.join(pairs)}}}" if pairs else ''
+            lines.append(f"{self.name}_sum{labels} {_format_float(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return "\n".join(lines)
+
+
+class Gauge:
+    """
+    Prometheus-style gauge: a value that goes up and down, such as a queue depth.
+
+    Shares the Histogram's per-process label-tuple layout, one float per series.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # An unlabeled series is reported as 0 before its first change
+        self._values = {} if self.labelnames else {(): 0}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, amount=1, *labelvalues):
+        self.inc(-amount, *labelvalues)
+
+    def value(self, *labelvalues):
+        with self._lock:
+            return self._values.get(labelvalues, 0)
+
+    def collect(self):
+        """Returns this gauge in the Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for labelvalues, value in sorted(snapshot.items()):
+            pairs = [f'{name}="{_escape(label)}"' for name, label in zip(self.labelnames, labelvalues)]
+            labels = f"{{{','.join(pairs)}}}" if pairs else ''
+            lines.append(f"{self.name}{labels} {_format_float(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Gauge):
+    """A gauge that only goes up, reported with the counter type."""
+
+    kind = 'counter'
+
+    def dec(self, amount=1, *labelvalues):
+        raise ValueError("counters can only go up")
+
+
+def render_metrics():
+    """All registered metrics as one Prometheus text payload."""
+    return "\n".join(metric.collect() for metric in REGISTRY) + "\n"
+
+
+REQUEST_SECONDS = Histogram(
+    'bpa_http_request_duration_seconds',
+    'Time spent handling a request, by route rule, method and status code.',
+    ('route', 'method', 'status'),
+)
+SQLALCHEMY_QUERY_SECONDS = Histogram(
+    'bpa_sqlalchemy_query_duration_seconds',
+    'Time spent executing SQLAlchemy statements against the users database, by statement type.',
+    ('statement',),
+)
+SQLITE_QUERY_SECONDS = Histogram(
+    'bpa_sqlite_query_duration_seconds',
+    'Time spent in raw sqlite3 reads against basketball.db, by helper.',
+    ('operation',),
+)
+TEMPLATE_RENDER_SECONDS = Histogram(
+    'bpa_template_render_duration_seconds',
+    'Time spent rendering Jinja templates, by template name.',
+    ('template',),
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    'bpa_password_hash_duration_seconds',
+    'Time spent computing password hashes on the hashing pool, by operation.',
+    ('operation',),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PASSWORD_HASH_WAIT_SECONDS = Histogram(
+    'bpa_password_hash_queue_wait_seconds',
+    'Time password hashes waited for a free hashing thread, by operation.',
+    ('operation',),
+)
+PASSWORD_HASH_PENDING = Gauge(
+    'bpa_password_hash_pending',
+    'Password hashes admitted to the hashing pool and not yet finished (queued plus running).',
+)
+PASSWORD_HASH_REJECTED = Counter(
+    'bpa_password_hash_rejected_total',
+    'Password hashes turned away because the hashing queue was full, by operation.',
+    ('operation',),
+)
@@ -1,19 +1,54 @@
-from flask import Flask, render_template, request, session, redirect, url_for, flash
+from flask import Flask, Response, g, make_response, render_template, request, redirect, url_for, flash, jsonify
+from flask import stream_with_context
+from flask import before_render_template, template_rendered
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
+import numpy as np
+import pandas as pd
+import hashlib
+import hmac
+import io
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+
+# The analysis modules live in the project root next to basketball.db
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
 try:
-    from .models import db, User, UserStats
+    from .models import db, User, UserStats, UserStatsHistory, DEFAULT_HISTORY_POINTS, MAX_HISTORY_POINTS
+    from .password_hashing import HashingBusy
+    from .identity_cache import cached_user_stats, identity_cache, load_cached_user
+    from .http_cache import StaticAssets, compress_response, not_modified, revalidated
 except ImportError:
-    from models import db, User, UserStats
-import pandas as pd
-import sqlite3
-from datetime import timedelta
+    from models import db, User, UserStats, UserStatsHistory, DEFAULT_HISTORY_POINTS, MAX_HISTORY_POINTS
+    from password_hashing import HashingBusy
+    from identity_cache import cached_user_stats, identity_cache, load_cached_user
+    from http_cache import StaticAssets, compress_response, not_modified, revalidated
+
+from average_stat import clear_centroid_cache, load_position_centroids
+from batch_analysis import analyze_lines, reset_workers
+from comparison import RADAR_SCALE, compare_to_player
+from db_connection import invalidate_connections
+from pagination import SORT_LABELS, decode_cursor
+from metrics import (REQUEST_SECONDS, SQLALCHEMY_QUERY_SECONDS, TEMPLATE_RENDER_SECONDS,
+                     render_metrics)
+from player_dataset import load_dataset
+from position_engine import STAT_COLUMNS, describe_fit, per_minute_vector, score_positions
+from season_store import load_season_store
+from similarity_index import forget_loaded_indexes
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this'  # Change this in production!
 app.permanent_session_lifetime = timedelta(hours=1)
 
 # ── SQLAlchemy config (stores users in a separate users.db) ──────────────────
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('USERS_DATABASE_URL', 'sqlite:///users.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
@@ -25,78 +60,232 @@ login_manager.login_message_category = 'info'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Cached per process, so authenticated page views don't each query users.db
+    return load_cached_user(int(user_id))
+
+# ── Create tables on first request ───────────────────────────────────────────
+# Done lazily so importing the app (and gunicorn --preload) never touches users.db
+_tables_ready = False
+_tables_lock = threading.Lock()
+
+@app.before_request
+def ensure_user_tables():
+    global _tables_ready
+    if _tables_ready:
+        return
+    with _tables_lock:
+        if not _tables_ready:
+            db.create_all()
+            _tables_ready = True
+
+# ── Instrumentation (served at /metrics) ────────────────────────────────────
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # Label by the route rule, not the raw path, so /api/players/<id> stays one series
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route, request.method, str(response.status_code))
+    return response
+
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def record_query_time(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    statement_type = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'UNKNOWN'
+    SQLALCHEMY_QUERY_SECONDS.observe(time.perf_counter() - started, statement_type)
 
-# ── Create tables on first run ───────────────────────────────────────────────
 with app.app_context():
-    db.create_all()
+    event.listen(db.engine, 'before_cursor_execute', start_query_timer)
+    event.listen(db.engine, 'after_cursor_execute', record_query_time)
+
+def start_render_timer(sender, template, context, **extra):
+    g.setdefault('render_started', []).append(time.perf_counter())
+
+def record_render_time(sender, template, context, **extra):
+    started = g.get('render_started')
+    if started:
+        TEMPLATE_RENDER_SECONDS.observe(time.perf_counter() - started.pop(), template.name or '<string>')
+
+before_render_template.connect(start_render_timer, app)
+template_rendered.connect(record_render_time, app)
+
+# ── HTTP caching and compression ─────────────────────────────────────────────
+# Registered after the request timer, so it runs first and the timer includes it
+app.after_request(compress_response)
+
+static_assets = StaticAssets(app.static_folder)
+app.view_functions['static'] = static_assets.response
+
+@app.url_defaults
+def fingerprint_static_urls(endpoint, values):
+    """Adds ?v=<content hash> to url_for('static', ...) so assets can be cached for a year."""
+    if endpoint == 'static' and 'filename' in values:
+        version = static_assets.version(values['filename'])
+        if version:
+            values['v'] = version
+
+def _folder_digest(*folders):
+    digest = hashlib.sha1()
+    for folder in folders:
+        for root, dirs, files in sorted(os.walk(folder)):
+            dirs.sort()
+            for name in sorted(files):
+                with open(os.path.join(root, name), 'rb') as f:
+                    digest.update(name.encode() + f.read())
+    return digest.hexdigest()[:12]
+
+# Part of every page ETag, so a deploy with new templates or assets isn't answered with a 304
+PAGE_VERSION = _folder_digest(os.path.join(app.root_path, app.template_folder), app.static_folder)
+
+def dataset_page(data, render, *versions):
+    """
+    Renders a page built only from the NBA dataset, the query string and who is signed in,
+    or answers 304 when the browser already has it.
+
+    The ETag covers the dataset version, PAGE_VERSION, the full path and the user (plus
+    any extra versions, e.g. the season store), so checking it costs no rendering.
+    """
+    key = '|'.join([PAGE_VERSION, data.version, request.full_path, current_user.get_id() or '', *versions])
+    etag = hashlib.sha1(key.encode()).hexdigest()[:20]
+    last_modified = datasets.last_modified
+    response = Response(status=304) if not_modified(etag, last_modified) else make_response(render())
+    return revalidated(response, etag, last_modified)
 
 # ── NBA data ─────────────────────────────────────────────────────────────────
-def get_db_data(db_name='basketball.db'):
-    conn = sqlite3.connect(db_name)
-    query = "SELECT * FROM nba_players"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
-
-def canonicalize_players_dataframe(raw_df):
-    """Normalize player stats columns so templates/routes can rely on stable names."""
-    aliases = {
-        'player_name': ['player_name', 'Player'],
-        'position': ['position', 'Pos', 'Position'],
-        'fg_pct': ['fg_pct', 'FG%'],
-        'three_p_pct': ['three_p_pct', '3P%'],
-        'pts': ['pts', 'PTS', 'Points'],
-        'ast': ['ast', 'AST'],
-        'trb': ['trb', 'TRB'],
-        'stl': ['stl', 'STL'],
-        'blk': ['blk', 'BLK'],
-        'tov': ['tov', 'TOV'],
-        'pf': ['pf', 'PF'],
-        'mp': ['mp', 'mins_played', 'MP', 'Mins Played'],
-        'fg_attempts': ['fg_attempts', 'FGA', 'Field Goal Attempts'],
-        'ft_attempts': ['ft_attempts', 'FTA', 'Free Throw Attempts'],
-    }
+# How often requests look at basketball.db for a newer import
+DATASET_CHECK_SECONDS = 2.0
+
+
+class DatasetHolder:
+    """
+    Serves the current PlayerDataset and swaps in a new one when basketball.db changes.
+
+    Nothing is loaded until the first request reads `current` (or warm() is called),
+    and loading prefers the snapshot init_db.py writes. Requests read `current` once
+    and keep that reference, so a swap mid-request never mixes two versions. At most
+    every check_interval seconds a request stats the file; if its inode, size or mtime
+    moved (init_db.py wrote a new import), the dataset is rebuilt on a background thread
+    and replaced in one reference assignment. Requests keep getting the old dataset
+    until then, and after a failed rebuild. on_reload runs first on that thread, so
+    anything else derived from the import is dropped in step with the dataset.
+    """
+
+    def __init__(self, loader, db_name='basketball.db', check_interval=DATASET_CHECK_SECONDS, on_reload=None):
+        self.loader = loader
+        self.on_reload = on_reload
+        self.db_path = os.path.join(PROJECT_ROOT, db_name)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._next_check = 0.0
+        self._signature = None
+        self._dataset = None
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    @property
+    def current(self):
+        if self._dataset is None:
+            return self.warm()
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            self._reload_if_changed()
+        return self._dataset
+
+    def warm(self):
+        """Loads the dataset now if nothing has loaded it yet, and returns it."""
+        with self._lock:
+            if self._dataset is None:
+                self._signature = self._file_signature()
+                self._next_check = time.monotonic() + self.check_interval
+                self._dataset = self.loader()
+        return self._dataset
+
+    @property
+    def last_modified(self):
+        """When basketball.db was written, as of the loaded dataset (for Last-Modified)."""
+        if self._signature is None:
+            return None
+        return datetime.fromtimestamp(self._signature[2] // 1_000_000_000, tz=timezone.utc)
+
+    def swap(self, dataset):
+        """Makes dataset the one new requests see."""
+        self._dataset = dataset
+
+    def _reload_if_changed(self):
+        signature = self._file_signature()
+        with self._lock:
+            if signature == self._signature or self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, args=(signature,), name='dataset-reload', daemon=True).start()
+
+    def _reload(self, signature):
+        try:
+            # A file swapped in by os.replace is only seen through fresh connections
+            invalidate_connections()
+            if self.on_reload is not None:
+                self.on_reload()
+            self.swap(self.loader())
+        except Exception as e:
+            # Keep serving the old version; the next check retries
+            print(f"Could not reload the NBA dataset, still serving {self._dataset.version}: {e}")
+            signature = self._signature
+        finally:
+            with self._lock:
+                self._signature = signature
+                self._reloading = False
 
-    normalized = raw_df.copy()
-    for target, options in aliases.items():
-        if target in normalized.columns:
-            continue
-        for option in options:
-            if option in normalized.columns:
-                normalized[target] = normalized[option]
-                break
-
-    text_defaults = {'player_name': '', 'position': ''}
-    numeric_defaults = {
-        'fg_pct': 0.0,
-        'three_p_pct': 0.0,
-        'pts': 0.0,
-        'ast': 0.0,
-        'trb': 0.0,
-        'stl': 0.0,
-        'blk': 0.0,
-        'tov': 0.0,
-        'pf': 0.0,
-        'mp': 36.0,
-        'fg_attempts': 0.0,
-        'ft_attempts': 0.0,
-    }
 
-    for col, default in text_defaults.items():
-        if col not in normalized.columns:
-            normalized[col] = default
-        normalized[col] = normalized[col].fillna(default).astype(str)
+season_store = load_season_store()
+
 
-    for col, default in numeric_defaults.items():
-        if col not in normalized.columns:
-            normalized[col] = default
-        normalized[col] = pd.to_numeric(normalized[col], errors='coerce').fillna(default)
+def forget_derived_data():
+    """Drops everything else built from basketball.db and its import, for DatasetHolder reloads."""
+    clear_centroid_cache()
+    forget_loaded_indexes()
+    reset_workers()
+    season_store.refresh()
 
-    return normalized
 
+datasets = DatasetHolder(load_dataset, on_reload=forget_derived_data)
 
-df = canonicalize_players_dataframe(get_db_data())
+# Under `gunicorn --preload`, load in the master so every forked worker starts warm
+if os.environ.get('PRELOAD_DATASET') == '1':
+    datasets.warm()
+
+
+def season_window(values):
+    """Read an optional season_from/season_to pair from request args or form data."""
+    try:
+        start = int(values['season_from']) if values.get('season_from') else None
+        end = int(values['season_to']) if values.get('season_to') else None
+    except ValueError:
+        return None
+    if start is None and end is None:
+        return None
+    return start, end
+
+
+def analyze_position_fit(user_stats, centroids=None):
+    """Run the shared position-fit engine on one web submission."""
+    if centroids is None:
+        centroids = load_position_centroids()
+    fit = score_positions(per_minute_vector(user_stats, user_stats.get('minutes')), centroids)
+    best_position, improve, strengths = describe_fit(fit, stat_names=STAT_COLUMNS)
+    return {'best_position': best_position, 'improve': improve, 'strengths': strengths}
 
 
 def _get_first_present(row_dict, keys, default=None):
@@ -137,23 +326,112 @@ def normalize_compare_player(player_row):
 # ── Public routes ─────────────────────────────────────────────────────────────
 @app.route('/')
 def home():
-    players_list = df.to_dict(orient='records')
-    avg_ppg = round(float(df['pts'].mean()), 1) if not df.empty else None
-    return render_template('home.html', players=players_list, avg_ppg=avg_ppg)
+    data = datasets.current
+    return dataset_page(data, lambda: render_template('home.html', player_count=len(data), avg_ppg=data.avg_ppg))
 
 @app.route('/players')
 def players():
-    search = request.args.get('search', '').lower()
+    search = request.args.get('search', '')
     position = request.args.get('position', '')
-    filtered_df = df.copy()
-    if search:
-        filtered_df = filtered_df[filtered_df['player_name'].str.lower().str.contains(search)]
-    if position:
-        filtered_df = filtered_df[filtered_df['position'] == position]
-    players_list = filtered_df.to_dict(orient='records')
-    return render_template('players.html', players=players_list)
+    sort = request.args.get('sort', '')
+    sort = sort if sort in SORT_LABELS else ''
+    cursor = decode_cursor(request.args.get('cursor'))
+    window = season_window(request.args)
+    data = datasets.current
+
+    def render():
+        if window and season_store.seasons:
+            # Past seasons are read from the memory-mapped store, one season at a time
+            players_list, next_cursor, total = season_store.search_page(search, position, *window, sort, cursor)
+        else:
+            players_list, next_cursor, total = data.search_page(search, position, sort, cursor)
+
+        # Page links keep the filters and sort; radar data is fetched per card on click
+        filters = {key: value for key, value in request.args.items() if key != 'cursor'}
+        return render_template('players.html', players=players_list, seasons=season_store.seasons,
+                               sorts=SORT_LABELS, total=total, dataset_version=data.version,
+                               next_url=url_for('players', **filters, cursor=next_cursor) if next_cursor else None,
+                               first_url=url_for('players', **filters) if cursor else None)
+
+    return dataset_page(data, render, season_store.version)
+
+@app.route('/api/players/<int:player_id>')
+def player_radar(player_id):
+    """
+    Radar chart data for one /players card, fetched when its button is clicked.
+
+    player_id is the card's row id: in the current dataset, or in ?season= for cards
+    from the season store. ?v= is the dataset version the page was built from, so a
+    card from before a reload isn't answered with a different player.
+    """
+    data = datasets.current
+    season = request.args.get('season', type=int)
+    if season is None and request.args.get('v', data.version) != data.version:
+        return jsonify(error="The player list has been updated. Reload the page to see it."), 409
+
+    def render():
+        if season is not None:
+            players = season_store.partition(season) if season in season_store.seasons else None
+        else:
+            players = data
+        if players is None or not 0 <= player_id < len(players):
+            return jsonify(error="No such player."), 404
+
+        player = players.record(player_id)
+        stats = [float(player[col]) for col in STAT_COLUMNS]
+        return jsonify(player_name=player['player_name'], position=player['position'], season=player.get('season'),
+                       stats=dict(zip(STAT_COLUMNS, stats)), radar=(np.array(stats) * RADAR_SCALE).tolist())
+
+    return dataset_page(data, render, season_store.version)
+
+@app.route('/api/players/suggest')
+def suggest_players():
+    """Autocomplete names for the compare-player box on the analytics page."""
+    data = datasets.current
+    return dataset_page(data, lambda: jsonify(data.search_index.suggest(request.args.get('q', ''))))
+
+# Bearer token a scraper must send to read /metrics; while unset the endpoint doesn't exist
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+@app.route('/metrics')
+def metrics():
+    """Latency histograms for this worker in the Prometheus text format, for METRICS_TOKEN holders."""
+    if not METRICS_TOKEN:
+        return Response('Not Found\n', status=404, mimetype='text/plain')
+    sent = request.headers.get('Authorization', '').encode()
+    if not hmac.compare_digest(sent, f"Bearer {METRICS_TOKEN}".encode()):
+        return Response('Unauthorized\n', status=401, mimetype='text/plain', headers={'WWW-Authenticate': 'Bearer'})
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/analyze', methods=['POST'])
+@login_required
+def analyze_batch():
+    """
+    Position fit and closest NBA twin for many stat lines at once.
+
+    The body is NDJSON: one JSON object per line with fg_pct, three_p_pct, stl, blk,
+    tov, pf, pts, ast, trb, optional minutes and an optional id to echo back. Results
+    stream back as NDJSON, in input order, as each chunk finishes on the worker pool.
+    """
+    def generate():
+        # Buffered, because the raw request stream reads lines a byte at a time
+        for results in analyze_lines(io.BufferedReader(request.stream, buffer_size=65536)):
+            yield ''.join(json.dumps(result) + '\n' for result in results)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 # ── Auth routes ───────────────────────────────────────────────────────────────
+# Seconds a client is asked to wait after the password hashing queue turns it away
+HASHING_RETRY_AFTER = 2
+
+@app.errorhandler(HashingBusy)
+def hashing_busy(error):
+    """Sign-ins past the hashing pool's queue limit get a quick 503 instead of tying up a worker."""
+    db.session.rollback()
+    flash('Lots of people are signing in right now. Please try again in a few seconds.', 'error')
+    template = 'register.html' if request.endpoint == 'register' else 'login.html'
+    return render_template(template), 503, {'Retry-After': str(HASHING_RETRY_AFTER)}
+
 @app.route('/register', methods=['GET', 'POST'])
 def register():
     if current_user.is_authenticated:
@@ -194,6 +472,14 @@ def login():
 
         user = User.query.filter_by(username=username).first()
         if user and user.check_password(password):
+            if user.needs_rehash():
+                # Only now is the plain password at hand to re-hash with the current cost
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                except HashingBusy:
+                    # The old hash still works; try again on a quieter login
+                    db.session.rollback()
             login_user(user, remember=remember)
             # Redirect back to the page they originally tried to visit
             next_page = request.args.get('next')
@@ -206,6 +492,7 @@ def login():
 @app.route('/logout')
 @login_required
 def logout():
+    identity_cache.forget(current_user.id)
     logout_user()
     flash('You have been logged out.', 'info')
     return redirect(url_for('login'))
@@ -214,11 +501,6 @@ def logout():
 @app.route('/analytics', methods=['GET', 'POST'])
 @login_required
 def analytics():
-    players_list = df.to_dict(orient='records')
-
-    # Load this user's saved stats from DB
-    user_stats_row = UserStats.query.filter_by(user_id=current_user.id).first()
-
     if request.method == 'POST':
         try:
             minutes = float(request.form.get('minutes', 36))
@@ -238,7 +520,8 @@ def analytics():
             }
             compare_name = request.form.get('compare_player', '')
 
-            # Save to DB — update if exists, create if not
+            # Save to DB — update if exists, create if not (the commit evicts the cached copy)
+            user_stats_row = UserStats.query.filter_by(user_id=current_user.id).first()
             if user_stats_row:
                 for key, val in user_stats.items():
                     setattr(user_stats_row, key, val)
@@ -250,35 +533,77 @@ def analytics():
                     **user_stats
                 )
                 db.session.add(user_stats_row)
+            # The row above pre-fills the form; the history keeps every submission
+            UserStatsHistory.record(current_user.id, user_stats)
             db.session.commit()
 
             compare_player = None
             if compare_name:
-                matched = df[df['player_name'] == compare_name]
-                if not matched.empty:
-                    compare_player = normalize_compare_player(matched.iloc[0].to_dict())
+                matched = datasets.current.by_name(compare_name)
+                if matched is not None:
+                    compare_player = normalize_compare_player(matched)
+
+            window = season_window(request.form)
+            centroids = season_store.position_centroids(*window) if window and season_store.seasons else None
+
+            comparison = compare_to_player(user_stats, compare_player) if compare_player else None
 
             return render_template('results.html', stats=user_stats,
-                                   compare_player=compare_player)
+                                   compare_player=compare_player,
+                                   comparison=comparison,
+                                   position_fit=analyze_position_fit(user_stats, centroids))
 
         except ValueError:
             return "Please enter valid numbers in all fields."
 
-    # GET — load saved stats for this user's form
+    # GET — load saved stats for this user's form (cached between saves)
     saved_stats = {}
     saved_compare_player = ''
-    if user_stats_row:
-        saved_stats = {
-            col: getattr(user_stats_row, col)
-            for col in ['fg_pct', 'three_p_pct', 'pts', 'ast', 'trb',
-                        'stl', 'blk', 'tov', 'pf', 'minutes',
-                        'fg_attempts', 'ft_attempts']
-        }
-        saved_compare_player = user_stats_row.compare_player
-
-    return render_template('analytics.html', players=players_list,
-                           saved_stats=saved_stats,
-                           saved_compare_player=saved_compare_player)
+    snapshot = cached_user_stats(current_user.id)
+    if snapshot:
+        saved_stats = dict(snapshot['stats'])
+        saved_compare_player = snapshot['compare_player']
+
+    return render_template('analytics.html', saved_stats=saved_stats,
+                           saved_compare_player=saved_compare_player,
+                           seasons=season_store.seasons)
+
+# How far back /api/stats/history looks when no start is given
+DEFAULT_HISTORY_DAYS = 365
+
+def _history_time(value, default, end_of_day=False):
+    """Unix seconds for an ISO date/datetime query value (UTC unless it has an offset)."""
+    if not value:
+        return default
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    # A bare end date includes that whole day
+    if end_of_day and len(value) == 10:
+        moment += timedelta(days=1, seconds=-1)
+    return int(moment.timestamp())
+
+@app.route('/api/stats/history')
+@login_required
+def stats_history():
+    """
+    The current user's submitted stat lines between ?start and ?end (ISO dates).
+
+    Defaults to the last DEFAULT_HISTORY_DAYS days. Ranges with more than ?points
+    entries (default DEFAULT_HISTORY_POINTS) come back averaged into that many time
+    buckets, so a year of submissions is still one small payload for a chart.
+    """
+    try:
+        now = int(time.time())
+        end = _history_time(request.args.get('end'), now, end_of_day=True)
+        start = _history_time(request.args.get('start'), end - DEFAULT_HISTORY_DAYS * 86400)
+        max_points = int(request.args.get('points', DEFAULT_HISTORY_POINTS))
+    except ValueError:
+        return jsonify(error="start and end must be ISO dates and points a whole number."), 400
+    if start > end or not 1 <= max_points <= MAX_HISTORY_POINTS:
+        return jsonify(error=f"start must not be after end, and points must be 1-{MAX_HISTORY_POINTS}."), 400
+
+    return jsonify(UserStatsHistory.series(current_user.id, start, end, max_points))
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,166 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import Response, request
+from werkzeug.exceptions import NotFound
+from werkzeug.http import is_resource_modified
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # Optional; responses fall back to gzip without it
+    brotli = None
+
+# Responses smaller than this aren't worth the compression overhead
+MIN_COMPRESS_BYTES = 500
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+}
+
+# Fingerprinted static URLs never change content, so browsers may keep them for a year
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Static files are compressed once per process, so they get the slowest settings
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+
+
+def preferred_encoding():
+    """'br', 'gzip' or None, whichever the client accepts that this server can produce."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, static=False):
+    if encoding == 'br':
+        return brotli.compress(data, quality=STATIC_BROTLI_QUALITY if static else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=STATIC_GZIP_LEVEL if static else GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response):
+    """
+    after_request hook: gzip or brotli for text responses the client will accept.
+
+    Streamed and file responses are left alone (static files come precompressed from
+    StaticAssets), as are tiny bodies and anything already encoded.
+    """
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    data = response.get_data()
+    encoding = preferred_encoding()
+    if encoding is None or len(data) < MIN_COMPRESS_BYTES:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Whether the client's If-None-Match / If-Modified-Since already cover this version.
+
+    ETags are compared weakly, so the gzip, brotli and identity bodies share one tag.
+    """
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+
+def revalidated(response, etag, last_modified=None):
+    """
+    Tags a response so browsers keep it but check back each time (and get a 304).
+
+    Pages show the signed-in user's name, so they are private to that browser and
+    vary on the session cookie.
+    """
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Cookie')
+    return response
+
+
+class StaticAssets:
+    """
+    Serves a static folder with content-hashed URLs and precompressed bodies.
+
+    Each file is read, hashed and compressed (gzip, plus brotli when installed) once,
+    the first time it is asked for, and again only if it changes on disk. url_for()
+    appends ?v=<hash>; requests carrying the current hash are cacheable for a year.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, filename):
+        path = safe_join(self.folder, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and entry['key'] == key:
+            return entry
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        bodies = {None: data}
+        if mimetype in COMPRESSIBLE_MIMETYPES and len(data) >= MIN_COMPRESS_BYTES:
+            bodies['gzip'] = compress(data, 'gzip', static=True)
+            if brotli is not None:
+                bodies['br'] = compress(data, 'br', static=True)
+        entry = {
+            'key': key,
+            'version': hashlib.sha1(data).hexdigest()[:12],
+            'mimetype': mimetype,
+            'bodies': bodies,
+        }
+        with self._lock:
+            self._entries[path] = entry
+        return entry
+
+    def version(self, filename):
+        """Content hash of a static file for its URL, or None if it doesn't exist."""
+        entry = self._entry(filename)
+        return entry['version'] if entry else None
+
+    def response(self, filename):
+        """The static file, precompressed for the client, or a 304 if it has it already."""
+        entry = self._entry(filename)
+        if entry is None:
+            raise NotFound()
+
+        if not_modified(entry['version']):
+            response = Response(status=304)
+        else:
+            encoding = preferred_encoding()
+            if encoding not in entry['bodies']:
+                encoding = None
+            response = Response(entry['bodies'][encoding], mimetype=entry['mimetype'])
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(entry['version'], weak=True)
+        response.vary.add('Accept-Encoding')
+        if request.args.get('v') == entry['version']:
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
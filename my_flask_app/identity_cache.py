@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+try:
+    from .models import db, User, UserStats
+except ImportError:
+    from models import db, User, UserStats
+
+# Seconds a cached user or stats snapshot is trusted. Writes invalidate only this
+# process's cache, so this is also how long another gunicorn worker may keep serving
+# a deleted account or old stats; kept short so it covers a burst of requests
+# (a page and its API calls) rather than a whole visit
+IDENTITY_CACHE_TTL = float(os.environ.get('IDENTITY_CACHE_TTL', 5))
+
+# Users (and their stats) kept per process; the least recently used are dropped first
+IDENTITY_CACHE_SIZE = 4096
+
+# password_hash is never cached; code that checks or changes it queries the row itself
+USER_COLUMNS = ['id', 'username']
+STATS_COLUMNS = ['fg_pct', 'three_p_pct', 'pts', 'ast', 'trb', 'stl', 'blk', 'tov', 'pf',
+                 'minutes', 'fg_attempts', 'ft_attempts']
+
+
+class IdentityCache:
+    """
+    Thread-safe LRU of plain-dict snapshots with a time-to-live.
+
+    Values are copies of column values, never ORM objects, so nothing here is tied to
+    a session or a thread. Keys are (kind, user_id) pairs.
+    """
+
+    def __init__(self, ttl=IDENTITY_CACHE_TTL, max_size=IDENTITY_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """The cached value and True, or (None, False) when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None, False
+            self._entries.move_to_end(key)
+            return entry[1], True
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def forget(self, user_id):
+        """Drops everything cached for one user."""
+        with self._lock:
+            self._entries.pop(('user', user_id), None)
+            self._entries.pop(('stats', user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
+
+
+def load_cached_user(user_id):
+    """
+    The User for Flask-Login, from the cache when possible.
+
+    A cached user is attached to the request's session as already loaded, without a
+    query, so it behaves like a queried row (relationships and password_hash still
+    load on access). The cache is not re-checked against users.db on a hit: another
+    worker's delete or password change is seen here only once the entry's
+    IDENTITY_CACHE_TTL runs out.
+    """
+    row, hit = identity_cache.get(('user', user_id))
+    if not hit:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            identity_cache.set(('user', user_id), {col: getattr(user, col) for col in USER_COLUMNS})
+        return user
+    user = User(**row)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def cached_user_stats(user_id):
+    """
+    The user's saved form stats as {'stats': {...}, 'compare_player': str}, or None if
+    they haven't submitted any yet. "No stats" is cached too.
+    """
+    snapshot, hit = identity_cache.get(('stats', user_id))
+    if not hit:
+        row = UserStats.query.filter_by(user_id=user_id).first()
+        snapshot = None if row is None else {
+            'stats': {col: getattr(row, col) for col in STATS_COLUMNS},
+            'compare_player': row.compare_player,
+        }
+        identity_cache.set(('stats', user_id), snapshot)
+    return snapshot
+
+
+# ── Invalidation ─────────────────────────────────────────────────────────────
+# Password changes and stats saves are picked up from the session itself, so any code
+# path that writes a User or UserStats row evicts it. Eviction waits for the commit:
+# evicting at flush time would let another request re-cache the old committed row.
+@event.listens_for(Session, 'after_flush', propagate=True)
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault('identity_changes', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+        elif isinstance(obj, UserStats) and obj.user_id is not None:
+            changed.add(obj.user_id)
+
+
+@event.listens_for(Session, 'after_commit', propagate=True)
+def _forget_changed_users(session):
+    for user_id in session.info.pop('identity_changes', ()):
+        identity_cache.forget(user_id)
+
+
+@event.listens_for(Session, 'after_rollback', propagate=True)
+def _discard_changed_users(session):
+    session.info.pop('identity_changes', None)
@@ -1,9 +1,24 @@
+import time
+
+import numpy as np
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+try:
+    from .password_hashing import hash_password, needs_rehash, verify_password
+except ImportError:
+    from password_hashing import hash_password, needs_rehash, verify_password
 
 db = SQLAlchemy()
 
+# Stats kept in each history entry, in the order they are packed
+HISTORY_COLUMNS = ['fg_pct', 'three_p_pct', 'pts', 'ast', 'trb', 'stl', 'blk', 'tov', 'pf',
+                   'minutes', 'fg_attempts', 'ft_attempts']
+HISTORY_DTYPE = np.dtype('<f4')
+
+# Most points a history range query returns; longer ranges are averaged into time buckets
+DEFAULT_HISTORY_POINTS = 200
+MAX_HISTORY_POINTS = 1000
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
 
@@ -14,15 +29,26 @@ class User(UserMixin, db.Model):
 
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def needs_rehash(self):
+        """Whether the stored hash predates the current PASSWORD_HASH_METHOD settings."""
+        return needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f'<User {self.username}>'
 
 class UserStats(db.Model):
+    """
+    A user's latest submission, one row per user, updated in place.
+
+    It prefills the analytics form (compare_player included, which the history
+    doesn't keep) and is what the identity cache snapshots. UserStatsHistory keeps
+    every submission for the progress chart, so each analysis writes both.
+    """
     __tablename__ = 'user_stats'
 
     id = db.Column(db.Integer, primary_key=True)
@@ -41,4 +67,74 @@ class UserStats(db.Model):
     ft_attempts = db.Column(db.Float, default=5.0)
     compare_player = db.Column(db.String(100), default='')
 
-    user = db.relationship("User", back_populates="stats", uselist=False)
\ No newline at end of file
+    user = db.relationship("User", back_populates="stats", uselist=False)
+
+
+class UserStatsHistory(db.Model):
+    """
+    Every stat line a user has submitted, appended and never updated.
+
+    Each entry stores its HISTORY_COLUMNS as one packed float32 blob (48 bytes) and its
+    time as Unix seconds, and (user_id, recorded_at) is indexed, so a range query is an
+    index scan over just that user's entries in that window.
+    """
+    __tablename__ = 'user_stats_history'
+    __table_args__ = (db.Index('ix_user_stats_history_user_recorded', 'user_id', 'recorded_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    recorded_at = db.Column(db.Integer, nullable=False)
+    values = db.Column(db.LargeBinary, nullable=False)
+
+    @classmethod
+    def record(cls, user_id, stats, recorded_at=None):
+        """Adds one entry to the session; stats is keyed by HISTORY_COLUMNS."""
+        values = np.array([stats[col] for col in HISTORY_COLUMNS], dtype=HISTORY_DTYPE)
+        entry = cls(user_id=user_id, recorded_at=int(recorded_at if recorded_at is not None else time.time()),
+                    values=values.tobytes())
+        db.session.add(entry)
+        return entry
+
+    @classmethod
+    def series(cls, user_id, start, end, max_points=DEFAULT_HISTORY_POINTS):
+        """
+        A user's entries between two Unix times (inclusive), downsampled on the server.
+
+        When the range holds more than max_points entries it is split into max_points
+        equal time buckets, and each non-empty bucket becomes one point with the mean
+        time and mean stats of its entries.
+
+        Args:
+            user_id (int): Whose history to read.
+            start (int): First second of the range.
+            end (int): Last second of the range.
+            max_points (int): Upper bound on the number of points returned.
+
+        Returns:
+            dict: 'columns' (HISTORY_COLUMNS), and per point 'recorded_at', 'count' (entries
+                averaged into it) and 'values' (one list per point, in column order).
+        """
+        rows = (db.session.query(cls.recorded_at, cls.values)
+                .filter(cls.user_id == user_id, cls.recorded_at.between(start, end))
+                .order_by(cls.recorded_at)
+                .all())
+        times = np.array([row[0] for row in rows], dtype=np.int64)
+        values = np.frombuffer(b''.join(row[1] for row in rows), dtype=HISTORY_DTYPE)
+        values = values.reshape(len(rows), len(HISTORY_COLUMNS)).astype(np.float64)
+        counts = np.ones(len(rows), dtype=np.int64)
+
+        if len(rows) > max_points:
+            buckets = (times - start) * max_points // (end - start + 1)
+            counts = np.bincount(buckets, minlength=max_points)
+            times = np.bincount(buckets, weights=times, minlength=max_points)
+            sums = np.zeros((max_points, len(HISTORY_COLUMNS)))
+            np.add.at(sums, buckets, values)
+            filled = counts > 0
+            counts, times, values = counts[filled], times[filled] / counts[filled], sums[filled] / counts[filled, None]
+
+        return {
+            'columns': HISTORY_COLUMNS,
+            'recorded_at': [int(round(t)) for t in times],
+            'count': counts.tolist(),
+            'values': np.round(values, 4).tolist(),
+        }
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from metrics import PASSWORD_HASH_PENDING, PASSWORD_HASH_REJECTED, PASSWORD_HASH_SECONDS, PASSWORD_HASH_WAIT_SECONDS
+
+# Full Werkzeug method string, cost parameters included; stored hashes made with any
+# other parameters are replaced on the user's next successful login
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+
+# Hashes computed at once per process. scrypt and PBKDF2 release the GIL, so these
+# threads use real cores; keeping the count low leaves CPU for every other route
+HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 1))
+
+# Hashes allowed to wait for a thread; past this, sign-ins are turned away with a 503
+HASH_QUEUE_LIMIT = int(os.environ.get('PASSWORD_HASH_QUEUE', 8))
+
+# Longest a request waits for its hash before giving up, in seconds
+HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+# The pool and admission slots this process created, with the pid they belong to
+_executor = None
+_slots = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full or a hash took longer than HASH_TIMEOUT."""
+
+
+def _pool():
+    global _executor, _slots, _pool_pid
+    if _pool_pid != os.getpid():
+        with _pool_lock:
+            # Threads don't survive a fork, so each gunicorn worker starts its own pool
+            if _pool_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='password-hash')
+                _slots = threading.BoundedSemaphore(HASH_WORKERS + HASH_QUEUE_LIMIT)
+                _pool_pid = os.getpid()
+    return _executor, _slots
+
+
+def _run(operation, func, *args):
+    """Runs one hash on the pool and waits for it, or raises HashingBusy without queueing."""
+    executor, slots = _pool()
+    if not slots.acquire(blocking=False):
+        PASSWORD_HASH_REJECTED.inc(1, operation)
+        raise HashingBusy(f"{HASH_WORKERS + HASH_QUEUE_LIMIT} password hashes already pending")
+
+    PASSWORD_HASH_PENDING.inc()
+    queued = time.perf_counter()
+
+    def work():
+        PASSWORD_HASH_WAIT_SECONDS.observe(time.perf_counter() - queued, operation)
+        with PASSWORD_HASH_SECONDS.time(operation):
+            return func(*args)
+
+    def release(_):
+        PASSWORD_HASH_PENDING.dec()
+        slots.release()
+
+    future = executor.submit(work)
+    future.add_done_callback(release)
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except FutureTimeoutError:
+        # Still counted as pending until it finishes, so a stalled pool keeps shedding load
+        raise HashingBusy(f"password hash took longer than {HASH_TIMEOUT:g}s")
+
+
+def hash_password(password):
+    """A new PASSWORD_HASH_METHOD hash of password, computed on the hashing pool."""
+    return _run('hash', generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+
+def verify_password(password_hash, password):
+    """Whether password matches password_hash, checked on the hashing pool."""
+    return _run('verify', check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """Whether password_hash was made with a method or cost other than PASSWORD_HASH_METHOD."""
+    return password_hash.split('$', 1)[0] != PASSWORD_HASH_METHOD
@@ -9,39 +9,9 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 function createComparisonRadarChart() {
-    // Get data from data attributes on the canvas
+    // Radar axes arrive already scaled to 1-10 by the server-side comparison service
     const canvas = document.getElementById('comparisonRadarChart');
-    const userStatsStr = canvas.getAttribute('data-user-stats');
-    const playerStatsStr = canvas.getAttribute('data-player-stats');
-    
-    const userStats = JSON.parse(userStatsStr);
-    const playerStats = JSON.parse(playerStatsStr);
-    
-    // Calculate normalized stats for radar chart
-    // Using the same scale conversions as the single player radar
-    const userRadarStats = [
-        userStats.fg_pct * 10,           // FG% (1-10)
-        userStats.three_p_pct * 10,      // 3P% (1-10)
-        userStats.stl,                   // Steals
-        userStats.blk,                   // Blocks
-        userStats.tov,                   // TOV
-        userStats.pf,                    // Fouls
-        userStats.pts / 4,               // PPG Rating (1-10)
-        userStats.ast,                   // Assists
-        userStats.trb                    // Rebounds
-    ];
-    
-    const playerRadarStats = [
-        playerStats.fg_pct * 10,         // FG% (1-10)
-        playerStats.three_p_pct * 10,    // 3P% (1-10)
-        playerStats.stl,                 // Steals
-        playerStats.blk,                 // Blocks
-        playerStats.tov,                 // TOV
-        playerStats.pf,                  // Fouls
-        playerStats.pts / 4,             // PPG Rating (1-10)
-        playerStats.ast,                 // Assists
-        playerStats.trb                  // Rebounds
-    ];
+    const radar = JSON.parse(canvas.getAttribute('data-radar'));
     
     const ctx = canvas.getContext('2d');
     
@@ -56,7 +26,7 @@ function createComparisonRadarChart() {
             datasets: [
                 {
                     label: 'Your Stats',
-                    data: userRadarStats,
+                    data: radar.user,
                     backgroundColor: 'rgba(54, 162, 235, 0.2)',      // Blue
                     borderColor: 'rgb(54, 162, 235)',
                     borderWidth: 2,
@@ -67,8 +37,8 @@ function createComparisonRadarChart() {
                     pointHoverRadius: 6,
                 },
                 {
-                    label: playerStats.player_name || 'Comparison Player',
-                    data: playerRadarStats,
+                    label: radar.player_name || 'Comparison Player',
+                    data: radar.player,
                     backgroundColor: 'rgba(255, 99, 132, 0.2)',       // Red
                     borderColor: 'rgb(255, 99, 132)',
                     borderWidth: 2,
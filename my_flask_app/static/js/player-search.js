@@ -1,48 +1,71 @@
 // Player search functionality
+const SUGGEST_DELAY_MS = 150;
+
 document.addEventListener('DOMContentLoaded', function() {
     const playerInput = document.getElementById('compare_player');
     const suggestionsList = document.getElementById('playerSuggestions');
-    
-    if (!playerInput || !suggestionsList || !window.playersData) {
+
+    if (!playerInput || !suggestionsList || !playerInput.dataset.suggestUrl) {
         return;
     }
-    
-    const players = window.playersData;
 
-    playerInput.addEventListener('input', function() {
-        const query = this.value.toLowerCase().trim();
-        suggestionsList.innerHTML = '';
+    const suggestUrl = playerInput.dataset.suggestUrl;
+    let debounceTimer = null;
+    let pendingRequest = null;
 
-        if (query.length === 0) {
-            suggestionsList.style.display = 'none';
-            return;
-        }
+    function renderSuggestions(names) {
+        suggestionsList.innerHTML = '';
 
-        // Filter players by matching names
-        const matches = players.filter(p => {
-            const playerName = p.player_name ? p.player_name.toLowerCase() : '';
-            return playerName.includes(query);
-        }).slice(0, 10);
-        
-        if (matches.length > 0) {
+        if (names.length > 0) {
             suggestionsList.style.display = 'block';
-            
-            matches.forEach(player => {
+
+            names.forEach(name => {
                 const div = document.createElement('div');
                 div.className = 'suggestion-item';
-                div.textContent = player.player_name;
-                
+                div.textContent = name;
+
                 div.addEventListener('click', function() {
-                    playerInput.value = player.player_name;
+                    playerInput.value = name;
                     suggestionsList.innerHTML = '';
                     suggestionsList.style.display = 'none';
                 });
-                
+
                 suggestionsList.appendChild(div);
             });
         } else {
             suggestionsList.style.display = 'none';
         }
+    }
+
+    function fetchSuggestions(query) {
+        // Drop the previous request so a slow response can't overwrite a newer one
+        if (pendingRequest) {
+            pendingRequest.abort();
+        }
+        pendingRequest = new AbortController();
+
+        fetch(`${suggestUrl}?q=${encodeURIComponent(query)}`, { signal: pendingRequest.signal })
+            .then(response => response.ok ? response.json() : [])
+            .then(renderSuggestions)
+            .catch(error => {
+                if (error.name !== 'AbortError') {
+                    suggestionsList.style.display = 'none';
+                }
+            });
+    }
+
+    playerInput.addEventListener('input', function() {
+        const query = this.value.trim();
+        clearTimeout(debounceTimer);
+
+        if (query.length === 0) {
+            suggestionsList.innerHTML = '';
+            suggestionsList.style.display = 'none';
+            return;
+        }
+
+        // Wait for a pause in typing before asking the server for matches
+        debounceTimer = setTimeout(() => fetchSuggestions(query), SUGGEST_DELAY_MS);
     });
 
     // Hide suggestions when clicking outside
@@ -0,0 +1,58 @@
+// Progress chart: the signed-in user's submitted stats over time, from /api/stats/history
+let historyChart;
+
+document.addEventListener('DOMContentLoaded', function() {
+    const canvas = document.getElementById('historyChart');
+    const statSelect = document.getElementById('historyStat');
+    const emptyNote = document.getElementById('historyEmpty');
+
+    if (!canvas || !statSelect || !canvas.dataset.url) {
+        return;
+    }
+
+    fetch(canvas.dataset.url, { credentials: 'same-origin' })
+        .then(response => response.ok ? response.json() : Promise.reject(response.status))
+        .then(history => {
+            if (history.recorded_at.length === 0) {
+                canvas.hidden = true;
+                statSelect.disabled = true;
+                emptyNote.hidden = false;
+                return;
+            }
+            drawHistory(canvas, history, statSelect);
+            statSelect.addEventListener('change', () => drawHistory(canvas, history, statSelect));
+        })
+        .catch(() => {
+            canvas.hidden = true;
+            statSelect.disabled = true;
+        });
+});
+
+function drawHistory(canvas, history, statSelect) {
+    const column = history.columns.indexOf(statSelect.value);
+    const labels = history.recorded_at.map(seconds => new Date(seconds * 1000).toLocaleDateString());
+    const values = history.values.map(row => row[column]);
+
+    if (historyChart) {
+        historyChart.destroy();
+    }
+
+    historyChart = new Chart(canvas.getContext('2d'), {
+        type: 'line',
+        data: {
+            labels: labels,
+            datasets: [{
+                label: statSelect.options[statSelect.selectedIndex].text,
+                data: values,
+                borderColor: 'rgb(54, 162, 235)',
+                backgroundColor: 'rgba(54, 162, 235, 0.2)',
+                tension: 0.2,
+                pointRadius: 3,
+            }]
+        },
+        options: {
+            responsive: true,
+            plugins: { legend: { display: false } },
+        }
+    });
+}
@@ -0,0 +1,102 @@
+import base64
+import binascii
+import json
+
+import numpy as np
+
+from position_engine import STAT_COLUMNS
+
+# Player cards per /players page, however many players match
+PAGE_SIZE = 48
+
+# ?sort= values for /players and their labels; stats sort biggest first, names A-Z
+SORT_LABELS = {
+    '': 'Rank',
+    'name': 'Name',
+    'pts': 'Points',
+    'ast': 'Assists',
+    'trb': 'Rebounds',
+    'stl': 'Steals',
+    'blk': 'Blocks',
+    'fg_pct': 'FG%',
+    'three_p_pct': '3P%',
+}
+
+
+def encode_cursor(key, ordinal):
+    """An opaque, URL-safe token for the last row of a page."""
+    return base64.urlsafe_b64encode(json.dumps([key, ordinal]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """The (key, ordinal) pair inside a cursor token, or None for a missing or garbled one."""
+    if not token:
+        return None
+    try:
+        key, ordinal = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (ValueError, TypeError, binascii.Error):
+        return None
+    if not isinstance(ordinal, int) or not isinstance(key, (str, int, float, type(None))):
+        return None
+    return key, ordinal
+
+
+def sort_keys(sort, folded_names, stats):
+    """
+    Ascending sort keys for matched rows, or None to keep them in the order given.
+
+    Args:
+        sort (str): A SORT_LABELS key.
+        folded_names (array-like): Lowercased, accent-folded names of the matched rows.
+        stats (array-like): Their rows of a stat matrix whose first columns are STAT_COLUMNS.
+    """
+    if sort == 'name':
+        return np.asarray(folded_names)
+    if sort in STAT_COLUMNS:
+        # Negated so one ascending sort serves every stat, biggest first
+        return -np.asarray(stats[:, STAT_COLUMNS.index(sort)], dtype=np.float64)
+    return None
+
+
+def _cursor_fits(key, keys):
+    """Whether a cursor key is comparable with these keys (it may come from another sort)."""
+    if keys is None:
+        return key is None
+    if keys.dtype.kind == 'U':
+        return isinstance(key, str)
+    return isinstance(key, (int, float)) and not isinstance(key, bool)
+
+
+def paginate(keys, count, cursor=None, limit=PAGE_SIZE):
+    """
+    One page of rows after a cursor, ordered by (key, position).
+
+    Keyset pagination: the cursor holds the last row's key and position rather than an
+    offset, so each page costs the same however deep it is.
+
+    Args:
+        keys (numpy.ndarray): sort_keys() output for count rows, or None for input order.
+        count (int): Number of matched rows.
+        cursor (tuple): decode_cursor() output for the previous page, or None. A cursor
+            from a different sort is ignored and the first page returned.
+        limit (int): Rows per page.
+
+    Returns:
+        tuple: (positions into the matched rows for this page, next page's cursor token or None).
+    """
+    ordinals = np.arange(count)
+    order = ordinals if keys is None else np.lexsort((ordinals, keys))
+    if cursor is not None and _cursor_fits(cursor[0], keys):
+        key, ordinal = cursor
+        if keys is None:
+            after = ordinals > ordinal
+        else:
+            after = (keys > key) | ((keys == key) & (ordinals > ordinal))
+        order = order[after[order]]
+
+    page = order[:limit]
+    next_cursor = None
+    if len(order) > limit:
+        last = int(page[-1])
+        next_cursor = encode_cursor(None if keys is None else keys[last].item(), last)
+    return page, next_cursor
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from db_connection import read_frame
+from pagination import PAGE_SIZE, paginate, sort_keys
+from player_search import PlayerSearchIndex
+from position_engine import STAT_COLUMNS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR = 'dataset_snapshot'
+MANIFEST_FILE = 'manifest.json'
+
+# Bump when the snapshot layout changes, so old snapshots are rebuilt instead of loaded
+SNAPSHOT_FORMAT = 2
+
+# Numeric columns of the stat matrix, in order; every route and template reads from these
+DATASET_COLUMNS = STAT_COLUMNS + ['mp', 'fg_attempts', 'ft_attempts']
+
+
+def _resolve(path):
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+def canonicalize_players_dataframe(raw_df):
+    """Normalize player stats columns so templates/routes can rely on stable names."""
+    aliases = {
+        'player_name': ['player_name', 'Player'],
+        'position': ['position', 'Pos', 'Position'],
+        'fg_pct': ['fg_pct', 'FG%'],
+        'three_p_pct': ['three_p_pct', '3P%'],
+        'pts': ['pts', 'PTS', 'Points'],
+        'ast': ['ast', 'AST'],
+        'trb': ['trb', 'TRB'],
+        'stl': ['stl', 'STL'],
+        'blk': ['blk', 'BLK'],
+        'tov': ['tov', 'TOV'],
+        'pf': ['pf', 'PF'],
+        'mp': ['mp', 'mins_played', 'MP', 'Mins Played'],
+        'fg_attempts': ['fg_attempts', 'FGA', 'Field Goal Attempts'],
+        'ft_attempts': ['ft_attempts', 'FTA', 'Free Throw Attempts'],
+    }
+
+    normalized = raw_df.copy()
+    for target, options in aliases.items():
+        if target in normalized.columns:
+            continue
+        for option in options:
+            if option in normalized.columns:
+                normalized[target] = normalized[option]
+                break
+
+    text_defaults = {'player_name': '', 'position': ''}
+    numeric_defaults = {
+        'fg_pct': 0.0,
+        'three_p_pct': 0.0,
+        'pts': 0.0,
+        'ast': 0.0,
+        'trb': 0.0,
+        'stl': 0.0,
+        'blk': 0.0,
+        'tov': 0.0,
+        'pf': 0.0,
+        'mp': 36.0,
+        'fg_attempts': 0.0,
+        'ft_attempts': 0.0,
+    }
+
+    for col, default in text_defaults.items():
+        if col not in normalized.columns:
+            normalized[col] = default
+        normalized[col] = normalized[col].fillna(default).astype(str)
+
+    for col, default in numeric_defaults.items():
+        if col not in normalized.columns:
+            normalized[col] = default
+        normalized[col] = pd.to_numeric(normalized[col], errors='coerce').fillna(default)
+
+    return normalized
+
+
+class PlayerDataset:
+    """
+    One loaded version of the NBA table, stored column-wise as NumPy arrays.
+
+    The (N x DATASET_COLUMNS) stat matrix, the names and positions and the name index
+    can all be memory-mapped from a snapshot, so every gunicorn worker reads the same
+    page-cache copy instead of holding its own. Per-player dicts are built only for
+    the rows a request shows; version is a hash of the arrays, so it changes whenever
+    the data does.
+    """
+
+    def __init__(self, names, positions, stats, search_index=None, version=None):
+        self.names = names
+        self.positions = positions
+        self.stats = stats
+        if version is None:
+            digest = hashlib.sha1()
+            for array in (names, positions, stats):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            version = digest.hexdigest()[:12]
+        self.version = version
+        # Stable argsort, so a binary search finds the first row with a given name
+        self._name_order = np.argsort(names, kind='stable')
+        self.avg_ppg = round(float(stats[:, DATASET_COLUMNS.index('pts')].mean()), 1) if len(names) else None
+        self.search_index = search_index if search_index is not None else PlayerSearchIndex(names, positions)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Builds a dataset from a canonicalize_players_dataframe() result."""
+        return cls(
+            frame['player_name'].astype(str).to_numpy(dtype=str),
+            frame['position'].astype(str).to_numpy(dtype=str),
+            frame[DATASET_COLUMNS].to_numpy(dtype=np.float64),
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def record(self, row_id):
+        """One player as a dict of player_name, position and DATASET_COLUMNS."""
+        record = dict(zip(DATASET_COLUMNS, self.stats[row_id].tolist()))
+        record.update(player_name=str(self.names[row_id]), position=str(self.positions[row_id]))
+        return record
+
+    def records(self, row_ids=None):
+        """Dicts for the given rows, or for every player when row_ids is None."""
+        return [self.record(row_id) for row_id in (range(len(self)) if row_ids is None else row_ids)]
+
+    def search_page(self, query='', position='', sort='', cursor=None, limit=PAGE_SIZE):
+        """
+        One page of a /players query.
+
+        Only the page's rows become dicts, each with its row 'id' for /api/players/<id>.
+
+        Returns:
+            tuple: (records, next page's cursor token or None, number of matching players).
+        """
+        row_ids = np.asarray(self.search_index.search(query, position), dtype=np.intp)
+        keys = sort_keys(sort, self.search_index.folded[row_ids], self.stats[row_ids])
+        page, next_cursor = paginate(keys, len(row_ids), cursor, limit)
+        records = [dict(self.record(row_ids[i]), id=int(row_ids[i])) for i in page]
+        return records, next_cursor, len(row_ids)
+
+    def by_name(self, player_name):
+        """The first player with this exact name, or None."""
+        i = np.searchsorted(self.names, player_name, sorter=self._name_order)
+        if i == len(self) or self.names[self._name_order[i]] != player_name:
+            return None
+        return self.record(self._name_order[i])
+
+
+def build_dataset(db_name='basketball.db'):
+    """Reads 'nba_players' and builds an in-memory PlayerDataset from it."""
+    frame = canonicalize_players_dataframe(read_frame("SELECT * FROM nba_players", db_name=db_name))
+    return PlayerDataset.from_frame(frame)
+
+
+def db_signature(db_name='basketball.db'):
+    """Size and modification time of the database file, or None if it is missing."""
+    try:
+        stat = os.stat(_resolve(db_name))
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def write_snapshot(dataset, db_name='basketball.db', snapshot_dir=SNAPSHOT_DIR):
+    """
+    Writes a built PlayerDataset as .npy column files under snapshot_dir/<version>/.
+
+    manifest.json names the current version and pins the database file it was read
+    from; it is replaced atomically after the new files are complete, and older
+    versions are then removed (workers still mapping them keep their open files).
+    Must be written after the last change to db_name, since the signature pins it.
+    """
+    snapshot_dir = _resolve(snapshot_dir)
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    staging = tempfile.mkdtemp(dir=snapshot_dir, prefix='.staging-')
+    np.save(os.path.join(staging, 'stats.npy'), np.asarray(dataset.stats, dtype=np.float64))
+    # The name index carries the names and positions, so they are stored only once
+    for name, array in dataset.search_index.arrays().items():
+        np.save(os.path.join(staging, f"{name}.npy"), array)
+
+    target = os.path.join(snapshot_dir, dataset.version)
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    os.chmod(staging, 0o755)
+    os.replace(staging, target)
+
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'db_signature': db_signature(db_name),
+        'version': dataset.version,
+        'columns': DATASET_COLUMNS,
+        'rows': len(dataset),
+    }
+    manifest_tmp = os.path.join(snapshot_dir, f".{MANIFEST_FILE}.tmp")
+    with open(manifest_tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_tmp, os.path.join(snapshot_dir, MANIFEST_FILE))
+
+    for entry in os.listdir(snapshot_dir):
+        path = os.path.join(snapshot_dir, entry)
+        if entry != dataset.version and os.path.isdir(path) and not entry.startswith('.'):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _current_manifest(db_name, snapshot_dir):
+    """The snapshot's manifest if it was written by this format from db_name as it is now, else None."""
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if (manifest.get('format') != SNAPSHOT_FORMAT or manifest.get('columns') != DATASET_COLUMNS
+            or manifest.get('db_signature') != db_signature(db_name)):
+        return None
+    if not os.path.isdir(os.path.join(snapshot_dir, manifest.get('version', ''))):
+        return None
+    return manifest
+
+
+def snapshot_is_current(db_name='basketball.db', snapshot_dir=SNAPSHOT_DIR):
+    """Whether the snapshot on disk was written from db_name as it is now."""
+    try:
+        return _current_manifest(db_name, _resolve(snapshot_dir)) is not None
+    except (OSError, ValueError):
+        return False
+
+
+def load_snapshot(db_name='basketball.db', snapshot_dir=SNAPSHOT_DIR):
+    """
+    Returns the snapshot's PlayerDataset with its arrays memory-mapped read-only, or
+    None if it is missing or was built from a different version of db_name.
+    """
+    snapshot_dir = _resolve(snapshot_dir)
+    try:
+        manifest = _current_manifest(db_name, snapshot_dir)
+        if manifest is None:
+            return None
+
+        path = os.path.join(snapshot_dir, manifest['version'])
+        search_index = PlayerSearchIndex.from_arrays({
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+            for name in PlayerSearchIndex.ARRAY_NAMES
+        })
+        return PlayerDataset(
+            search_index.names,
+            search_index.positions,
+            np.load(os.path.join(path, 'stats.npy'), mmap_mode='r'),
+            search_index,
+            version=manifest['version'],
+        )
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring dataset snapshot: {e}")
+        return None
+
+
+def load_dataset(db_name='basketball.db', snapshot_dir=SNAPSHOT_DIR):
+    """The current PlayerDataset, mapped from the prebuilt snapshot when it matches db_name."""
+    dataset = load_snapshot(db_name, snapshot_dir)
+    return dataset if dataset is not None else build_dataset(db_name)
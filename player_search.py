@@ -0,0 +1,199 @@
+import os
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+from db_connection import query
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Minimum share of the query's trigrams a name must contain to count as a fuzzy match
+FUZZY_THRESHOLD = 0.4
+
+# Names returned by one autocomplete request
+SUGGESTION_LIMIT = 10
+
+# Indexes already loaded for the CLI, keyed by database path
+_loaded_indexes = {}
+
+
+def fold_name(name):
+    """Lowercases a name and strips accents so 'jokic' finds 'Nikola Jokić'."""
+    decomposed = unicodedata.normalize('NFKD', str(name))
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower().strip()
+
+
+def _trigrams(text, padded=True):
+    if padded:
+        text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class PlayerSearchIndex:
+    """
+    Name search built once per dataset.
+
+    Autocomplete uses a sorted array of every word-start suffix of each folded name
+    ('stephen curry', 'curry'), so a prefix lookup is a binary search. Every folded
+    name is broken into trigrams with an inverted index from trigram to row ids, so
+    substring queries only verify the rows that share all of the query's trigrams and
+    typo-tolerant queries rank rows by how many trigrams they share.
+
+    Everything is held in flat NumPy arrays (postings in CSR form: sorted trigram keys,
+    offsets, row ids), so a saved index can be memory-mapped and shared by every
+    process that opens it instead of being rebuilt as Python objects in each one.
+    """
+
+    # Array attributes written by arrays() and read back by from_arrays()
+    ARRAY_NAMES = ('names', 'positions', 'folded', 'gram_counts', 'gram_keys', 'gram_offsets', 'gram_rows',
+                   'prefix_keys', 'prefix_rows')
+
+    def __init__(self, names, positions=None):
+        names = [str(name) for name in names]
+        folded = [fold_name(name) for name in names]
+        name_trigrams = [_trigrams(name) for name in folded]
+
+        postings = defaultdict(list)
+        for row_id, grams in enumerate(name_trigrams):
+            # Padded grams contain every inner trigram too, so one set serves substring and fuzzy lookups
+            for gram in grams:
+                postings[gram].append(row_id)
+        gram_keys = sorted(postings)
+
+        word_starts = sorted(
+            (name[i:], row_id)
+            for row_id, name in enumerate(folded)
+            for i in range(len(name))
+            if name[i] != ' ' and (i == 0 or name[i - 1] == ' ')
+        )
+
+        self.names = np.array(names, dtype=str)
+        self.positions = np.array([str(pos) for pos in positions] if positions is not None else [''] * len(names),
+                                  dtype=str)
+        self.folded = np.array(folded, dtype=str)
+        self.gram_counts = np.array([len(grams) for grams in name_trigrams], dtype=np.int32)
+        self.gram_keys = np.array(gram_keys, dtype=str)
+        self.gram_offsets = np.cumsum([0] + [len(postings[gram]) for gram in gram_keys], dtype=np.int64)
+        self.gram_rows = np.array([row_id for gram in gram_keys for row_id in postings[gram]], dtype=np.int32)
+        self.prefix_keys = np.array([key for key, _ in word_starts], dtype=str)
+        self.prefix_rows = np.array([row_id for _, row_id in word_starts], dtype=np.int32)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuilds an index from arrays() output, e.g. read-only memory-mapped .npy files."""
+        index = cls.__new__(cls)
+        for name in cls.ARRAY_NAMES:
+            setattr(index, name, arrays[name])
+        return index
+
+    def arrays(self):
+        """The index as a dict of NumPy arrays, keyed by ARRAY_NAMES."""
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _posting(self, gram):
+        i = np.searchsorted(self.gram_keys, gram)
+        if i == len(self.gram_keys) or self.gram_keys[i] != gram:
+            return self.gram_rows[:0]
+        return self.gram_rows[self.gram_offsets[i]:self.gram_offsets[i + 1]]
+
+    def position_ids(self, position):
+        """Row ids for one position code, in dataset order."""
+        return np.flatnonzero(self.positions == position).tolist()
+
+    def substring_ids(self, query):
+        """Row ids whose folded name contains the folded query, in dataset order."""
+        query = fold_name(query)
+        if not query:
+            return list(range(len(self)))
+        if len(query) < 3:
+            return np.flatnonzero(np.char.find(self.folded, query) >= 0).tolist()
+
+        postings = sorted((self._posting(gram) for gram in _trigrams(query, padded=False)), key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        return [int(row_id) for row_id in candidates if query in str(self.folded[row_id])]
+
+    def fuzzy_ids(self, query, limit=10, threshold=FUZZY_THRESHOLD):
+        """
+        Row ids ranked by trigram similarity to the query, best match first.
+
+        Rows are scored by the share of the query's trigrams they contain, so a typo in
+        just a surname still scores well, and ties go to the name closest in length.
+        """
+        query_grams = _trigrams(fold_name(query))
+        postings = [self._posting(gram) for gram in query_grams]
+        if not postings or not sum(len(posting) for posting in postings):
+            return []
+        row_ids, overlap = np.unique(np.concatenate(postings), return_counts=True)
+
+        coverage = overlap / len(query_grams)
+        dice = 2.0 * overlap / (len(query_grams) + self.gram_counts[row_ids])
+        keep = coverage >= threshold
+        row_ids, coverage, dice = row_ids[keep], coverage[keep], dice[keep]
+        order = np.lexsort((row_ids, -dice, -coverage))
+        return row_ids[order[:limit]].tolist()
+
+    def search(self, query='', position=''):
+        """
+        Answers a /players style query.
+
+        Substring matches come back in dataset order. When nothing contains the query,
+        the closest names by trigram similarity are returned instead so typos still
+        find someone. A position code narrows either result.
+        """
+        row_ids = self.substring_ids(query)
+        if not row_ids and fold_name(query):
+            row_ids = self.fuzzy_ids(query, limit=len(self))
+        if position:
+            allowed = set(self.position_ids(position))
+            row_ids = [row_id for row_id in row_ids if row_id in allowed]
+        return row_ids
+
+    def prefix_ids(self, query):
+        """Row ids with a word starting with the folded query, in dataset order."""
+        query = fold_name(query)
+        if not query:
+            return []
+        row_ids = set()
+        for i in range(int(np.searchsorted(self.prefix_keys, query)), len(self.prefix_keys)):
+            if not str(self.prefix_keys[i]).startswith(query):
+                break
+            row_ids.add(int(self.prefix_rows[i]))
+        return sorted(row_ids)
+
+    def suggest(self, query, limit=SUGGESTION_LIMIT):
+        """
+        Names for an autocomplete box.
+
+        Word-prefix matches come first, then names that merely contain the query. Only
+        when neither finds anything are close fuzzy matches offered for a mistyped name.
+        """
+        if not fold_name(query):
+            return []
+        row_ids = self.prefix_ids(query)
+        if len(row_ids) < limit:
+            seen = set(row_ids)
+            row_ids += [row_id for row_id in self.substring_ids(query) if row_id not in seen]
+        if not row_ids:
+            row_ids = self.fuzzy_ids(query, limit=limit)
+        return [str(self.names[row_id]) for row_id in row_ids[:limit]]
+
+    def close_matches(self, query, limit=5):
+        """Names most similar to the query, for 'did you mean' suggestions."""
+        return [str(self.names[row_id]) for row_id in self.fuzzy_ids(query, limit=limit)]
+
+
+def load_search_index(db_name='basketball.db'):
+    """Builds the name index from the 'nba_players' table once per process."""
+    db_name = db_name if os.path.isabs(db_name) else os.path.join(BASE_DIR, db_name)
+    if db_name not in _loaded_indexes:
+        rows = query("SELECT player_name, position FROM nba_players", db_name=db_name)
+        _loaded_indexes[db_name] = PlayerSearchIndex([row[0] for row in rows], [row[1] for row in rows])
+    return _loaded_indexes[db_name]
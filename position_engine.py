@@ -0,0 +1,162 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# Order shared by the CLI dictionaries, the position centroids and every stat matrix
+STAT_KEYS = ['Field Goal Percentage', '3P%', 'STL', 'BLK', 'TOV', 'PF', 'Points', 'AST', 'TRB']
+STAT_COLUMNS = ['fg_pct', 'three_p_pct', 'stl', 'blk', 'tov', 'pf', 'pts', 'ast', 'trb']
+PERCENT_COLUMNS = ['fg_pct', 'three_p_pct']
+
+# Stats where a lower value is better
+INVERSE_STATS = ['tov', 'pf']
+
+# +1 where more is better, -1 for INVERSE_STATS, in STAT_COLUMNS order
+STAT_DIRECTIONS = np.array([-1.0 if col in INVERSE_STATS else 1.0 for col in STAT_COLUMNS])
+
+POSITION_CODES = ['C', 'PF', 'SF', 'SG', 'PG']
+POSITION_NAMES = ['Center', 'Power Forward', 'Small Forward', 'Shooting Guard', 'Point Guard']
+
+NBA_GAME_MINUTES = 48
+
+PositionFit = namedtuple('PositionFit', ['best_index', 'distances', 'relative', 'ranked'])
+
+
+def stats_to_vector(user_stats, stat_keys=STAT_KEYS):
+    """Turn one stat dictionary into a row in STAT_KEYS order."""
+    return np.array([float(user_stats[key]) for key in stat_keys], dtype=np.float64)
+
+
+def per_minute_vector(game_stats, minutes):
+    """
+    Builds a STAT_COLUMNS-ordered row from per-game stats keyed by DB column name.
+
+    Shooting percentages are kept as-is; counting stats are divided by minutes played,
+    matching what get_user_stats() does for the CLI.
+    """
+    minutes = float(minutes) if minutes else float(NBA_GAME_MINUTES)
+    return np.array([
+        float(game_stats[col]) if col in PERCENT_COLUMNS else float(game_stats[col]) / minutes
+        for col in STAT_COLUMNS
+    ], dtype=np.float64)
+
+
+def per_minute_matrix(stat_matrix, minutes):
+    """
+    Per-minute version of an (N x 9) STAT_COLUMNS matrix of per-game stats.
+
+    Each row's counting stats are divided by that row's minutes; like per_minute_vector(),
+    a row without minutes is taken as a full NBA game.
+    """
+    matrix = np.array(stat_matrix, dtype=np.float64)
+    minutes = np.asarray(minutes, dtype=np.float64)
+    minutes = np.where(minutes > 0, minutes, float(NBA_GAME_MINUTES))
+    counting = [i for i, col in enumerate(STAT_COLUMNS) if col not in PERCENT_COLUMNS]
+    matrix[:, counting] /= minutes[:, None]
+    return matrix
+
+
+def centroid_matrix(positions, stat_keys=STAT_KEYS):
+    """Stack the per-position average dictionaries into a (5 x 9) matrix."""
+    return np.array([[float(pos[key]) for key in stat_keys] for pos in positions], dtype=np.float64)
+
+
+def centroids_from_players(players_df, position_col='position'):
+    """
+    Averages each position's stats from a player table using STAT_COLUMNS names.
+
+    Counting stats are per game in the source data, so they are divided by the length
+    of an NBA game to put them on the same per-minute scale as user input.
+    """
+    grouped = players_df.groupby(players_df[position_col].astype(str).str.strip())[STAT_COLUMNS].mean()
+    grouped = grouped.reindex(POSITION_CODES)
+    if grouped.isna().any().any():
+        missing = [code for code in POSITION_CODES if grouped.loc[code].isna().any()]
+        raise ValueError(f"No players found for position(s): {', '.join(missing)}")
+    return per_minute_centroids(grouped.to_numpy(dtype=np.float64))
+
+
+def per_minute_centroids(mean_matrix):
+    """Converts a (5 x 9) matrix of per-game position averages to the per-minute scale."""
+    centroids = np.array(mean_matrix, dtype=np.float64)
+    counting = [i for i, col in enumerate(STAT_COLUMNS) if col not in PERCENT_COLUMNS]
+    centroids[:, counting] = centroids[:, counting] / NBA_GAME_MINUTES
+    return centroids.round(5)
+
+
+def score_positions(stat_matrix, centroids):
+    """
+    Scores every stat line against every position centroid in one vectorized pass.
+
+    Each stat is compared as a percentage difference from the position average and the
+    mean absolute difference is the distance to that position (lower is a better fit).
+
+    Args:
+        stat_matrix (array-like): (N x 9) stat lines in STAT_KEYS order, or a single row.
+        centroids (array-like): (5 x 9) position averages in POSITION_CODES order.
+
+    Returns:
+        PositionFit: best_index (N,), distances (N x 5), relative (N x 9) signed
+        differences against the best position, and ranked (N x 9) stat indices sorted
+        from weakest to strongest against that position's average, where being below
+        average counts as a strength for INVERSE_STATS.
+    """
+    stat_matrix = np.atleast_2d(np.asarray(stat_matrix, dtype=np.float64))
+    centroids = np.asarray(centroids, dtype=np.float64)
+
+    # Zero averages would divide by zero, treat those stats as "no difference" instead
+    safe_centroids = np.where(centroids != 0, centroids, 1.0)
+    relative_all = (stat_matrix[:, None, :] - centroids[None, :, :]) / safe_centroids[None, :, :]
+    relative_all[:, centroids == 0] = 0.0
+
+    distances = np.abs(relative_all).mean(axis=2)
+    best_index = distances.argmin(axis=1)
+    relative = relative_all[np.arange(stat_matrix.shape[0]), best_index]
+    ranked = np.argsort(relative * STAT_DIRECTIONS, axis=1, kind='stable')
+
+    return PositionFit(best_index, distances, relative, ranked)
+
+
+def fit_positions_batch(stat_matrix, centroids, chunk_size=50000):
+    """
+    Batch entry point for scoring large numbers of stat lines.
+
+    Works through the matrix in chunks so the (N x 5 x 9) intermediate stays bounded
+    regardless of how many rows are passed in.
+    """
+    stat_matrix = np.atleast_2d(np.asarray(stat_matrix, dtype=np.float64))
+    parts = [
+        score_positions(stat_matrix[start:start + chunk_size], centroids)
+        for start in range(0, stat_matrix.shape[0], chunk_size)
+    ]
+    if not parts:
+        empty = np.empty((0, len(STAT_KEYS)))
+        return PositionFit(np.empty(0, dtype=np.intp), np.empty((0, len(POSITION_CODES))),
+                           empty, empty.astype(np.intp))
+    return PositionFit(*(np.concatenate(field) for field in zip(*parts)))
+
+
+def describe_fit(fit, row=0, count=3, stat_names=STAT_KEYS):
+    """
+    Summarizes one row of a PositionFit for display.
+
+    Returns:
+        tuple: (position name, weakest stats, strongest stats), both against the
+        position's average and with fewer turnovers and fouls counted as better
+    """
+    order = fit.ranked[row]
+    below = [stat_names[i] for i in order[:count]]
+    above = [stat_names[i] for i in order[::-1][:count]]
+    return POSITION_NAMES[fit.best_index[row]], below, above
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    sample_centroids = rng.uniform(0.05, 0.6, size=(len(POSITION_CODES), len(STAT_KEYS)))
+    sample_rows = sample_centroids[rng.integers(0, len(POSITION_CODES), 100000)]
+    sample_rows = sample_rows * rng.uniform(0.5, 1.5, size=sample_rows.shape)
+
+    start = time.perf_counter()
+    result = fit_positions_batch(sample_rows, sample_centroids)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {len(result.best_index)} stat lines in {elapsed:.3f}s")
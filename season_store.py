@@ -0,0 +1,274 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from pagination import PAGE_SIZE, paginate, sort_keys
+from player_search import PlayerSearchIndex
+from position_engine import POSITION_CODES, STAT_COLUMNS, per_minute_centroids, per_minute_matrix
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = 'season_store'
+MANIFEST_FILE = 'manifest.json'
+
+# nba_stats.csv holds the 2024-25 regular season; seasons are labelled by the year they end
+CURRENT_SEASON = 2025
+
+# Numeric columns kept per season, stored as one float32 matrix in this order
+STORE_COLUMNS = STAT_COLUMNS + ['mp', 'fg_attempts', 'ft_attempts']
+
+# Stores already opened in this process, keyed by directory
+_loaded_stores = {}
+
+
+def _resolve(path):
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+def _read_manifest(store_dir):
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {'columns': STORE_COLUMNS, 'seasons': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_season(season, players_df, store_dir=STORE_DIR, source_hash=''):
+    """
+    Writes one season's players as column files under store_dir/<season>/.
+
+    Args:
+        season (int): Year the season ends in, e.g. 2025 for 2024-25.
+        players_df (pandas.DataFrame): Player table with player_name, position and the
+            STORE_COLUMNS stats ('mins_played' is accepted for 'mp').
+        store_dir (str): Root of the season store. Defaults to 'season_store'.
+        source_hash (str): Fingerprint of the data the season was built from.
+    """
+    store_dir = _resolve(store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    frame = players_df.rename(columns={'mins_played': 'mp'})
+
+    stats = np.column_stack([
+        pd.to_numeric(frame[col], errors='coerce').fillna(0.0).to_numpy(dtype=np.float32)
+        if col in frame.columns else np.zeros(len(frame), dtype=np.float32)
+        for col in STORE_COLUMNS
+    ]) if len(frame) else np.empty((0, len(STORE_COLUMNS)), dtype=np.float32)
+
+    # Build the partition beside the old one and swap it in, so readers never see half a season
+    staging = tempfile.mkdtemp(dir=store_dir, prefix=f".{season}-")
+    np.save(os.path.join(staging, 'stats.npy'), stats)
+    np.save(os.path.join(staging, 'names.npy'), frame['player_name'].astype(str).to_numpy(dtype=str))
+    np.save(os.path.join(staging, 'positions.npy'), frame['position'].astype(str).str.strip().to_numpy(dtype=str))
+
+    target = os.path.join(store_dir, str(season))
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    # mkdtemp makes it owner-only; the web workers may run as another user
+    os.chmod(staging, 0o755)
+    os.replace(staging, target)
+
+    manifest = _read_manifest(store_dir)
+    manifest['columns'] = STORE_COLUMNS
+    manifest['seasons'][str(season)] = {'rows': int(len(frame)), 'source_hash': source_hash}
+    manifest_tmp = os.path.join(store_dir, f".{MANIFEST_FILE}.tmp")
+    with open(manifest_tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_tmp, os.path.join(store_dir, MANIFEST_FILE))
+
+
+def season_is_current(season, source_hash, store_dir=STORE_DIR):
+    """Whether store_dir already holds season as built from data with source_hash."""
+    store_dir = _resolve(store_dir)
+    try:
+        entry = _read_manifest(store_dir)['seasons'].get(str(season))
+    except (OSError, ValueError):
+        return False
+    return (entry is not None and entry.get('source_hash') == source_hash
+            and os.path.isdir(os.path.join(store_dir, str(season))))
+
+
+class SeasonPartition:
+    """One season's column files, memory-mapped so only the pages a query touches are read."""
+
+    def __init__(self, season, path):
+        self.season = season
+        self.stats = np.load(os.path.join(path, 'stats.npy'), mmap_mode='r')
+        self.names = np.load(os.path.join(path, 'names.npy'), mmap_mode='r')
+        self.positions = np.load(os.path.join(path, 'positions.npy'), mmap_mode='r')
+        self._search_index = None
+
+    def __len__(self):
+        return self.stats.shape[0]
+
+    @property
+    def search_index(self):
+        # Names only, built the first time this season is searched
+        if self._search_index is None:
+            self._search_index = PlayerSearchIndex(self.names, self.positions)
+        return self._search_index
+
+    def record(self, row_id):
+        """One player as the same dict shape the single-season routes use."""
+        # Stored as float32, so round away the noise the widening to float adds (29.6 not 29.6000004)
+        record = {col: round(float(value), 4) for col, value in zip(STORE_COLUMNS, self.stats[row_id])}
+        record.update(player_name=str(self.names[row_id]), position=str(self.positions[row_id]), season=self.season)
+        return record
+
+
+class SeasonStore:
+    """
+    Season-partitioned columnar store of NBA player stats.
+
+    Each season lives in its own directory of .npy files listed in manifest.json.
+    Queries take an inclusive (start, end) season window and visit one memory-mapped
+    partition at a time, so a window of many seasons never has to fit in RAM at once.
+    """
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = _resolve(store_dir)
+        self._manifest_mtime = None
+        self._manifest = None
+        self._partitions = {}
+
+    def _current_manifest(self):
+        path = os.path.join(self.store_dir, MANIFEST_FILE)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        if self._manifest is None or mtime != self._manifest_mtime:
+            self._manifest = _read_manifest(self.store_dir)
+            self._manifest_mtime = mtime
+            # Rewritten seasons must be re-mapped from their new files
+            self._partitions = {}
+        return self._manifest
+
+    def refresh(self):
+        """Re-reads manifest.json and re-maps every season on next use."""
+        self._manifest = None
+        self._partitions = {}
+
+    @property
+    def version(self):
+        """Changes whenever manifest.json is rewritten, i.e. whenever any season changes."""
+        self._current_manifest()
+        return str(self._manifest_mtime)
+
+    @property
+    def seasons(self):
+        return sorted(int(season) for season in self._current_manifest()['seasons'])
+
+    def select(self, start=None, end=None):
+        """Seasons in the inclusive window; a missing bound is open-ended."""
+        return [
+            season for season in self.seasons
+            if (start is None or season >= start) and (end is None or season <= end)
+        ]
+
+    def partition(self, season):
+        self._current_manifest()
+        if season not in self._partitions:
+            self._partitions[season] = SeasonPartition(season, os.path.join(self.store_dir, str(season)))
+        return self._partitions[season]
+
+    def partitions(self, start=None, end=None):
+        for season in self.select(start, end):
+            yield self.partition(season)
+
+    def position_centroids(self, start=None, end=None):
+        """
+        Per-minute (5 x 9) position averages over every player in the window.
+
+        Sums and counts are accumulated season by season with bincount, so the result
+        matches averaging one big table without ever building it.
+        """
+        sums = np.zeros((len(POSITION_CODES), len(STAT_COLUMNS)))
+        counts = np.zeros(len(POSITION_CODES))
+        code_lookup = {code: i for i, code in enumerate(POSITION_CODES)}
+        for part in self.partitions(start, end):
+            codes = np.array([code_lookup.get(str(pos), -1) for pos in part.positions])
+            keep = codes >= 0
+            codes = codes[keep]
+            counts += np.bincount(codes, minlength=len(POSITION_CODES))
+            for col in range(len(STAT_COLUMNS)):
+                sums[:, col] += np.bincount(codes, weights=part.stats[keep, col], minlength=len(POSITION_CODES))
+
+        if (counts == 0).any():
+            missing = [code for code, count in zip(POSITION_CODES, counts) if count == 0]
+            raise ValueError(f"No players found for position(s): {', '.join(missing)}")
+        return per_minute_centroids(sums / counts[:, None])
+
+    def top_k(self, user_vector, k=1, start=None, end=None):
+        """
+        Closest players to a per-minute STAT_COLUMNS vector across the window.
+
+        Players' per-game stats are put per minute with their own 'mp', z-scored with
+        the window's means and stds gathered in a first pass, then each season keeps only
+        its k best rows before the final merge.
+
+        Returns:
+            list: (season, player name, distance) tuples, closest first.
+        """
+        parts = list(self.partitions(start, end))
+        n_stats = len(STAT_COLUMNS)
+        minutes_col = STORE_COLUMNS.index('mp')
+
+        def per_minute(part):
+            return per_minute_matrix(part.stats[:, :n_stats], part.stats[:, minutes_col])
+
+        total, sums, squares = 0, np.zeros(n_stats), np.zeros(n_stats)
+        for part in parts:
+            block = per_minute(part)
+            total += block.shape[0]
+            sums += block.sum(axis=0)
+            squares += (block ** 2).sum(axis=0)
+        if total < 2:
+            return []
+
+        means = sums / total
+        stds = np.sqrt(np.maximum((squares - total * means ** 2) / (total - 1), 0.0))
+        stds = np.where(stds > 0, stds, 1.0)
+        query = (np.asarray(user_vector, dtype=np.float64) - means) / stds
+
+        candidates = []
+        for part in parts:
+            block = (per_minute(part) - means) / stds
+            distances = np.linalg.norm(block - query, axis=1)
+            best = np.argsort(distances, kind='stable')[:k]
+            candidates.extend((float(distances[i]), part.season, str(part.names[i])) for i in best)
+
+        candidates.sort(key=lambda item: item[0])
+        return [(season, name, distance) for distance, season, name in candidates[:k]]
+
+    def search_page(self, query='', position='', start=None, end=None, sort='', cursor=None, limit=PAGE_SIZE):
+        """
+        One page of a /players query across the window, newest season first.
+
+        Matches are gathered as row ids per season and sorted together; only the page's
+        rows become dicts, each with its row 'id' within its season.
+
+        Returns:
+            tuple: (records, next page's cursor token or None, number of matching players).
+        """
+        parts, row_ids, keys = [], [], []
+        for season in reversed(self.select(start, end)):
+            part = self.partition(season)
+            ids = np.asarray(part.search_index.search(query, position), dtype=np.intp)
+            parts.append(part)
+            row_ids.append(ids)
+            keys.append(sort_keys(sort, part.search_index.folded[ids], part.stats[ids]))
+
+        owners = np.repeat(np.arange(len(parts)), [len(ids) for ids in row_ids])
+        row_ids = np.concatenate(row_ids) if row_ids else np.empty(0, dtype=np.intp)
+        keys = np.concatenate(keys) if keys and keys[0] is not None else None
+        page, next_cursor = paginate(keys, len(row_ids), cursor, limit)
+        records = [dict(parts[owners[i]].record(row_ids[i]), id=int(row_ids[i])) for i in page]
+        return records, next_cursor, len(row_ids)
+
+
+def load_season_store(store_dir=STORE_DIR):
+    """Returns the process-wide SeasonStore for store_dir."""
+    store_dir = _resolve(store_dir)
+    if store_dir not in _loaded_stores:
+        _loaded_stores[store_dir] = SeasonStore(store_dir)
+    return _loaded_stores[store_dir]
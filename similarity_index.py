@@ -0,0 +1,297 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from average_stat import csv_fingerprint
+from db_connection import read_frame
+from position_engine import STAT_COLUMNS, per_minute_matrix
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE = 'player_index.npz'
+
+# Written into the index file and bumped whenever the stored stats change meaning, so an
+# index built by older code is rebuilt (2: counting stats per minute instead of per game)
+INDEX_FORMAT = 2
+
+# Distances find_ideal_player_match can rank players by:
+#   euclidean   - straight-line distance between z-scores, every stat counted equally
+#   mahalanobis - distance after whitening the stats' covariance, so correlated stats
+#                 (PTS with FGA, BLK with TRB) aren't counted twice
+#   weighted    - z-score distance with a per-stat weight on each squared difference
+SIMILARITY_METRICS = ('euclidean', 'mahalanobis', 'weighted')
+
+# Query-by-player scores held at once by top_k_batch (32MB of float32), so a batch over
+# a many-season index is split into smaller query chunks instead of growing with it
+SCORE_BUDGET = 1 << 23
+
+# Added to the correlation matrix's diagonal so a constant or duplicated stat still
+# leaves it positive definite for the Cholesky factorization
+COVARIANCE_RIDGE = 1e-6
+
+# Indexes already loaded in this process, keyed by the index file path
+_loaded_indexes = {}
+
+
+def _resolve(path):
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+def stat_weights(weights=None):
+    """
+    Per-stat weights in STAT_COLUMNS order.
+
+    Args:
+        weights (dict | list): {stat: weight} with unlisted stats weighted 1.0, or one
+            weight per STAT_COLUMNS entry. None weights every stat 1.0.
+
+    Returns:
+        numpy.ndarray: The weights as float64.
+    """
+    if weights is None:
+        return np.ones(len(STAT_COLUMNS))
+    if isinstance(weights, dict):
+        unknown = [stat for stat in weights if stat not in STAT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown stat(s) in weights: {', '.join(unknown)}")
+        vector = np.array([float(weights.get(stat, 1.0)) for stat in STAT_COLUMNS])
+    else:
+        vector = np.asarray(weights, dtype=np.float64)
+        if vector.shape != (len(STAT_COLUMNS),):
+            raise ValueError(f"Expected {len(STAT_COLUMNS)} weights, got {vector.size}")
+    if not np.isfinite(vector).all() or (vector < 0).any() or not vector.any():
+        raise ValueError("Weights must be non-negative numbers and not all zero")
+    return vector
+
+
+def parse_weights(text):
+    """Reads weights written as 'pts=2,ast=1.5' into a {stat: weight} dict."""
+    weights = {}
+    for part in filter(None, (piece.strip() for piece in text.split(','))):
+        stat, sep, value = part.partition('=')
+        if not sep:
+            raise ValueError(f"Expected stat=weight, got '{part}'")
+        try:
+            weights[stat.strip()] = float(value)
+        except ValueError:
+            raise ValueError(f"Weight for {stat.strip()} must be a number")
+    stat_weights(weights)
+    return weights
+
+
+class PlayerSimilarityIndex:
+    """
+    Nearest-neighbour lookup over z-score standardized NBA player stats.
+
+    Counting stats are held per minute, the basis user stats are entered on, so a
+    query is a per-minute STAT_COLUMNS vector like the ones per_minute_vector() builds.
+
+    The standardized float32 matrix and each row's squared norm are computed once, so a
+    query is a single matrix-vector product plus a partial sort of the k best rows:
+    ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2. With nine stats this brute-force scan is
+    faster than walking a KD-tree and needs no extra dependency.
+
+    Every metric is a 9 x 9 linear map applied to the centred stats before that scan
+    (scaling by 1 / std, optionally whitening or weighting too), so the player matrix is
+    mapped once when the index is built and each query pays only for mapping itself.
+    """
+
+    def __init__(self, names, raw_stats, means, stds, source_hash='', metric='euclidean', weights=None):
+        if metric not in SIMILARITY_METRICS:
+            raise ValueError(f"Unknown similarity metric '{metric}', expected one of: {', '.join(SIMILARITY_METRICS)}")
+        self.names = np.asarray(names, dtype=str)
+        self.raw_stats = np.asarray(raw_stats, dtype=np.float32)
+        self.means = np.asarray(means, dtype=np.float64)
+        # A constant column carries no information, keep it from dividing by zero
+        self.stds = np.where(np.asarray(stds, dtype=np.float64) > 0, stds, 1.0)
+        self.source_hash = source_hash
+        self.metric = metric
+        self.weights = stat_weights(weights) if metric == 'weighted' else None
+
+        self.transform = self._metric_transform()
+        self.matrix = ((self.raw_stats - self.means) @ self.transform).astype(np.float32)
+        self._sq_norms = np.einsum('ij,ij->i', self.matrix, self.matrix)
+        # Other metrics over the same players, built by with_metric() on first use
+        self._variants = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _metric_transform(self):
+        """The matrix that maps centred raw stats into the space distances are measured in."""
+        scale = np.diag(1.0 / self.stds)
+        if self.metric == 'weighted':
+            # sum(w * z^2) is the plain distance between z-scores scaled by sqrt(w)
+            return scale * np.sqrt(self.weights)
+        if self.metric == 'mahalanobis':
+            # With the z-scores' covariance C = L L^T, (z C^-1 z^T) = ||z L^-T||^2, so
+            # whitening by L^-T turns Mahalanobis distance into a straight-line one
+            if len(self) > 1:
+                z_scores = (self.raw_stats - self.means) / self.stds
+                covariance = np.atleast_2d(np.cov(z_scores, rowvar=False))
+            else:
+                covariance = np.eye(len(self.stds))
+            covariance += COVARIANCE_RIDGE * np.eye(len(covariance))
+            return scale @ np.linalg.inv(np.linalg.cholesky(covariance)).T
+        return scale
+
+    def with_metric(self, metric='euclidean', weights=None):
+        """
+        This index's players ranked by another similarity metric.
+
+        Each (metric, weights) pair is built once, the first time it is asked for, and
+        then reused, so switching metrics costs one pass over the players.
+        """
+        key = (metric, None if metric != 'weighted' else tuple(stat_weights(weights)))
+        if key == (self.metric, None if self.weights is None else tuple(self.weights)):
+            return self
+        if key not in self._variants:
+            self._variants[key] = PlayerSimilarityIndex(
+                self.names, self.raw_stats, self.means, self.stds, self.source_hash, metric, weights,
+            )
+        return self._variants[key]
+
+    @classmethod
+    def from_dataframe(cls, players_df, source_hash=''):
+        """
+        Builds the index from a player table with STAT_COLUMNS and player_name columns.
+
+        Per-game counting stats are divided by the table's 'mins_played' (or 'mp') column;
+        a table without one is taken to be per minute already.
+        """
+        numeric = players_df[STAT_COLUMNS].apply(pd.to_numeric, errors='coerce').fillna(0.0).astype(float)
+        minutes_col = next((col for col in ('mins_played', 'mp') if col in players_df.columns), None)
+        if minutes_col is not None:
+            minutes = pd.to_numeric(players_df[minutes_col], errors='coerce').fillna(0.0)
+            numeric = pd.DataFrame(per_minute_matrix(numeric, minutes), columns=STAT_COLUMNS)
+        return cls(
+            players_df['player_name'].astype(str).to_numpy(),
+            numeric.to_numpy(),
+            numeric.mean().to_numpy(),
+            numeric.std().to_numpy(),
+            source_hash,
+        )
+
+    def standardize(self, vectors):
+        """Maps raw stat vectors into the same space as the player matrix."""
+        return ((np.asarray(vectors, dtype=np.float64) - self.means) @ self.transform).astype(np.float32)
+
+    def top_k_batch(self, user_matrix, k=1, score_budget=SCORE_BUDGET):
+        """
+        Finds the k closest players for every row of an (N x 9) matrix of raw stats.
+
+        Queries are scored in chunks of score_budget // len(self) rows (at least one),
+        so memory stays flat however many players the index holds.
+
+        Returns:
+            tuple: (indices, distances), both (N x k) and ordered closest first.
+        """
+        queries = self.standardize(np.atleast_2d(user_matrix))
+        k = min(k, len(self))
+        all_indices = np.empty((queries.shape[0], k), dtype=np.intp)
+        all_distances = np.empty((queries.shape[0], k), dtype=np.float32)
+
+        chunk_size = max(1, score_budget // max(len(self), 1))
+        for start in range(0, queries.shape[0], chunk_size):
+            chunk = queries[start:start + chunk_size]
+            # The query's own norm is the same for every player, add it back only for the winners
+            scores = self._sq_norms[None, :] - 2.0 * (chunk @ self.matrix.T)
+            if k < len(self):
+                candidates = np.argpartition(scores, k - 1, axis=1)[:, :k]
+            else:
+                candidates = np.broadcast_to(np.arange(len(self)), scores.shape)
+            candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+            order = np.argsort(candidate_scores, axis=1, kind='stable')
+
+            stop = start + chunk.shape[0]
+            all_indices[start:stop] = np.take_along_axis(candidates, order, axis=1)
+            squared = np.take_along_axis(candidate_scores, order, axis=1) + np.einsum('ij,ij->i', chunk, chunk)[:, None]
+            all_distances[start:stop] = np.sqrt(np.maximum(squared, 0.0))
+
+        return all_indices, all_distances
+
+    def top_k(self, user_vector, k=1):
+        """Returns (indices, distances) of the k closest players to one raw stat vector."""
+        indices, distances = self.top_k_batch(np.asarray(user_vector, dtype=np.float64)[None, :], k)
+        return indices[0], distances[0]
+
+    def save(self, index_path=INDEX_FILE):
+        np.savez(
+            _resolve(index_path),
+            names=self.names,
+            raw_stats=self.raw_stats,
+            means=self.means,
+            stds=self.stds,
+            source_hash=np.array(self.source_hash),
+            format=np.array(INDEX_FORMAT),
+        )
+
+    @classmethod
+    def load(cls, index_path=INDEX_FILE):
+        with np.load(_resolve(index_path)) as data:
+            return cls(data['names'], data['raw_stats'], data['means'], data['stds'], str(data['source_hash']))
+
+
+def index_is_current(csv_filepath='nba_stats.csv', index_path=INDEX_FILE):
+    """Whether the index file on disk was built from the CSV's current content by this INDEX_FORMAT."""
+    try:
+        with np.load(_resolve(index_path)) as data:
+            return int(data['format']) == INDEX_FORMAT and str(data['source_hash']) == csv_fingerprint(csv_filepath)
+    except (OSError, KeyError, ValueError):
+        return False
+
+
+def forget_loaded_indexes():
+    """Drops the indexes this process has loaded, so the next lookup reads the file again."""
+    _loaded_indexes.clear()
+
+
+def build_similarity_index(db_name='basketball.db', csv_filepath='nba_stats.csv', index_path=INDEX_FILE):
+    """
+    Reads the 'nba_players' table once and writes the similarity index next to it.
+
+    Args:
+        db_name (str): SQLite database holding the imported players. Defaults to 'basketball.db'.
+        csv_filepath (str): CSV the table was imported from, used to tag the index version.
+        index_path (str): Where to write the index. Defaults to 'player_index.npz'.
+
+    Returns:
+        PlayerSimilarityIndex: The freshly built index.
+    """
+    players_df = read_frame(f"SELECT player_name, mins_played, {', '.join(STAT_COLUMNS)} FROM nba_players",
+                            db_name=db_name)
+
+    index = PlayerSimilarityIndex.from_dataframe(players_df, csv_fingerprint(csv_filepath))
+    try:
+        index.save(index_path)
+    except OSError as e:
+        # A read-only deploy can still use the in-memory index
+        print(f"Could not save similarity index: {e}")
+    _loaded_indexes[_resolve(index_path)] = index
+    return index
+
+
+def load_similarity_index(db_name='basketball.db', csv_filepath='nba_stats.csv', index_path=INDEX_FILE,
+                          metric='euclidean', weights=None):
+    """
+    Returns the similarity index, loading it from disk once per process.
+
+    The index is rebuilt from the database when the file is missing, was built from
+    a different version of the source CSV or by an older INDEX_FORMAT.
+
+    Args:
+        metric (str): One of SIMILARITY_METRICS. Defaults to 'euclidean'.
+        weights (dict | list): Per-stat weights for the 'weighted' metric.
+    """
+    path = _resolve(index_path)
+    source_hash = csv_fingerprint(csv_filepath)
+    index = _loaded_indexes.get(path)
+    if index is not None and index.source_hash == source_hash:
+        return index.with_metric(metric, weights)
+
+    if index_is_current(csv_filepath, index_path):
+        index = PlayerSimilarityIndex.load(path)
+        _loaded_indexes[path] = index
+        return index.with_metric(metric, weights)
+
+    return build_similarity_index(db_name, csv_filepath, index_path).with_metric(metric, weights)
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# The modules under test live in the project root, next to basketball.db
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# Keep test sign-ups out of the real users.db; read when my_flask_app.app is imported
+os.environ.setdefault('USERS_DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bpa-tests-'), 'users.db')}")
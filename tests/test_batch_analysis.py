@@ -0,0 +1,131 @@
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pytest
+
+import batch_analysis
+from batch_analysis import analyze_lines, reset_workers
+from position_engine import STAT_COLUMNS
+
+
+def stat_line(**overrides):
+    stats = dict.fromkeys(STAT_COLUMNS, 1.0)
+    stats.update(fg_pct=0.45, three_p_pct=0.35, minutes=30)
+    stats.update(overrides)
+    return json.dumps(stats)
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    reset_workers()
+    yield str(tmp_path / 'player_index.npz')
+    reset_workers()
+
+
+def test_reset_during_an_upload_moves_the_rest_to_a_new_pool(index_path):
+    def lines():
+        for i in range(6):
+            if i == 2:
+                # Chunks 0 and 1 are queued on the first pool by now
+                reset_workers()
+            yield stat_line(id=str(i))
+
+    results = [row for chunk in analyze_lines(lines(), workers=1, chunk_size=1, index_path=index_path)
+               for row in chunk]
+    assert [row['row'] for row in results] == list(range(6))
+    assert all('error' not in row and 'twin' in row for row in results)
+    assert batch_analysis._pool is not None
+
+
+def test_reset_just_before_a_submit(index_path, monkeypatch):
+    submits = []
+
+    class RacingPool(ProcessPoolExecutor):
+        def submit(self, *args, **kwargs):
+            submits.append(self)
+            if len(submits) == 2:
+                # Another request resets the workers while this chunk is on its way to the pool
+                resetter = threading.Thread(target=reset_workers)
+                resetter.start()
+                resetter.join(timeout=0.5)
+            return super().submit(*args, **kwargs)
+
+    monkeypatch.setattr(batch_analysis, 'ProcessPoolExecutor', RacingPool)
+    lines = (stat_line() for _ in range(4))
+    results = [row for chunk in analyze_lines(lines, workers=1, chunk_size=1, index_path=index_path)
+               for row in chunk]
+    assert [row['row'] for row in results] == list(range(4))
+    assert all('error' not in row for row in results)
+    assert submits[2] is not submits[1]
+
+
+# Per-game lines from nba_stats.csv, with the minutes each player averaged
+NBA_LINES = {
+    'Shai Gilgeous-Alexander': dict(fg_pct=0.519, three_p_pct=0.375, stl=1.7, blk=1.0, tov=2.4, pf=2.2,
+                                    pts=32.7, ast=6.4, trb=5.0, minutes=34.2),
+    'Nikola Jokić': dict(fg_pct=0.576, three_p_pct=0.417, stl=1.8, blk=0.6, tov=3.3, pf=2.3,
+                         pts=29.6, ast=10.2, trb=12.7, minutes=36.7),
+    'Rudy Gobert': dict(fg_pct=0.669, three_p_pct=0.0, stl=0.8, blk=1.4, tov=1.2, pf=2.5,
+                        pts=12.0, ast=1.8, trb=10.9, minutes=33.2),
+}
+
+
+def analyze(lines, index_path):
+    return [row for chunk in analyze_lines(lines, workers=0, index_path=index_path) for row in chunk]
+
+
+def test_an_nba_players_own_line_finds_that_player(index_path):
+    results = analyze([json.dumps(line) for line in NBA_LINES.values()], index_path)
+    assert [row['twin'] for row in results] == list(NBA_LINES)
+    assert all(row['twin_distance'] < 0.1 for row in results)
+
+
+def test_twins_are_matched_per_minute(index_path):
+    # The same production in half the minutes is the same player at the same rate
+    halved = [dict({stat: value / 2 for stat, value in line.items()},
+                   fg_pct=line['fg_pct'], three_p_pct=line['three_p_pct'])
+              for line in NBA_LINES.values()]
+    results = analyze([json.dumps(line) for line in halved], index_path)
+    assert [row['twin'] for row in results] == list(NBA_LINES)
+
+
+@pytest.fixture
+def signed_in(index_path, monkeypatch):
+    from my_flask_app import app as app_module
+    # In the request thread, against an index built for this test
+    monkeypatch.setattr(app_module, 'analyze_lines', partial(analyze_lines, workers=0, index_path=index_path))
+    client = app_module.app.test_client()
+    form = {'username': 'batch-tester', 'password': 'batch-pass-123'}
+    client.post('/register', data=dict(form, confirm_password=form['password']))
+    assert client.post('/login', data=form).status_code == 302
+    return client
+
+
+def test_api_analyze_streams_one_result_per_line(signed_in):
+    body = '\n'.join([
+        json.dumps(dict(NBA_LINES['Rudy Gobert'], id='gobert')),
+        '',
+        '{"pts": 10',
+        json.dumps({'pts': 10}),
+        json.dumps(NBA_LINES['Nikola Jokić']),
+    ])
+    response = signed_in.post('/api/analyze', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [row['row'] for row in rows] == [0, 1, 2, 3]
+    assert rows[0]['id'] == 'gobert'
+    assert rows[0]['twin'] == 'Rudy Gobert'
+    assert rows[0]['best_position'] and rows[0]['improve'] and rows[0]['exemplars']
+    assert rows[1]['error'].startswith('invalid JSON')
+    assert rows[2]['error'].startswith('missing stats')
+    assert rows[3]['twin'] == 'Nikola Jokić'
+
+
+def test_api_analyze_needs_a_sign_in():
+    from my_flask_app.app import app
+    response = app.test_client().post('/api/analyze', data=stat_line())
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
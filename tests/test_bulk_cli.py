@@ -0,0 +1,70 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from functools import partial
+
+import pytest
+
+import BPAmainExperimental
+from BPAmainExperimental import run_bulk_analysis
+from batch_analysis import analyze_lines
+from conftest import PROJECT_ROOT
+
+
+def run_menu(db, choices):
+    return subprocess.run(
+        [sys.executable, os.path.join(PROJECT_ROOT, 'BPAmainExperimental.py'), '--db', str(db)],
+        input=''.join(f"{choice}\n" for choice in choices), capture_output=True, text=True,
+        cwd=db.parent, timeout=120,
+    ).stdout
+
+
+def test_the_menu_saves_to_the_db_option(tmp_path):
+    db = tmp_path / 'history.db'
+    assert 'Goodbye' in run_menu(db, [5])
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM user_analysis").fetchone() == (0,)
+    assert not (tmp_path / 'player.db').exists()
+
+
+def test_sessions_logged_in_the_menu_show_on_its_dashboard(tmp_path):
+    # Log one game (nine stats and its length), then open the dashboard and exit
+    out = run_menu(tmp_path / 'history.db', [1, 0.5, 0.35, 1, 1, 2, 2, 20, 5, 6, 30, 2, 5])
+    assert 'Data successfully saved' in out
+    assert 'Total Sessions Logged: 1' in out
+
+
+class Interrupted(Exception):
+    pass
+
+
+def write_lines(path, count):
+    line = dict(fg_pct=0.45, three_p_pct=0.35, stl=1, blk=1, tov=2, pf=2, pts=20, ast=5, trb=6, minutes=30)
+    path.write_text(''.join(json.dumps(dict(line, pts=10 + i)) + '\n' for i in range(count)))
+
+
+def test_an_interrupted_bulk_run_resumes_after_its_last_saved_chunk(tmp_path, monkeypatch, capsys):
+    source, db = tmp_path / 'stats.jsonl', str(tmp_path / 'history.db')
+    write_lines(source, 7)
+    analyze = partial(analyze_lines, workers=0, index_path=str(tmp_path / 'player_index.npz'))
+
+    def fails_after_two_chunks(*args, **kwargs):
+        for i, results in enumerate(analyze(*args, **kwargs)):
+            if i == 2:
+                raise Interrupted
+            yield results
+
+    monkeypatch.setattr(BPAmainExperimental, 'analyze_lines', fails_after_two_chunks)
+    with pytest.raises(Interrupted):
+        run_bulk_analysis(str(source), db_name=db, chunk_size=3)
+
+    monkeypatch.setattr(BPAmainExperimental, 'analyze_lines', analyze)
+    run_bulk_analysis(str(source), db_name=db, chunk_size=3)
+    assert 'Resuming after row 6.' in capsys.readouterr().out
+    with sqlite3.connect(db) as conn:
+        saved = [row[0] for row in conn.execute("SELECT points_per_min FROM user_analysis ORDER BY id")]
+        assert conn.execute("SELECT COUNT(*) FROM bulk_progress").fetchone() == (0,)
+        assert conn.execute("SELECT session_count FROM user_summary").fetchone() == (7,)
+    assert saved == pytest.approx([(10 + i) / 30 for i in range(7)])
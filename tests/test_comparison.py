@@ -0,0 +1,45 @@
+import pytest
+
+from comparison import compare_to_player
+
+USER = dict(fg_pct=0.5, three_p_pct=0.4, stl=1, blk=1, tov=2, pf=3, pts=20, ast=4, trb=8,
+            minutes=30, fg_attempts=15, ft_attempts=5)
+PLAYER = dict(USER, player_name='Test Player', mp=36, pts=30, ast=6, trb=6, tov=0)
+
+
+def rows(result, section):
+    return {row['stat']: row for row in result[section]}
+
+
+def test_per_36_and_per_point_ratios():
+    result = compare_to_player(USER, PLAYER)
+    per_36 = rows(result, 'per_36')
+    assert per_36['pts']['user'] == pytest.approx(24.0)
+    assert per_36['pts']['player'] == pytest.approx(30.0)
+    assert per_36['pts']['ratio'] == pytest.approx(1.25)
+    per_point = rows(result, 'per_point')
+    assert per_point['ast']['user'] == pytest.approx(0.2)
+    assert per_point['ast']['player'] == pytest.approx(0.2)
+    assert per_point['ast']['ratio'] == pytest.approx(1.0)
+
+
+def test_true_shooting_and_radar():
+    result = compare_to_player(USER, PLAYER)
+    assert result['true_shooting']['user'] == pytest.approx(20 / (2 * (15 + 0.44 * 5)))
+    # Percentages x10, points / 4, the rest as entered
+    assert result['radar']['user'][:3] == pytest.approx([5.0, 4.0, 1.0])
+    assert result['radar']['player'][6] == pytest.approx(7.5)
+
+
+def test_undefined_values_are_none():
+    result = compare_to_player(dict(USER, pts=0), PLAYER)
+    # No turnovers leaves the player's A/TO, and so the ratio, undefined
+    assert result['assist_to_turnover'] == {'user': 2.0, 'player': None, 'ratio': None}
+    assert all(row['user'] is None and row['ratio'] is None for row in result['per_point'])
+    assert result['true_shooting']['user'] == 0.0
+
+
+def test_equal_inputs_share_a_cached_result():
+    first = compare_to_player(USER, PLAYER)
+    assert compare_to_player(dict(USER, pts=20.000001), dict(PLAYER)) is first
+    assert compare_to_player(dict(USER, pts=21), PLAYER) is not first
@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from BPAmainExperimental import clear_player_data, create_history_tables, generate_user_dashboard, update_user_data_stats
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    with conn:
+        create_history_tables(conn)
+    yield conn
+    conn.close()
+
+
+def log(conn, points, position):
+    update_user_data_stats(conn, {'Points': points}, position, 'TOV', 'AST', 'Some Player')
+
+
+def summary(conn):
+    return conn.execute('''
+        SELECT session_count, first_points_per_min, latest_points_per_min FROM user_summary
+    ''').fetchone()
+
+
+def test_triggers_keep_the_running_aggregates(conn):
+    log(conn, 0.5, 'Center')
+    log(conn, 0.6, 'Point Guard')
+    log(conn, 0.75, 'Center')
+    assert summary(conn) == (3, 0.5, 0.75)
+    assert dict(conn.execute("SELECT best_position, sessions FROM position_counts")) == {'Center': 2, 'Point Guard': 1}
+
+
+def test_the_dashboard_reads_the_aggregates(conn, capsys):
+    generate_user_dashboard(conn)
+    assert 'No history found' in capsys.readouterr().out
+    log(conn, 0.5, 'Center')
+    log(conn, 0.75, 'Point Guard')
+    generate_user_dashboard(conn)
+    out = capsys.readouterr().out
+    assert 'Total Sessions Logged: 2' in out
+    # Tied positions go to the alphabetically first
+    assert 'Primary Skill Identity: Center' in out
+    assert '+50.0% since first session' in out
+
+
+def test_histories_from_before_the_aggregates_are_summarized_once():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript('''
+        CREATE TABLE user_analysis (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, points_per_min REAL, best_position TEXT,
+            skills_above_avg TEXT, skills_to_improve TEXT, nba_comparison TEXT
+        );
+        INSERT INTO user_analysis (timestamp, points_per_min, best_position) VALUES
+            ('2025-01-02 10:00:00', 0.8, 'Center'),
+            ('2025-01-01 10:00:00', 0.4, 'Small Forward');
+    ''')
+    create_history_tables(conn)
+    create_history_tables(conn)
+    assert summary(conn) == (2, 0.4, 0.8)
+    log(conn, 0.9, 'Center')
+    assert summary(conn) == (3, 0.4, 0.9)
+
+
+def test_clearing_resets_the_aggregates(conn, monkeypatch):
+    log(conn, 0.5, 'Center')
+    monkeypatch.setattr('builtins.input', lambda prompt: 'DELETE')
+    clear_player_data(conn)
+    assert summary(conn) is None
+    assert conn.execute("SELECT COUNT(*) FROM position_counts").fetchone() == (0,)
+    log(conn, 0.7, 'Center')
+    assert summary(conn) == (1, 0.7, 0.7)
@@ -0,0 +1,93 @@
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from my_flask_app.app import DatasetHolder
+
+
+class Loader:
+    """Hands out numbered datasets once the gate is open, or raises while failing is set."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+        self.events = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self):
+        self.events.append('load')
+        self.gate.wait(timeout=5)
+        if self.failing:
+            raise RuntimeError('import in progress')
+        self.calls += 1
+        return SimpleNamespace(version=f"v{self.calls}")
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    path = tmp_path / 'basketball.db'
+    path.write_bytes(b'first import')
+    return path
+
+
+def rewrite(path, content):
+    # A new import, with an mtime the old signature can't share
+    path.write_bytes(content)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def wait_for_reload():
+    for thread in threading.enumerate():
+        if thread.name == 'dataset-reload':
+            thread.join(timeout=5)
+
+
+def holder_for(db_file, loader):
+    return DatasetHolder(loader, db_name=str(db_file), check_interval=0,
+                         on_reload=lambda: loader.events.append('on_reload'))
+
+
+def test_nothing_loads_before_the_first_request(db_file):
+    loader = Loader()
+    holder = holder_for(db_file, loader)
+    assert loader.calls == 0
+    assert holder.current.version == 'v1'
+    assert holder.current.version == 'v1'
+    assert loader.calls == 1
+
+
+def test_a_new_import_is_swapped_in_after_on_reload(db_file):
+    loader = Loader()
+    holder = holder_for(db_file, loader)
+    first = holder.current
+    loader.gate.clear()
+    rewrite(db_file, b'second import')
+
+    # Requests keep getting the old dataset while the new one loads
+    assert holder.current is first
+    assert holder.current is first
+    loader.gate.set()
+    wait_for_reload()
+    assert holder.current.version == 'v2'
+    assert loader.events == ['load', 'on_reload', 'load']
+
+
+def test_a_failed_reload_keeps_serving_and_retries(db_file):
+    loader = Loader()
+    holder = holder_for(db_file, loader)
+    holder.current
+    loader.failing = True
+    rewrite(db_file, b'half written')
+    holder.current
+    wait_for_reload()
+    assert holder.current.version == 'v1'
+
+    # The failed attempt left the old signature, so the next check tries again
+    loader.failing = False
+    holder.current
+    wait_for_reload()
+    assert holder.current.version == 'v2'
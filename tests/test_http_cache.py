@@ -0,0 +1,43 @@
+import gzip
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def client():
+    from my_flask_app.app import app
+    return app.test_client()
+
+
+def test_unchanged_page_is_answered_with_304(client):
+    first = client.get('/players?position=C')
+    assert first.status_code == 200
+    assert first.headers['ETag'].startswith('W/')
+
+    again = client.get('/players?position=C', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == first.headers['ETag']
+
+
+def test_etag_depends_on_the_query(client):
+    centers = client.get('/players?position=C').headers['ETag']
+    guards = client.get('/players?position=PG').headers['ETag']
+    assert centers != guards
+    assert client.get('/players?position=PG', headers={'If-None-Match': centers}).status_code == 200
+
+
+def test_pages_are_gzipped_for_clients_that_accept_it(client):
+    response = client.get('/players', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'<html' in gzip.decompress(response.data).lower()
+    assert 'Content-Encoding' not in client.get('/players').headers
+
+
+def test_static_urls_are_fingerprinted_and_cached(client):
+    page = client.get('/players').data.decode()
+    assert 'js/radar.js?v=' in page
+    url = next(part.split('"', 1)[0] for part in page.split('src="')[1:] if part.startswith('/static/'))
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.cache_control.immutable
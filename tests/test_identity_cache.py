@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import event
+
+from my_flask_app import identity_cache as cache_module
+from my_flask_app.app import app
+from my_flask_app.identity_cache import IdentityCache, cached_user_stats, identity_cache, load_cached_user
+from my_flask_app.models import User, UserStats, db
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = IdentityCache(ttl=5)
+    cache.set(('user', 1), {'id': 1})
+    clock[0] += 5
+    assert cache.get(('user', 1)) == ({'id': 1}, True)
+    clock[0] += 0.1
+    assert cache.get(('user', 1)) == (None, False)
+
+
+def test_least_recently_used_users_are_dropped_first():
+    cache = IdentityCache(max_size=2)
+    cache.set(('user', 1), 'one')
+    cache.set(('user', 2), 'two')
+    cache.get(('user', 1))
+    cache.set(('user', 3), 'three')
+    assert cache.get(('user', 2)) == (None, False)
+    assert cache.get(('user', 1)) == ('one', True)
+    cache.forget(1)
+    assert cache.get(('user', 1)) == (None, False)
+
+
+@pytest.fixture
+def user():
+    with app.app_context():
+        db.create_all()
+        identity_cache.clear()
+        account = User(username='cache-tester', password_hash='not-a-real-hash')
+        db.session.add(account)
+        db.session.commit()
+        yield account.id
+        db.session.rollback()
+        UserStats.query.filter_by(user_id=account.id).delete()
+        db.session.delete(db.session.get(User, account.id))
+        db.session.commit()
+        db.session.remove()
+
+
+def test_cached_users_skip_the_query(user):
+    assert load_cached_user(user).username == 'cache-tester'
+    db.session.remove()
+    queries = []
+
+    def record(conn, cursor, statement, *args):
+        queries.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        # A cached user comes back attached to the new session, without a SELECT
+        cached = load_cached_user(user)
+        assert cached.username == 'cache-tester'
+        assert cached in db.session
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert queries == []
+
+
+def test_committed_stats_replace_the_cached_snapshot(user):
+    assert cached_user_stats(user) is None
+    db.session.add(UserStats(user_id=user, pts=12.0, compare_player='Rudy Gobert'))
+    db.session.flush()
+    # Still the committed answer until the commit lands
+    assert cached_user_stats(user) is None
+    db.session.commit()
+    assert cached_user_stats(user)['stats']['pts'] == 12.0
+
+    UserStats.query.filter_by(user_id=user).first().pts = 20.0
+    db.session.commit()
+    assert cached_user_stats(user)['stats']['pts'] == 20.0
+
+
+def test_rolled_back_changes_keep_the_cache(user):
+    db.session.add(UserStats(user_id=user, pts=12.0))
+    db.session.commit()
+    snapshot = cached_user_stats(user)
+
+    UserStats.query.filter_by(user_id=user).first().pts = 99.0
+    db.session.flush()
+    db.session.rollback()
+    assert cached_user_stats(user) is snapshot
+
+
+def test_password_changes_drop_the_cached_user(user):
+    load_cached_user(user)
+    assert identity_cache.get(('user', user))[1]
+    db.session.get(User, user).password_hash = 'another-hash'
+    db.session.commit()
+    assert identity_cache.get(('user', user)) == (None, False)
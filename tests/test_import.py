@@ -0,0 +1,101 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from init_db import import_csv_to_sql
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Enough rows for every position to have players, so the centroids can be computed
+SAMPLE_ROWS = 60
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    raw = pd.read_csv(os.path.join(PROJECT_ROOT, 'nba_stats.csv')).head(SAMPLE_ROWS)
+    paths = {
+        'csv': str(tmp_path / 'players.csv'),
+        'db': str(tmp_path / 'players.db'),
+        'outputs': {
+            'index_path': str(tmp_path / 'index.npz'),
+            'store_dir': str(tmp_path / 'store'),
+            'snapshot_dir': str(tmp_path / 'snapshot'),
+        },
+    }
+    raw.to_csv(paths['csv'], index=False)
+    return raw, paths
+
+
+def run_import(paths, **kwargs):
+    import_csv_to_sql(paths['csv'], paths['db'], **paths['outputs'], **kwargs)
+
+
+def players_table(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return dict(conn.execute("SELECT player_name, pts FROM nba_players"))
+    finally:
+        conn.close()
+
+
+def test_first_import_writes_every_row_and_artifact(workspace, capsys):
+    raw, paths = workspace
+    run_import(paths)
+
+    assert f"({SAMPLE_ROWS} written, 0 unchanged, 0 removed)" in capsys.readouterr().out
+    assert len(players_table(paths['db'])) == SAMPLE_ROWS
+    assert os.path.exists(paths['outputs']['index_path'])
+    assert os.path.exists(os.path.join(paths['outputs']['snapshot_dir'], 'manifest.json'))
+    assert os.path.exists(os.path.join(paths['outputs']['store_dir'], 'manifest.json'))
+
+
+def test_unchanged_import_writes_nothing(workspace, capsys):
+    raw, paths = workspace
+    run_import(paths)
+    capsys.readouterr()
+    db_mtime = os.stat(paths['db']).st_mtime_ns
+    index_mtime = os.stat(paths['outputs']['index_path']).st_mtime_ns
+
+    run_import(paths)
+
+    out = capsys.readouterr().out
+    assert f"(0 written, {SAMPLE_ROWS} unchanged, 0 removed)" in out
+    assert "Skipped rebuilding" in out
+    assert os.stat(paths['db']).st_mtime_ns == db_mtime
+    assert os.stat(paths['outputs']['index_path']).st_mtime_ns == index_mtime
+
+
+def test_changed_row_is_upserted(workspace, capsys):
+    raw, paths = workspace
+    run_import(paths)
+    name = raw.loc[3, 'Player']
+    raw.loc[3, 'PTS'] = 99.5
+    raw.to_csv(paths['csv'], index=False)
+
+    run_import(paths)
+
+    out = capsys.readouterr().out
+    assert f"(1 written, {SAMPLE_ROWS - 1} unchanged, 0 removed)" in out
+    assert "Skipped rebuilding" not in out.split("(1 written")[-1]
+    assert players_table(paths['db'])[name] == 99.5
+
+
+def test_removed_row_is_deleted(workspace, capsys):
+    raw, paths = workspace
+    run_import(paths)
+    name = raw.loc[5, 'Player']
+    raw.drop(index=5).to_csv(paths['csv'], index=False)
+
+    run_import(paths)
+
+    assert f"(0 written, {SAMPLE_ROWS - 1} unchanged, 1 removed)" in capsys.readouterr().out
+    assert name not in players_table(paths['db'])
+
+
+def test_full_rebuild_rewrites_every_row(workspace, capsys):
+    raw, paths = workspace
+    run_import(paths)
+    run_import(paths, full_rebuild=True)
+    assert f"({SAMPLE_ROWS} written, 0 unchanged, 0 removed)" in capsys.readouterr().out.split("attributes")[-1]
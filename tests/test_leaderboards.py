@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from leaderboards import StatLeaderboards
+from position_engine import POSITION_CODES, STAT_COLUMNS
+
+
+@pytest.fixture
+def players():
+    rng = np.random.default_rng(11)
+    frame = pd.DataFrame(rng.integers(0, 6, size=(120, len(STAT_COLUMNS))).astype(float), columns=STAT_COLUMNS)
+    frame['player_name'] = [f"Player {i}" for i in range(len(frame))]
+    frame['position'] = rng.choice(POSITION_CODES, len(frame))
+    frame.loc[3, 'pts'] = np.nan
+    return frame
+
+
+def full_sort(frame, stat, k=3):
+    """idxmax / idxmin over the table, one player at a time, as the CLI did before the boards."""
+    ranked = frame.dropna(subset=[stat]).copy()
+    top = []
+    for _ in range(k):
+        if ranked.empty:
+            break
+        row = ranked[stat].idxmin() if stat in ('tov', 'pf') else ranked[stat].idxmax()
+        top.append(ranked.at[row, 'player_name'])
+        ranked = ranked.drop(row)
+    return tuple(top)
+
+
+def boards_for(frame):
+    return StatLeaderboards(frame['player_name'], frame['position'], frame[STAT_COLUMNS].to_numpy())
+
+
+def test_boards_match_a_full_sort_with_ties(players):
+    boards = boards_for(players)
+    for stat in STAT_COLUMNS:
+        assert boards.top(stat, k=5) == full_sort(players, stat, k=5), stat
+        for code in POSITION_CODES:
+            assert boards.top(stat, code) == full_sort(players[players['position'] == code], stat), (stat, code)
+
+
+def test_lower_is_better_for_turnovers_and_fouls(players):
+    boards = boards_for(players)
+    best = players.set_index('player_name')
+    assert best.loc[boards.top('tov')[0], 'tov'] == players['tov'].min()
+    assert best.loc[boards.top('pts')[0], 'pts'] == players['pts'].max()
+
+
+def test_positions_by_name_and_unknown_lookups(players):
+    boards = boards_for(players)
+    assert boards.top('ast', 'Point Guard') == boards.top('ast', 'PG')
+    assert boards.top('ast', 'Sixth Man') == ()
+    assert boards.top('dunks') == ()
@@ -0,0 +1,59 @@
+import numpy as np
+
+from pagination import decode_cursor, encode_cursor, paginate, sort_keys
+from position_engine import STAT_COLUMNS
+
+
+def walk(keys, count, limit):
+    """Every page of count rows in order, following each page's cursor."""
+    pages, cursor = [], None
+    while True:
+        page, token = paginate(keys, count, cursor, limit)
+        pages.append(page.tolist())
+        if token is None:
+            return pages
+        cursor = decode_cursor(token)
+
+
+def test_cursor_round_trip():
+    for key in ('curry', 12.5, -3, None):
+        assert decode_cursor(encode_cursor(key, 7)) == (key, 7)
+
+
+def test_garbled_cursors_are_ignored():
+    for token in (None, '', 'not base64!', encode_cursor('a', 'b'), 'W10'):
+        assert decode_cursor(token) is None
+
+
+def test_pages_cover_every_row_once_in_input_order():
+    pages = walk(None, 10, 4)
+    assert pages == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_ties_are_broken_by_position():
+    keys = np.array([2.0, 1.0, 2.0, 1.0, 2.0])
+    pages = walk(keys, len(keys), 2)
+    assert [row for page in pages for row in page] == [1, 3, 0, 2, 4]
+
+
+def test_stat_sort_is_biggest_first_and_name_sort_a_to_z():
+    stats = np.zeros((3, len(STAT_COLUMNS)))
+    stats[:, STAT_COLUMNS.index('pts')] = [10.0, 30.0, 20.0]
+    names = np.array(['cole', 'abe', 'bo'])
+
+    assert walk(sort_keys('pts', names, stats), 3, 10) == [[1, 2, 0]]
+    assert walk(sort_keys('name', names, stats), 3, 10) == [[1, 2, 0]]
+    assert sort_keys('', names, stats) is None
+
+
+def test_cursor_from_another_sort_restarts_at_the_first_page():
+    names = np.array(['b', 'a', 'c'])
+    cursor = decode_cursor(encode_cursor(5.0, 0))
+    page, _ = paginate(names, 3, cursor, limit=2)
+    assert page.tolist() == [1, 0]
+
+
+def test_last_page_has_no_cursor():
+    page, token = paginate(None, 3, None, limit=3)
+    assert page.tolist() == [0, 1, 2]
+    assert token is None
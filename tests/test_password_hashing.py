@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from my_flask_app import password_hashing
+from my_flask_app.password_hashing import HashingBusy, hash_password, needs_rehash, verify_password
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    """A pool of one thread and one queue slot, replacing whatever this process started."""
+    monkeypatch.setattr(password_hashing, 'HASH_WORKERS', 1)
+    monkeypatch.setattr(password_hashing, 'HASH_QUEUE_LIMIT', 1)
+    monkeypatch.setattr(password_hashing, '_pool_pid', None)
+    yield
+    monkeypatch.setattr(password_hashing, '_pool_pid', None)
+
+
+def wait_until_full():
+    """Waits for every admission slot to be taken by the threads under test."""
+    slots = password_hashing._pool()[1]
+    for _ in range(500):
+        if not slots.acquire(blocking=False):
+            return
+        slots.release()
+        time.sleep(0.01)
+    raise AssertionError("hashes never filled the pool")
+
+
+def test_hash_round_trip():
+    password_hash = hash_password('s3cret-pass')
+    assert verify_password(password_hash, 's3cret-pass')
+    assert not verify_password(password_hash, 'wrong')
+    assert not needs_rehash(password_hash)
+    assert needs_rehash('pbkdf2:sha256:1000$salt$hash')
+
+
+def test_hashes_past_the_queue_are_turned_away(small_pool):
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 'done'
+
+    # One hash running and one waiting fill the worker and the queue slot
+    threads = [threading.Thread(target=password_hashing._run, args=('hash', slow)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+    try:
+        wait_until_full()
+        with pytest.raises(HashingBusy):
+            password_hashing._run('hash', lambda: 'never runs')
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    # Slots are released once the queued hashes finish
+    assert password_hashing._run('hash', lambda: 'ok') == 'ok'
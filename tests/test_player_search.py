@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from player_search import PlayerSearchIndex, fold_name
+
+NAMES = ['Stephen Curry', 'Seth Curry', 'Nikola Jokić', 'Nikola Vučević', 'LeBron James', 'Jalen Brunson']
+POSITIONS = ['PG', 'SG', 'C', 'C', 'SF', 'PG']
+
+
+@pytest.fixture
+def index():
+    return PlayerSearchIndex(NAMES, POSITIONS)
+
+
+def names(index, row_ids):
+    return [NAMES[row_id] for row_id in row_ids]
+
+
+def test_folding_ignores_case_and_accents():
+    assert fold_name('  Nikola JOKIĆ ') == 'nikola jokic'
+
+
+def test_substring_search_matches_a_full_scan(index):
+    for query in ['curry', 'jokic', 'Nikola', 'ol', 'n', 'a b', 'ron j', '']:
+        expected = [i for i, name in enumerate(NAMES) if fold_name(query) in fold_name(name)]
+        assert index.search(query) == expected, query
+
+
+def test_position_narrows_the_search(index):
+    assert names(index, index.search('nikola', 'C')) == ['Nikola Jokić', 'Nikola Vučević']
+    assert names(index, index.search('', 'PG')) == ['Stephen Curry', 'Jalen Brunson']
+    assert index.search('curry', 'C') == []
+
+
+def test_typos_fall_back_to_the_closest_names(index):
+    assert names(index, index.search('stephen cury'))[0] == 'Stephen Curry'
+    assert names(index, index.search('jokic nikola'))[0] == 'Nikola Jokić'
+    assert index.search('zzzz') == []
+
+
+def test_saved_arrays_answer_the_same_queries(index):
+    reloaded = PlayerSearchIndex.from_arrays({name: np.array(value) for name, value in index.arrays().items()})
+    for query in ['curry', 'vucevic', 'lebron jmes']:
+        assert reloaded.search(query) == index.search(query)
+
+
+def test_suggestions_put_word_prefixes_first(index):
+    assert index.suggest('cur') == ['Stephen Curry', 'Seth Curry']
+    # 'br' starts 'Brunson' and sits inside 'LeBron'
+    assert index.suggest('br') == ['Jalen Brunson', 'LeBron James']
+    assert index.suggest('nik', limit=1) == ['Nikola Jokić']
+    assert index.suggest('  ') == []
+
+
+def test_suggestions_forgive_typos_only_without_real_matches(index):
+    assert index.suggest('lebrn') == ['LeBron James']
+    assert index.close_matches('jalen brunsen')[0] == 'Jalen Brunson'
+
+
+def test_suggest_endpoint_returns_names():
+    from my_flask_app.app import app
+    client = app.test_client()
+    response = client.get('/api/players/suggest?q=gilgeous')
+    assert response.status_code == 200
+    assert response.get_json() == ['Shai Gilgeous-Alexander']
+    assert client.get('/api/players/suggest').get_json() == []
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from position_engine import POSITION_NAMES, STAT_COLUMNS, describe_fit, fit_positions_batch, score_positions
+from position_engine import per_minute_centroids, per_minute_matrix, per_minute_vector
+
+
+def centroids():
+    # Five distinct positions, all stats positive so every stat is compared
+    return np.arange(1, 46, dtype=np.float64).reshape(5, len(STAT_COLUMNS)) / 10
+
+
+def test_fewer_turnovers_and_fouls_are_strengths():
+    line = centroids()[2].copy()
+    for stat, change in {'tov': 0.6, 'pf': 0.6, 'pts': 1.1, 'ast': 0.95}.items():
+        line[STAT_COLUMNS.index(stat)] *= change
+    position, weakest, strongest = describe_fit(score_positions(line, centroids()), stat_names=STAT_COLUMNS)
+    assert position == POSITION_NAMES[2]
+    assert weakest[0] == 'ast'
+    assert 'tov' not in weakest and 'pf' not in weakest
+    assert set(strongest[:2]) == {'tov', 'pf'}
+
+
+def test_more_turnovers_and_fouls_need_improvement():
+    line = centroids()[2].copy()
+    line[STAT_COLUMNS.index('tov')] *= 1.3
+    line[STAT_COLUMNS.index('pf')] *= 1.2
+    _, weakest, strongest = describe_fit(score_positions(line, centroids()), stat_names=STAT_COLUMNS)
+    assert weakest[:2] == ['tov', 'pf']
+    assert 'tov' not in strongest and 'pf' not in strongest
+
+
+def test_each_position_average_fits_its_own_position():
+    fit = score_positions(centroids(), centroids())
+    assert fit.best_index.tolist() == list(range(5))
+    np.testing.assert_allclose(fit.distances[np.arange(5), np.arange(5)], 0.0)
+    np.testing.assert_allclose(fit.relative, 0.0)
+
+
+def test_distance_is_the_mean_absolute_percentage_difference():
+    line = centroids()[0] * np.array([1.5, 1, 1, 1, 1, 1, 1, 1, 0.7])
+    fit = score_positions(line, centroids())
+    assert fit.distances[0, 0] == pytest.approx((0.5 + 0.3) / len(STAT_COLUMNS))
+
+
+def test_zero_averages_count_as_no_difference():
+    averages = centroids()
+    averages[:, STAT_COLUMNS.index('three_p_pct')] = 0.0
+    line = averages[4].copy()
+    line[STAT_COLUMNS.index('three_p_pct')] = 0.4
+    fit = score_positions(line, averages)
+    assert fit.best_index.tolist() == [4]
+    assert fit.distances[0, 4] == 0.0
+
+
+def test_batches_match_single_lines_across_chunks():
+    rng = np.random.default_rng(7)
+    lines = centroids()[rng.integers(0, 5, 250)] * rng.uniform(0.6, 1.4, size=(250, len(STAT_COLUMNS)))
+    batch = fit_positions_batch(lines, centroids(), chunk_size=64)
+    assert batch.best_index.tolist() == [score_positions(line, centroids()).best_index[0] for line in lines]
+    np.testing.assert_allclose(batch.distances, score_positions(lines, centroids()).distances)
+    assert fit_positions_batch(np.empty((0, len(STAT_COLUMNS))), centroids()).best_index.shape == (0,)
+
+
+def test_per_minute_conversions_keep_percentages():
+    stats = dict(zip(STAT_COLUMNS, [0.5, 0.4, 2, 1, 3, 2, 24, 6, 8]))
+    vector = per_minute_vector(stats, 24)
+    assert vector[STAT_COLUMNS.index('fg_pct')] == 0.5
+    assert vector[STAT_COLUMNS.index('pts')] == 1.0
+    # No minutes means a full game, as for the position averages
+    np.testing.assert_allclose(per_minute_vector(stats, None), per_minute_centroids([list(stats.values())])[0],
+                               atol=1e-5)
+    np.testing.assert_allclose(per_minute_matrix([list(stats.values())] * 2, [24, 0]),
+                               [per_minute_vector(stats, 24), per_minute_vector(stats, None)])
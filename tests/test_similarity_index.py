@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from position_engine import PERCENT_COLUMNS, STAT_COLUMNS, per_minute_vector
+from season_store import SeasonStore, write_season
+from similarity_index import PlayerSimilarityIndex, parse_weights, stat_weights
+
+
+@pytest.fixture
+def players():
+    rng = np.random.default_rng(3)
+    stats = rng.normal(size=(200, len(STAT_COLUMNS)))
+    # Correlated columns, like PTS with FGA, are what Mahalanobis distance corrects for
+    stats[:, STAT_COLUMNS.index('pts')] += 2 * stats[:, STAT_COLUMNS.index('ast')]
+    frame = pd.DataFrame(stats, columns=STAT_COLUMNS)
+    frame['player_name'] = [f"Player {i}" for i in range(len(frame))]
+    return frame
+
+
+def z_scores(frame, vectors):
+    numeric = frame[STAT_COLUMNS].to_numpy()
+    return (vectors - numeric.mean(axis=0)) / numeric.std(axis=0, ddof=1)
+
+
+def baseline_distances(frame, query):
+    """find_ideal_player_match before the index: z-scores and np.linalg.norm over every player."""
+    return np.linalg.norm(z_scores(frame, frame[STAT_COLUMNS].to_numpy()) - z_scores(frame, query), axis=1)
+
+
+def assert_matches(index, query, expected, k=5):
+    indices, distances = index.top_k(query, k=k)
+    assert indices.tolist() == np.argsort(expected, kind='stable')[:k].tolist()
+    np.testing.assert_allclose(distances, expected[indices], rtol=1e-4, atol=1e-4)
+
+
+def test_euclidean_matches_the_baseline(players):
+    index = PlayerSimilarityIndex.from_dataframe(players)
+    query = players[STAT_COLUMNS].to_numpy()[17] + 0.1
+    assert_matches(index, query, baseline_distances(players, query))
+
+
+def test_mahalanobis_matches_inverse_covariance(players):
+    index = PlayerSimilarityIndex.from_dataframe(players).with_metric('mahalanobis')
+    query = players[STAT_COLUMNS].to_numpy()[42] * 1.1
+    diff = z_scores(players, players[STAT_COLUMNS].to_numpy()) - z_scores(players, query)
+    covariance = np.cov(z_scores(players, players[STAT_COLUMNS].to_numpy()), rowvar=False)
+    expected = np.sqrt(np.einsum('ij,jk,ik->i', diff, np.linalg.inv(covariance), diff))
+    assert_matches(index, query, expected)
+
+
+def test_weighted_matches_weighted_squares(players):
+    weights = {'pts': 3.0, 'blk': 0.0}
+    index = PlayerSimilarityIndex.from_dataframe(players).with_metric('weighted', weights)
+    query = players[STAT_COLUMNS].to_numpy()[5] - 0.2
+    diff = z_scores(players, players[STAT_COLUMNS].to_numpy()) - z_scores(players, query)
+    expected = np.sqrt((diff ** 2 * stat_weights(weights)).sum(axis=1))
+    assert_matches(index, query, expected)
+
+
+def test_batch_and_single_queries_agree(players):
+    index = PlayerSimilarityIndex.from_dataframe(players).with_metric('mahalanobis')
+    queries = players[STAT_COLUMNS].to_numpy()[:20] + 0.05
+    batch_indices, batch_distances = index.top_k_batch(queries, k=3)
+    for row, query in enumerate(queries):
+        indices, distances = index.top_k(query, k=3)
+        assert indices.tolist() == batch_indices[row].tolist()
+        # float32 matrix-vector vs matrix-matrix products round differently in the last digits
+        np.testing.assert_allclose(distances, batch_distances[row], rtol=1e-4, atol=1e-4)
+
+
+def test_metric_variants_are_built_once(players):
+    index = PlayerSimilarityIndex.from_dataframe(players)
+    assert index.with_metric('euclidean') is index
+    assert index.with_metric('mahalanobis') is index.with_metric('mahalanobis')
+    assert index.with_metric('weighted', {'pts': 2}) is index.with_metric('weighted', {'pts': 2})
+
+
+def test_bad_metrics_and_weights_are_rejected(players):
+    index = PlayerSimilarityIndex.from_dataframe(players)
+    with pytest.raises(ValueError):
+        index.with_metric('cosine')
+    with pytest.raises(ValueError):
+        index.with_metric('weighted', {'dunks': 2})
+    with pytest.raises(ValueError):
+        index.with_metric('weighted', [0.0] * len(STAT_COLUMNS))
+    with pytest.raises(ValueError):
+        parse_weights('pts')
+    assert parse_weights('pts=2, ast=1.5') == {'pts': 2.0, 'ast': 1.5}
+
+
+def test_small_score_budget_gives_the_same_matches(players):
+    index = PlayerSimilarityIndex.from_dataframe(players)
+    queries = players[STAT_COLUMNS].to_numpy()[:30] * 0.9
+    expected = index.top_k_batch(queries, k=4)
+    # Forces one query per chunk, as on an index too large for several at once
+    chunked = index.top_k_batch(queries, k=4, score_budget=1)
+    assert expected[0].tolist() == chunked[0].tolist()
+    np.testing.assert_allclose(expected[1], chunked[1], rtol=1e-4, atol=1e-4)
+
+
+def per_game(players):
+    """The fixture's per-minute stats as per-game lines, each player with their own minutes."""
+    frame = players.copy()
+    frame['mins_played'] = np.linspace(10, 40, len(frame))
+    counting = [col for col in STAT_COLUMNS if col not in PERCENT_COLUMNS]
+    frame[counting] = frame[counting].mul(frame['mins_played'], axis=0)
+    return frame
+
+
+def test_per_game_tables_are_indexed_per_minute(players):
+    index = PlayerSimilarityIndex.from_dataframe(per_game(players))
+    np.testing.assert_allclose(index.raw_stats, players[STAT_COLUMNS].to_numpy(), rtol=1e-4, atol=1e-4)
+    line = per_game(players).iloc[17]
+    indices, _ = index.top_k(per_minute_vector(line, line['mins_played']), k=1)
+    assert indices.tolist() == [17]
+
+
+def test_season_store_matches_per_minute(players, tmp_path):
+    frame = per_game(players).assign(position='SF')
+    write_season(2025, frame, store_dir=str(tmp_path))
+    line = frame.iloc[17]
+    (season, name, distance), = SeasonStore(str(tmp_path)).top_k(per_minute_vector(line, line['mins_played']))
+    assert (season, name) == (2025, 'Player 17')
+    assert distance < 1e-3
@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from my_flask_app.app import app
+from my_flask_app.models import HISTORY_COLUMNS, User, UserStatsHistory, db
+
+DAY = 86400
+JAN_1 = int(datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+def line(pts):
+    return dict(dict.fromkeys(HISTORY_COLUMNS, 1.0), pts=pts)
+
+
+@pytest.fixture
+def user():
+    with app.app_context():
+        db.create_all()
+        account = User(username='history-tester', password_hash='not-a-real-hash')
+        db.session.add(account)
+        db.session.commit()
+        # Ten days, four entries a day, with pts counting up from 0
+        for i in range(40):
+            UserStatsHistory.record(account.id, line(float(i)), recorded_at=JAN_1 + i * DAY // 4)
+        db.session.commit()
+        yield account.id
+        UserStatsHistory.query.filter_by(user_id=account.id).delete()
+        db.session.delete(db.session.get(User, account.id))
+        db.session.commit()
+        db.session.remove()
+
+
+def test_small_ranges_come_back_entry_by_entry(user):
+    series = UserStatsHistory.series(user, JAN_1 + DAY, JAN_1 + 2 * DAY - 1)
+    assert series['count'] == [1, 1, 1, 1]
+    assert [values[HISTORY_COLUMNS.index('pts')] for values in series['values']] == [4.0, 5.0, 6.0, 7.0]
+    assert series['recorded_at'][0] == JAN_1 + DAY
+
+
+def test_long_ranges_are_averaged_into_buckets(user):
+    series = UserStatsHistory.series(user, JAN_1, JAN_1 + 10 * DAY - 1, max_points=10)
+    # One bucket per day: its four entries' mean time and mean stats
+    assert series['count'] == [4] * 10
+    assert [values[HISTORY_COLUMNS.index('pts')] for values in series['values']] == [4 * d + 1.5 for d in range(10)]
+    assert series['recorded_at'][0] == JAN_1 + (0 + 6 + 12 + 18) * 3600 // 4
+    assert sum(UserStatsHistory.series(user, JAN_1, JAN_1 + 10 * DAY, max_points=7)['count']) == 40
+
+
+def test_the_endpoint_reads_the_signed_in_users_range(user):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user)
+    response = client.get('/api/stats/history?start=2025-01-02&end=2025-01-03&points=2')
+    assert response.status_code == 200
+    assert response.get_json()['count'] == [4, 4]
+    assert client.get('/api/stats/history?start=2025-01-03&end=2025-01-02').status_code == 400
+    assert client.get('/api/stats/history?points=0').status_code == 400
+    assert client.get('/api/stats/history?start=yesterday').status_code == 400
@@ -1,5 +1,6 @@
 import sqlite3
-import pandas as pd
+
+from db_connection import read_frame
 
 def check_database_health(db_name='basketball.db'):
     """
@@ -18,55 +19,50 @@ def check_database_health(db_name='basketball.db'):
         None: Prints a health report directly to the console.
     """
     try:
-        conn = sqlite3.connect(db_name)
         print(f"--- Database Health Report: {db_name} ---")
         
         # 1. Total Count Check
         # Confirms the table isn't empty and gives a scale of the dataset.
-        total_players = pd.read_sql('SELECT COUNT(*) FROM nba_players', conn).iloc[0,0]
+        total_players = read_frame('SELECT COUNT(*) FROM nba_players', db_name=db_name).iloc[0,0]
         print(f"Total Players Imported: {total_players}")
         
         # 2. Null Value Check
         # Uses the difference between total rows and non-null counts to find holes in data.
-        null_checks = pd.read_sql('''
+        null_checks = read_frame('''
             SELECT 
                 COUNT(*) - COUNT(player_name) AS missing_names,
                 COUNT(*) - COUNT(pts) AS missing_pts,
                 COUNT(*) - COUNT(fg_pct) AS missing_fg_pct
             FROM nba_players
-        ''', conn)
+        ''', db_name=db_name)
         print(f"\nMissing Data Summary:\n{null_checks}")
         
         # 3. Random Sample Check
         # Helps identify if columns were shifted during import (e.g., names in the position column).
         print("\nRandom Sample (Verify if stats match the names):")
-        sample = pd.read_sql('''
+        sample = read_frame('''
             SELECT player_name, position, pts, trb, ast, three_p_pct 
             FROM nba_players 
             ORDER BY RANDOM() 
             LIMIT 5
-        ''', conn)
+        ''', db_name=db_name)
         print(sample)
         
         # 4. Top Scorers Check (Logic Check)
         # Verifies that numeric columns (pts) are being treated as numbers and not strings.
         print("\nTop 3 Scorers (Logic Check):")
-        top_scorers = pd.read_sql('''
+        top_scorers = read_frame('''
             SELECT player_name, pts 
             FROM nba_players 
             ORDER BY pts DESC 
             LIMIT 3
-        ''', conn)
+        ''', db_name=db_name)
         print(top_scorers)
 
     except sqlite3.Error as e:
         print(f"Database error during health check: {e}")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
-    finally:
-        # Ensure the connection is always closed
-        if conn:
-            conn.close()
 
 if __name__ == "__main__":
     check_database_health()
\ No newline at end of file